@@ -0,0 +1,327 @@
+"""
+Engine alert streaming untuk heart rate, respiration rate dan kehilangan sinyal.
+
+Engine menerima keluaran streaming (HR/RR beserta kualitasnya, serta status deteksi wajah
+dan pose per frame) dan mengevaluasi aturan dalam O(1) per update: setiap metrik langsung
+dipetakan ke aturan yang memakainya, dan setiap aturan hanya menyimpan state mesin kecil.
+
+Aturan:
+- ThresholdRule: nilai di luar [low, high] selama `debounce` detik → alert; kembali normal
+  setelah berada di dalam rentang yang dipersempit `hysteresis` selama `clear_debounce` detik.
+- SignalLossRule: wajah/pose tidak terdeteksi selama `timeout` detik → alert.
+
+Notifikasi dikirim oleh thread latar belakang ke sink lokal (file log JSON lines, callback,
+socket UDP/Unix), sehingga loop video tidak pernah menunggu I/O. Latensi dari event (sampel
+yang memicu transisi) hingga notifikasi diukur per alert; alert yang melewati batas
+`max_latency` dicatat sebagai terlambat.
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from collections import deque, namedtuple
+
+
+RAISED = "raised"
+CLEARED = "cleared"
+
+# event_time: time.perf_counter() saat sampel pemicu diamati; wall_time: time.time()
+Alert = namedtuple("Alert", ["rule", "subject", "state", "value", "event_time", "wall_time", "message"])
+
+
+class ThresholdRule:
+    """
+    Alert ambang dengan histeresis dan debounce untuk satu metrik.
+
+    Args:
+        name (str): Nama aturan (misalnya "hr_high")
+        metric (str): Metrik yang dipantau ("hr", "rr")
+        low (float | None): Batas bawah rentang aman
+        high (float | None): Batas atas rentang aman
+        hysteresis (float): Margin ke dalam rentang yang diperlukan untuk kembali normal
+        debounce (float): Lama pelanggaran (detik) sebelum alert
+        clear_debounce (float): Lama kembali normal (detik) sebelum alert dihapus
+        min_quality (float): Update dengan kualitas di bawah ini diabaikan
+    """
+    def __init__(self, name, metric, low=None, high=None, hysteresis=0.0, debounce=5.0,
+                 clear_debounce=5.0, min_quality=0.0):
+        self.name = name
+        self.metric = metric
+        self.low = low
+        self.high = high
+        self.hysteresis = hysteresis
+        self.debounce = debounce
+        self.clear_debounce = clear_debounce
+        self.min_quality = min_quality
+        self.reset()
+
+    def reset(self):
+        self.active = False
+        self._since = None      # awal kondisi yang sedang menunggu debounce
+
+    def _violates(self, value):
+        return (self.low is not None and value < self.low) or (self.high is not None and value > self.high)
+
+    def _recovered(self, value):
+        return ((self.low is None or value >= self.low + self.hysteresis)
+                and (self.high is None or value <= self.high - self.hysteresis))
+
+    def update(self, value, t, quality=1.0):
+        """
+        Memproses satu nilai.
+
+        Returns:
+            str | None: RAISED / CLEARED saat terjadi transisi, selain itu None
+        """
+        if value is None or quality < self.min_quality:
+            return None
+        pending = self._recovered(value) if self.active else self._violates(value)
+        if not pending:
+            self._since = None
+            return None
+        if self._since is None:
+            self._since = t
+        if t - self._since < (self.clear_debounce if self.active else self.debounce):
+            return None
+        self.active = not self.active
+        self._since = None
+        return RAISED if self.active else CLEARED
+
+    def describe(self, value):
+        limit = f"< {self.low:g}" if self.low is not None else f"> {self.high:g}"
+        return f"{self.metric.upper()} {value:.1f} (limit {limit})"
+
+
+class SignalLossRule:
+    """
+    Alert saat sinyal (wajah/pose) tidak terdeteksi selama `timeout` detik.
+
+    Args:
+        name (str): Nama aturan (misalnya "no_face")
+        metric (str): Metrik status deteksi ("face", "pose"), nilai True/False per frame
+        timeout (float): Lama kehilangan sinyal (detik) sebelum alert
+    """
+    min_quality = 0.0
+
+    def __init__(self, name, metric, timeout=5.0):
+        self.name = name
+        self.metric = metric
+        self.timeout = timeout
+        self.reset()
+
+    def reset(self):
+        self.active = False
+        self._last_seen = None
+
+    def update(self, present, t, quality=1.0):
+        if present:
+            self._last_seen = t
+            if self.active:
+                self.active = False
+                return CLEARED
+            return None
+        if self._last_seen is None:
+            self._last_seen = t
+        if not self.active and t - self._last_seen >= self.timeout:
+            self.active = True
+            return RAISED
+        return None
+
+    def describe(self, present):
+        return f"No {self.metric} for {self.timeout:.0f} s" if not present else f"{self.metric} detected"
+
+
+# === Sink ===
+
+class LogFileSink:
+    """Menambahkan alert ke file JSON lines."""
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", buffering=1)
+
+    def emit(self, alert, latency):
+        self._file.write(json.dumps({**alert._asdict(), 'latency_ms': latency * 1000}) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class CallbackSink:
+    """Memanggil `callback(alert, latency)`; berjalan di thread pengiriman, bukan thread GUI."""
+    def __init__(self, callback):
+        self.callback = callback
+
+    def emit(self, alert, latency):
+        self.callback(alert, latency)
+
+    def close(self):
+        pass
+
+
+class SocketSink:
+    """
+    Mengirim alert sebagai datagram JSON ke socket lokal (non-blocking).
+
+    Args:
+        address (tuple | str): (host, port) untuk UDP, atau path socket Unix datagram
+    """
+    def __init__(self, address):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.address = address
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def emit(self, alert, latency):
+        payload = json.dumps({**alert._asdict(), 'latency_ms': latency * 1000}).encode()
+        try:
+            self._socket.sendto(payload, self.address)
+        except OSError:
+            pass    # tidak ada penerima / buffer penuh: alert tetap tercatat di sink lain
+
+    def close(self):
+        self._socket.close()
+
+
+_STOP = object()
+
+
+class AlertEngine:
+    """
+    Evaluasi aturan per update dan pengiriman notifikasi asinkron.
+
+    Args:
+        rules (list): ThresholdRule / SignalLossRule
+        sinks (list): Objek dengan `emit(alert, latency)` dan `close()`
+        subject (str): Nama subjek (disertakan di setiap alert)
+        max_latency (float): Batas latensi event → notifikasi (detik)
+    """
+    def __init__(self, rules, sinks, subject="default", max_latency=0.25):
+        self.subject = subject
+        self.sinks = list(sinks)
+        self.max_latency = max_latency
+        self.set_rules(rules)
+        self.latencies = deque(maxlen=1000)
+        self.late = 0
+        self.delivered = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._deliver, daemon=True)
+        self._thread.start()
+
+    def set_rules(self, rules, subject=None):
+        """Mengganti aturan (misalnya saat subjek berganti); state aturan lama dibuang."""
+        self._rules = {}
+        for rule in rules:
+            self._rules.setdefault(rule.metric, []).append(rule)
+        if subject is not None:
+            self.subject = subject
+
+    def reset(self):
+        """Mengembalikan semua aturan ke kondisi normal (misalnya saat feed video dimulai ulang)."""
+        for rules in self._rules.values():
+            for rule in rules:
+                rule.reset()
+
+    def active(self):
+        """Nama aturan yang sedang aktif."""
+        return [rule.name for rules in self._rules.values() for rule in rules if rule.active]
+
+    def update(self, metric, value, quality=1.0, t=None):
+        """
+        Mengevaluasi aturan untuk satu update metrik.
+
+        Args:
+            metric (str): "hr", "rr", "face" atau "pose"
+            value: Nilai laju (per menit) atau status deteksi (bool)
+            quality (float): Kualitas sinyal 0–1 (aturan dengan min_quality)
+            t (float | None): time.perf_counter() saat nilai diamati (default sekarang)
+        """
+        rules = self._rules.get(metric)
+        if not rules:
+            return
+        t = time.perf_counter() if t is None else t
+        for rule in rules:
+            state = rule.update(value, t, quality)
+            if state is not None:
+                self._queue.put(Alert(rule.name, self.subject, state, value, t, time.time(),
+                                      rule.describe(value)))
+
+    def _deliver(self):
+        while True:
+            alert = self._queue.get()
+            if alert is _STOP:
+                return
+            for sink in self.sinks:
+                try:
+                    sink.emit(alert, time.perf_counter() - alert.event_time)
+                except Exception as e:
+                    print(f"⚠️ Alert sink error ({type(sink).__name__}): {e}")
+            latency = time.perf_counter() - alert.event_time
+            self.latencies.append(latency)
+            self.delivered += 1
+            if latency > self.max_latency:
+                self.late += 1
+                print(f"⚠️ Alert '{alert.rule}' delivered late: {latency * 1000:.0f} ms")
+
+    def stats(self):
+        """Ringkasan latensi notifikasi (ms): count, mean, max, late."""
+        if not self.latencies:
+            return {'count': self.delivered, 'mean_ms': None, 'max_ms': None, 'late': self.late}
+        values = list(self.latencies)
+        return {'count': self.delivered, 'mean_ms': 1000 * sum(values) / len(values),
+                'max_ms': 1000 * max(values), 'late': self.late}
+
+    def close(self):
+        """Mengirim alert yang tersisa lalu menutup semua sink."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout=2)
+        for sink in self.sinks:
+            sink.close()
+
+
+def build_rules(thresholds):
+    """
+    Membuat aturan standar dari dict ambang (lihat `AlertConfig.thresholds`).
+
+    Returns:
+        list: ThresholdRule untuk HR/RR rendah-tinggi dan SignalLossRule untuk wajah/pose
+    """
+    t = thresholds
+    return [
+        ThresholdRule("hr_low", "hr", low=t['hr_low'], hysteresis=t['hr_hysteresis'], debounce=t['debounce'],
+                      clear_debounce=t['clear_debounce'], min_quality=t['min_quality']),
+        ThresholdRule("hr_high", "hr", high=t['hr_high'], hysteresis=t['hr_hysteresis'], debounce=t['debounce'],
+                      clear_debounce=t['clear_debounce'], min_quality=t['min_quality']),
+        ThresholdRule("rr_low", "rr", low=t['rr_low'], hysteresis=t['rr_hysteresis'], debounce=t['debounce'],
+                      clear_debounce=t['clear_debounce'], min_quality=t['min_quality']),
+        ThresholdRule("rr_high", "rr", high=t['rr_high'], hysteresis=t['rr_hysteresis'], debounce=t['debounce'],
+                      clear_debounce=t['clear_debounce'], min_quality=t['min_quality']),
+        SignalLossRule("no_face", "face", timeout=t['signal_loss']),
+        SignalLossRule("no_pose", "pose", timeout=t['signal_loss']),
+    ]
+
+
+def engine_from_config(alert_config, subject="default", callback=None):
+    """
+    Membuat AlertEngine dari `AppConfig.alerts`, atau None jika dinonaktifkan.
+
+    Args:
+        alert_config (AlertConfig): Konfigurasi alert
+        subject (str): Subjek awal (ambang per subjek dari `alert_config.subjects`)
+        callback (callable | None): Callback tambahan `callback(alert, latency)`
+    """
+    if not alert_config.enabled:
+        return None
+    sinks = []
+    if alert_config.log_path:
+        sinks.append(LogFileSink(alert_config.log_path))
+    if alert_config.socket_port:
+        sinks.append(SocketSink((alert_config.socket_host, alert_config.socket_port)))
+    if callback is not None:
+        sinks.append(CallbackSink(callback))
+    return AlertEngine(build_rules(alert_config.thresholds(subject)), sinks, subject=subject,
+                       max_latency=alert_config.max_latency)
@@ -0,0 +1,148 @@
+"""
+artifact.py
+
+Deteksi dan perbaikan artefak (perubahan iluminasi mendadak, gerakan kepala) pada sinyal
+sebelum filtering.
+
+Lonjakan/tangga (step) pada rata-rata ROI akan lolos dari median, Savitzky-Golay dan
+bandpass, lalu mendominasi periodogram selama seluruh buffer. Modul ini menandai sampel
+buruk dari tiga sumber, semuanya tervektorisasi:
+- turunan sinyal ROI (outlier robust berbasis median/MAD)
+- turunan kecerahan seluruh frame (perubahan iluminasi global)
+- kecepatan landmark (gerakan kepala, relatif terhadap ukuran wajah)
+
+Sampel buruk kemudian dieksisi pada domain turunan: turunan di sekitar artefak dinolkan
+lalu sinyal direkonstruksi dengan cumsum, sehingga tangga hilang (bukan hanya ditambal)
+dan estimasi pulih segera setelah artefak lewat.
+
+Fungsi:
+- detect_artifacts(signal, fs, ...): Mask boolean sampel buruk.
+- repair_signal(signal, mask): Menghapus lompatan level pada sampel yang ditandai.
+- landmark_speed(points, prev_points): Kecepatan landmark ternormalisasi per frame.
+- reject_artifacts(signal, fs, ...): Deteksi + perbaikan sekaligus.
+"""
+
+import numpy as np
+
+
+_MAD_SCALE = 1.4826     # MAD → standar deviasi untuk distribusi normal
+
+
+def _robust_outliers(values, threshold):
+    """True untuk nilai yang menyimpang lebih dari `threshold` × sigma robust dari median."""
+    values = np.asarray(values, dtype=float)
+    median = np.median(values)
+    deviation = np.abs(values - median)
+    mad = np.median(deviation)
+    if mad == 0:
+        # Mayoritas selisih nol (nilai ditahan antar deteksi, sinyal terkuantisasi piksel):
+        # skala diambil dari deviasi tak nol agar perubahan normal tidak ikut ditandai
+        nonzero = deviation[deviation > 0]
+        if len(nonzero) == 0:
+            return np.zeros(len(values), dtype=bool)
+        mad = np.median(nonzero)
+    sigma = max(_MAD_SCALE * mad, 1e-9 * np.max(np.abs(values)), 1e-12)
+    return deviation > threshold * sigma
+
+
+def detect_artifacts(signal, fs, landmark_speed=None, brightness=None,
+                     threshold=6.0, motion_threshold=0.05, pad=0.2):
+    """
+    Menandai sampel yang terkena artefak iluminasi atau gerakan.
+
+    Args:
+        signal (array-like): Sinyal ROI mentah (misalnya rata-rata green)
+        fs (float): Frekuensi sampling (Hz)
+        landmark_speed (array-like | None): Kecepatan landmark per sampel (fraksi lebar wajah/frame)
+        brightness (array-like | None): Kecerahan rata-rata seluruh frame per sampel
+        threshold (float): Ambang outlier turunan (kelipatan sigma robust)
+        motion_threshold (float): Ambang kecepatan landmark
+        pad (float): Perluasan mask ke kiri-kanan (detik)
+
+    Returns:
+        np.ndarray: Mask boolean, True = sampel buruk
+    """
+    x = np.asarray(signal, dtype=float)
+    n = len(x)
+    mask = np.isnan(x)
+    if n < 3:
+        return mask
+
+    finite = np.where(mask, np.nanmedian(x) if not mask.all() else 0.0, x)
+    mask[1:] |= _robust_outliers(np.diff(finite), threshold)
+
+    if brightness is not None:
+        b = np.asarray(brightness, dtype=float)
+        if len(b) == n and np.isfinite(b).all():
+            mask[1:] |= _robust_outliers(np.diff(b), threshold)
+
+    if landmark_speed is not None:
+        speed = np.asarray(landmark_speed, dtype=float)
+        if len(speed) == n:
+            with np.errstate(invalid='ignore'):
+                mask |= speed > motion_threshold
+
+    k = int(round(pad * fs))
+    if k > 0 and mask.any():
+        mask = np.convolve(mask, np.ones(2 * k + 1), mode='same') > 0
+    return mask
+
+
+def repair_signal(signal, mask):
+    """
+    Mengeksisi sampel buruk dengan menolkan turunan di sekitarnya lalu merekonstruksi sinyal.
+
+    Lompatan level akibat artefak dihapus, sehingga sinyal setelah artefak tersambung
+    mulus dengan sinyal sebelumnya; segmen artefak menjadi datar.
+
+    Args:
+        signal (array-like): Sinyal mentah
+        mask (array-like): Mask sampel buruk dari `detect_artifacts`
+
+    Returns:
+        np.ndarray: Sinyal hasil perbaikan (salinan)
+    """
+    x = np.asarray(signal, dtype=float)
+    mask = np.asarray(mask, dtype=bool)
+    if len(x) < 2 or not mask.any():
+        return x.copy()
+    good = ~mask
+    if not good.any():
+        return np.zeros_like(x)
+
+    d = np.diff(np.where(mask, 0.0, x))
+    # Turunan yang menyentuh sampel buruk (termasuk lompatan masuk/keluar) dinolkan
+    d[mask[1:] | mask[:-1]] = 0.0
+    repaired = np.concatenate(([0.0], np.cumsum(d)))
+    first = int(np.argmax(good))
+    return repaired - repaired[first] + x[first]
+
+
+def landmark_speed(points, prev_points):
+    """
+    Kecepatan gerak landmark antar frame, dinormalisasi terhadap lebar sebaran landmark.
+
+    Args:
+        points (array-like): Titik (x, y) frame ini
+        prev_points (array-like | None): Titik (x, y) frame sebelumnya
+
+    Returns:
+        float: Perpindahan pusat landmark / lebar sebaran (0 jika tidak ada frame sebelumnya)
+    """
+    if prev_points is None or len(points) == 0 or len(points) != len(prev_points):
+        return 0.0
+    pts = np.asarray(points, dtype=float)
+    prev = np.asarray(prev_points, dtype=float)
+    width = max(np.ptp(pts[:, 0]), 1.0)
+    return float(np.linalg.norm(pts.mean(axis=0) - prev.mean(axis=0)) / width)
+
+
+def reject_artifacts(signal, fs, landmark_speed=None, brightness=None, **kwargs):
+    """
+    Deteksi + perbaikan dalam satu langkah (lihat `detect_artifacts` dan `repair_signal`).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (sinyal hasil perbaikan, mask sampel buruk)
+    """
+    mask = detect_artifacts(signal, fs, landmark_speed, brightness, **kwargs)
+    return repair_signal(signal, mask), mask
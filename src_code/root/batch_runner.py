@@ -0,0 +1,313 @@
+"""
+Batch runner untuk memproses video/rekaman secara offline tanpa GUI.
+
+Menggunakan jalur ingest yang sama dengan GUI (`frame_source`) dan ekstraktor yang sama
+(`RPPGExtractor`, `RespirasiExtractor`), lalu memfilter kedua sinyal sekaligus dengan
+rantai multirate (decimasi per sinyal) dan mengestimasi heart rate serta respiration rate.
+
+Contoh:
+    python batch_runner.py video.mp4 --output hasil.npz
+    python batch_runner.py rekaman.npz --realtime
+    python batch_runner.py video.mp4 --profile batch-throughput --set filter.rppg_band=0.8,2.5
+    python batch_runner.py video.mp4 --set cache.enabled=false
+"""
+
+import argparse
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from artifact import landmark_speed, reject_artifacts
+from config import add_config_arguments, config_from_args, load_config
+from extraction_workers import ExtractionWorkers
+from frame_source import open_source
+from hrv import IncrementalPeakAnalyzer
+from inference_cache import FrameColumns, InferenceCache
+from session_capture import is_capture, read_capture
+from signal_filter import decimate_signal, preprocess_signal
+from spectrogram import spectrogram
+from utils import RateTracker
+
+
+def fill_missing(values):
+    """
+    Mengisi sampel NaN (wajah/pose tidak terdeteksi) dengan interpolasi linear.
+
+    Args:
+        values (np.ndarray): Sinyal dengan NaN pada sampel yang hilang
+
+    Returns:
+        np.ndarray: Sinyal tanpa NaN (nol jika seluruh sampel hilang)
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return np.zeros_like(values)
+    if valid.all():
+        return values
+    idx = np.arange(len(values))
+    return np.interp(idx, idx[valid], values[valid])
+
+
+def extract_signals(source, config=None, realtime=False, rppg_extractor=None, respirasi_extractor=None):
+    """
+    Mengekstraksi sinyal mentah rPPG dan respirasi dari satu sumber frame.
+
+    Jika `cache.enabled`, hasil inferensi per frame diambil dari / disimpan ke cache on-disk
+    (lihat inference_cache.py), sehingga rerun dengan pengaturan ekstraksi yang sama
+    melewati decoding dan inferensi. Cache tidak dipakai untuk webcam, mode realtime
+    atau ekstraktor yang diberikan pemanggil. File session capture (`.rpcap`, lihat
+    session_capture.py) dibaca langsung tanpa inferensi.
+
+    Args:
+        source: Spesifikasi sumber frame (lihat `frame_source.open_source`)
+        config (AppConfig | None): Konfigurasi pemrosesan; default profil "default"
+        realtime (bool): Pacing sesuai timestamp sumber
+        rppg_extractor (RPPGExtractor | None): Ekstraktor rPPG (dibuat jika None)
+        respirasi_extractor (RespirasiExtractor | None): Ekstraktor respirasi (dibuat jika None)
+
+    Returns:
+        dict: timestamps, rppg_raw, respirasi_raw (NaN jika tidak terdeteksi), landmark_speed,
+        brightness (untuk deteksi artefak), fs (FPS sumber), frames, extraction_time (detik;
+        waktu ekstraksi asli jika dari cache) dan cached
+    """
+    config = config or load_config()
+    processing = config.processing
+    start = time.perf_counter()
+
+    if is_capture(source):
+        # Session capture sudah berisi hasil inferensi per frame
+        _, columns = read_capture(source)
+        return _signals_from_columns(columns, time.perf_counter() - start, cached=False)
+
+    cache, key = None, None
+    if not realtime and rppg_extractor is None and respirasi_extractor is None:
+        cache = InferenceCache.from_config(config)
+        key = cache.key(source, config) if cache is not None else None
+    if key is not None:
+        columns = cache.load(key)
+        if columns is not None:
+            return _signals_from_columns(columns, float(columns['extraction_time']), cached=True)
+
+    use_workers = processing.extraction_workers and rppg_extractor is None and respirasi_extractor is None
+    if not use_workers and rppg_extractor is None:
+        from rppg_signal import RPPGExtractor
+        rppg_extractor = RPPGExtractor(**processing.rppg_kwargs())
+    if not use_workers and respirasi_extractor is None:
+        from respirasi_signal import RespirasiExtractor
+        respirasi_extractor = RespirasiExtractor(**processing.respirasi_kwargs())
+
+    src = open_source(source, realtime=realtime, width=config.capture.width,
+                      height=config.capture.height, fps=config.capture.fps)
+    detect_interval = processing.detect_interval
+    collected = FrameColumns()
+    try:
+        if use_workers:
+            _extract_parallel(src, processing, collected.append)
+        else:
+            for i, (ts, frame) in enumerate(src):
+                # Sama seperti GUI: di antara inferensi, landmark terakhir dipakai ulang
+                detect = i % detect_interval == 0
+                collected.append(ts, rppg_extractor.analyze(frame, detect=detect),
+                                 respirasi_extractor.analyze(frame, detect=detect), cv2.mean(frame)[1])
+    finally:
+        src.release()
+
+    columns = collected.to_arrays(src.fps)
+    extraction_time = time.perf_counter() - start
+    if key is not None:
+        cache.store(key, columns, extraction_time)
+    return _signals_from_columns(columns, extraction_time, cached=False)
+
+
+def _signals_from_columns(columns, extraction_time, cached):
+    """Sinyal mentah dari kolom per frame (jalur yang sama untuk hasil baru dan dari cache)."""
+    roi_names = [str(name) for name in columns['roi_names']]
+    points, face = columns['points'], columns['face']
+    speeds = np.zeros(len(face))
+    for i in range(1, len(face)):
+        if face[i]:
+            speeds[i] = landmark_speed(points[i], points[i - 1] if face[i - 1] else None)
+
+    return {
+        'timestamps': columns['timestamps'],
+        'rppg_raw': columns['roi_mean'][:, roi_names.index('forehead'), 1] / 255.0,
+        'respirasi_raw': columns['pose_value'],
+        'landmark_speed': speeds,
+        'brightness': columns['brightness'],
+        'fs': float(columns['fs']),
+        'frames': len(face),
+        'extraction_time': extraction_time,
+        'cached': cached,
+    }
+
+
+def _extract_parallel(src, processing, record):
+    """
+    Ekstraksi dengan worker FaceMesh/Pose terpisah (lihat extraction_workers.py).
+    Beberapa frame diproses bersamaan (hingga jumlah slot ring), sehingga decoding frame
+    berikutnya tumpang tindih dengan inferensi; hasil dicatat sesuai urutan frame.
+    """
+    workers = None
+    in_flight = deque()
+    try:
+        for i, (ts, frame) in enumerate(src):
+            if workers is None:
+                workers = ExtractionWorkers(frame.shape, rppg_kwargs=processing.rppg_kwargs(),
+                                            respirasi_kwargs=processing.respirasi_kwargs())
+            elif frame.shape != workers.ring.shape:
+                frame = cv2.resize(frame, (workers.ring.shape[1], workers.ring.shape[0]))
+            in_flight.append((ts, cv2.mean(frame)[1],
+                              workers.submit(frame, detect=i % processing.detect_interval == 0)))
+            if len(in_flight) >= workers.slots:
+                _record_collected(workers, in_flight.popleft(), record)
+        while in_flight:
+            _record_collected(workers, in_flight.popleft(), record)
+    finally:
+        if workers is not None:
+            workers.close()
+
+
+def _record_collected(workers, item, record):
+    ts, frame_brightness, seq = item
+    face, pose, errors = workers.collect(seq)
+    for kind, error in errors.items():
+        print(f"⚠️ Extraction error ({kind}, frame {seq}): {error}")
+    record(ts, face, pose, frame_brightness)
+
+
+def analyze_signals(rppg_raw, respirasi_raw, fs, config=None, landmark_speed=None, brightness=None):
+    """
+    Memfilter kedua sinyal mentah sekaligus lalu mengestimasi HR, RR dan metrik interval.
+
+    Args:
+        rppg_raw (array-like): Sinyal rPPG mentah (NaN diisi interpolasi)
+        respirasi_raw (array-like): Sinyal respirasi mentah (NaN diisi interpolasi)
+        fs (float): Frekuensi sampling (Hz)
+        config (AppConfig | None): Konfigurasi pemrosesan; default profil "default"
+        landmark_speed (array-like | None): Kecepatan landmark wajah per sampel (deteksi artefak)
+        brightness (array-like | None): Kecerahan frame per sampel (deteksi artefak)
+
+    Returns:
+        dict: rppg_filtered dan respirasi_filtered (pada laju decimasi rppg_fs / respirasi_fs),
+        heart_rate, respiration_rate, beat_intervals, breath_intervals, hrv, breath,
+        artifact_mask (sampel laju penuh yang dieksisi) dan, jika `processing.spectrogram`,
+        rppg_spectrogram / respirasi_spectrogram (daya, waktu × frekuensi) beserta
+        *_spectrogram_times dan *_spectrogram_freqs
+    """
+    config = config or load_config()
+    flt, processing = config.filter, config.processing
+    rppg, respirasi = fill_missing(rppg_raw), fill_missing(respirasi_raw)
+    artifact_mask = np.zeros((2, len(rppg)), dtype=bool)
+    if flt.artifact_rejection:
+        rppg, artifact_mask[0] = reject_artifacts(rppg, fs, landmark_speed, brightness, **flt.artifact_kwargs())
+        respirasi, artifact_mask[1] = reject_artifacts(respirasi, fs, **flt.artifact_kwargs())
+    # Rantai multirate: setiap sinyal didecimasi ke laju yang sesuai dengan band-nya
+    rppg, rppg_fs = decimate_signal(rppg, fs, processing.rppg_rate)
+    respirasi, respirasi_fs = decimate_signal(respirasi, fs, processing.respirasi_rate)
+    rppg_filtered = preprocess_signal(rppg, rppg_fs, "rPPG", **flt.preprocess_kwargs("rPPG", rppg_fs))
+    respirasi_filtered = preprocess_signal(respirasi, respirasi_fs, "respirasi", **flt.preprocess_kwargs("respirasi", respirasi_fs))
+
+    # Analisis puncak memakai analyzer yang sama dengan GUI (seluruh sinyal sebagai satu blok)
+    rppg_band, respirasi_band = flt.band("rPPG"), flt.band("respirasi")
+    beats = IncrementalPeakAnalyzer(rppg_fs, *rppg_band, max_intervals=len(rppg_filtered) or 1)
+    breaths = IncrementalPeakAnalyzer(respirasi_fs, *respirasi_band, max_intervals=len(respirasi_filtered) or 1)
+    beats.push(rppg_filtered)
+    breaths.push(respirasi_filtered)
+
+    # Spektrogram dengan jendela/hop yang sama seperti panel GUI (sinyal decimasi sebelum filter)
+    spectrograms = {}
+    if processing.spectrogram:
+        for name, signal_type, x, rate in (("rppg", "rPPG", rppg, rppg_fs),
+                                           ("respirasi", "respirasi", respirasi, respirasi_fs)):
+            kwargs = config.spectrogram_kwargs(signal_type)
+            times, freqs, power = spectrogram(x, rate, kwargs['window'], kwargs['hop'], kwargs['band'])
+            spectrograms.update({f'{name}_spectrogram': power, f'{name}_spectrogram_times': times,
+                                 f'{name}_spectrogram_freqs': freqs})
+
+    return {
+        'rppg_filtered': rppg_filtered,
+        'respirasi_filtered': respirasi_filtered,
+        'rppg_fs': rppg_fs,
+        'respirasi_fs': respirasi_fs,
+        'heart_rate': RateTracker(rppg_band, **processing.tracker_kwargs()).update(rppg_filtered, rppg_fs),
+        'respiration_rate': RateTracker(respirasi_band, **processing.tracker_kwargs()).update(
+            respirasi_filtered, respirasi_fs),
+        'beat_intervals': np.asarray(beats.intervals),
+        'breath_intervals': np.asarray(breaths.intervals),
+        'hrv': beats.metrics(),
+        'breath': breaths.metrics(),
+        'artifact_mask': artifact_mask,
+        **spectrograms,
+    }
+
+
+def run_batch(source, fs=None, realtime=False, rppg_extractor=None, respirasi_extractor=None, config=None):
+    """
+    Menjalankan pipeline ekstraksi + filtering + estimasi pada satu sumber frame.
+
+    Args:
+        source: Spesifikasi sumber frame (lihat `frame_source.open_source`)
+        fs (float | None): Frekuensi sampling; default FPS dari sumber
+        realtime (bool): Pacing sesuai timestamp sumber
+        rppg_extractor (RPPGExtractor | None): Ekstraktor rPPG (dibuat jika None)
+        respirasi_extractor (RespirasiExtractor | None): Ekstraktor respirasi (dibuat jika None)
+        config (AppConfig | None): Konfigurasi pemrosesan; default profil "default"
+
+    Returns:
+        dict: timestamps, rppg_raw, respirasi_raw, rppg_filtered, respirasi_filtered,
+        heart_rate, respiration_rate, beat_intervals, breath_intervals, hrv (metrik SDNN,
+        RMSSD, pNN50), breath (metrik interval napas), fs, frames, cached (hasil inferensi dari
+        cache) dan processing_time (detik)
+    """
+    config = config or load_config()
+    start = time.perf_counter()
+    raw = extract_signals(source, config, realtime, rppg_extractor, respirasi_extractor)
+    fs = fs or raw['fs']
+    result = analyze_signals(raw['rppg_raw'], raw['respirasi_raw'], fs, config,
+                             raw['landmark_speed'], raw['brightness'])
+
+    return {
+        'timestamps': raw['timestamps'],
+        'rppg_raw': raw['rppg_raw'],
+        'respirasi_raw': raw['respirasi_raw'],
+        **result,
+        'fs': fs,
+        'frames': raw['frames'],
+        'cached': raw['cached'],
+        'processing_time': time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline rPPG & respiration batch runner")
+    parser.add_argument("source", help="Video file, image directory, .npz recording, .rpcap session capture "
+                                       "or webcam index")
+    parser.add_argument("--fs", type=float, default=None, help="Sampling rate override (Hz)")
+    parser.add_argument("--realtime", action="store_true", help="Pace frames at their timestamps")
+    parser.add_argument("--output", default=None, help="Save signals to this .npz file")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    result = run_batch(args.source, fs=args.fs, realtime=args.realtime, config=config_from_args(args))
+    fps = result['frames'] / result['processing_time'] if result['processing_time'] > 0 else 0
+    print(f"Frames: {result['frames']} ({fps:.1f} frames/s)")
+    if is_capture(args.source):
+        print("Inference: none (session capture)")
+    elif result['cached']:
+        print("Inference: loaded from cache")
+    print(f"Heart Rate: {result['heart_rate']:.1f} BPM")
+    print(f"Respiration Rate: {result['respiration_rate']:.1f} Breaths/min")
+    hrv = result['hrv']
+    if hrv['sdnn'] is not None:
+        print(f"HRV: SDNN {hrv['sdnn']:.1f} ms, RMSSD {hrv['rmssd']:.1f} ms, pNN50 {hrv['pnn50']:.1f}%")
+
+    if args.output:
+        np.savez(args.output, **result)
+        print(f"Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
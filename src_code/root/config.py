@@ -0,0 +1,453 @@
+"""
+Modul konfigurasi terpusat untuk semua parameter pemrosesan yang memengaruhi performa.
+
+Konfigurasi disusun bertingkat:
+1. Nilai default dataclass
+2. Profil bernama (PROFILES), misalnya "low-power-edge", "accuracy", "batch-throughput"
+3. File konfigurasi JSON (opsional), dengan struktur yang sama seperti `AppConfig.to_dict()`
+4. Override dari command line: `--set section.key=value`
+
+Konfigurasi divalidasi saat startup dan dipakai bersama oleh GUI dan batch runner.
+
+Contoh:
+    python main.py --profile low-power-edge --set capture.source=video.mp4
+    python batch_runner.py video.mp4 --profile batch-throughput --config config.json
+"""
+
+import argparse
+import json
+from dataclasses import dataclass, field, fields, asdict
+
+from stream_filter import decimation_factor
+
+
+@dataclass
+class CaptureConfig:
+    """Pengaturan sumber frame."""
+    source: object = 0          # indeks webcam, path video, folder gambar atau rekaman .npz
+    width: int = 640
+    height: int = 480
+    fps: float = 30.0           # frekuensi sampling sinyal
+
+
+KERNEL_REFERENCE_FS = 30.0     # laju acuan panjang kernel median/Savitzky-Golay (Hz)
+
+
+def _scaled_kernel(length, fs, minimum):
+    """Panjang kernel ganjil untuk laju `fs` dengan durasi sama seperti `length` pada laju acuan."""
+    if fs is None:
+        return length
+    scaled = max(minimum, int(round(length * fs / KERNEL_REFERENCE_FS)))
+    return scaled if scaled % 2 else scaled + 1
+
+
+@dataclass
+class FilterConfig:
+    """Parameter preprocessing sinyal (lihat signal_filter.preprocess_signal)."""
+    median_kernel: int = 5
+    savgol_min_window: int = 5
+    savgol_max_window: int = 11
+    savgol_poly_order: int = 3
+    bandpass_order: int = 5
+    rppg_band: tuple = (0.7, 3.0)
+    respirasi_band: tuple = (0.1, 0.5)
+    artifact_rejection: bool = True     # deteksi & eksisi artefak sebelum filtering (artifact.py)
+    artifact_threshold: float = 6.0     # ambang outlier turunan (kelipatan sigma robust)
+    motion_threshold: float = 0.05      # kecepatan landmark maksimum (fraksi lebar wajah/frame)
+    artifact_pad: float = 0.2           # perluasan mask artefak (detik)
+
+    def artifact_kwargs(self):
+        """Argumen keyword untuk `artifact.detect_artifacts` / `reject_artifacts`."""
+        return {'threshold': self.artifact_threshold, 'motion_threshold': self.motion_threshold,
+                'pad': self.artifact_pad}
+
+    def preprocess_kwargs(self, signal_type, fs=None):
+        """Argumen keyword untuk `preprocess_signal` pada satu jenis sinyal."""
+        kwargs = self.batch_kwargs(fs)
+        del kwargs['bands']
+        kwargs['band'] = self.band(signal_type)
+        return kwargs
+
+    def batch_kwargs(self, fs=None):
+        """
+        Argumen keyword untuk `preprocess_signal_batch`.
+
+        Panjang kernel (dalam sampel) ditetapkan untuk KERNEL_REFERENCE_FS; jika `fs` diberikan
+        (misalnya laju setelah decimasi), panjangnya diskalakan agar durasinya tetap sama.
+        """
+        minimum = self.savgol_poly_order + 2
+        return {
+            'kernel_size': _scaled_kernel(self.median_kernel, fs, min(3, self.median_kernel)),
+            'savgol_window': (_scaled_kernel(self.savgol_min_window, fs, minimum),
+                              _scaled_kernel(self.savgol_max_window, fs, minimum)),
+            'poly_order': self.savgol_poly_order,
+            'order': self.bandpass_order,
+            'bands': {'rppg': tuple(self.rppg_band), 'respirasi': tuple(self.respirasi_band)},
+        }
+
+    def stream_kwargs(self, fs=None):
+        """
+        Argumen keyword untuk `stream_filter.StreamingPreprocessor` (kernel diskalakan seperti
+        `batch_kwargs`; jendela Savitzky-Golay = batas atas jendela adaptif batch).
+        """
+        kwargs = self.batch_kwargs(fs)
+        return {'kernel_size': kwargs['kernel_size'], 'window_length': kwargs['savgol_window'][1],
+                'poly_order': kwargs['poly_order']}
+
+    def band(self, signal_type):
+        """Band (low, high) Hz untuk "rPPG" atau "respirasi"."""
+        return tuple(self.rppg_band if signal_type.lower() == "rppg" else self.respirasi_band)
+
+
+@dataclass
+class ProcessingConfig:
+    """Parameter ekstraksi, buffer dan loop real-time."""
+    rppg_window: float = 10.0           # panjang jendela analisis rPPG (detik)
+    respirasi_window: float = 60.0      # panjang jendela analisis respirasi (detik)
+    rppg_rate: float = 10.0             # laju sampling rPPG setelah decimasi (Hz)
+    respirasi_rate: float = 5.0         # laju sampling respirasi setelah decimasi (Hz)
+    min_plot_samples: int = 60          # sampel minimum (pada laju decimasi) sebelum plot/estimasi
+    model_complexity: int = 1           # MediaPipe Pose (0, 1, 2)
+    refine_landmarks: bool = True       # MediaPipe FaceMesh
+    inference_scale: float = 1.0        # skala resolusi frame untuk inferensi
+    pose_interval: int = 5              # Pose dijalankan setiap N frame (motion compensation)
+    detect_interval: int = 1            # inferensi landmark dijalankan setiap N frame
+    motion_compensation: bool = True    # pelacakan dada di antara deteksi Pose (sinyal: perpindahan / lebar bahu)
+    use_skin_mask: bool = True          # skin-color masking pada ROI wajah
+    extraction_workers: bool = False    # FaceMesh/Pose di proses terpisah (shared memory)
+    governor: bool = True               # governor kualitas/performa adaptif
+    spectrogram: bool = True            # panel spektrogram bergulir per sinyal
+    rppg_stft_window: float = 8.0       # jendela STFT spektrogram rPPG (detik)
+    respirasi_stft_window: float = 30.0 # jendela STFT spektrogram respirasi (detik)
+    spectrogram_hop: float = 1.0        # jarak antar kolom spektrogram (detik)
+    spectrogram_history: float = 120.0  # riwayat yang ditampilkan (detik)
+    estimator: str = "zoom"             # estimator laju: "zoom" (DFT band + pelacakan) atau "periodogram"
+    estimator_resolution: float = 0.25  # resolusi estimator zoom (BPM)
+    rate_tracking: bool = True          # batasi zoom ke lingkungan estimasi sebelumnya saat stabil
+    tracking_span: float = 6.0          # setengah lebar lingkungan pelacakan (BPM)
+    trend_points: int = 2000            # anggaran titik per panel tren sesi
+
+    def rppg_kwargs(self):
+        """Argumen keyword untuk `RPPGExtractor`."""
+        return {'refine_landmarks': self.refine_landmarks, 'inference_scale': self.inference_scale,
+                'use_skin_mask': self.use_skin_mask}
+
+    def respirasi_kwargs(self):
+        """Argumen keyword untuk `RespirasiExtractor`."""
+        return {'model_complexity': self.model_complexity, 'inference_scale': self.inference_scale,
+                'motion_compensation': self.motion_compensation, 'pose_interval': self.pose_interval}
+
+    def tracker_kwargs(self):
+        """Argumen keyword untuk `utils.RateTracker` (selain band)."""
+        return {'method': self.estimator, 'resolution': self.estimator_resolution,
+                'tracking': self.rate_tracking, 'span': self.tracking_span}
+
+
+# Field ProcessingConfig yang hanya memengaruhi analisis/tampilan, bukan hasil ekstraksi per frame
+ANALYSIS_FIELDS = ('rppg_window', 'respirasi_window', 'rppg_rate', 'respirasi_rate', 'min_plot_samples',
+                   'governor', 'spectrogram', 'rppg_stft_window', 'respirasi_stft_window',
+                   'spectrogram_hop', 'spectrogram_history', 'estimator', 'estimator_resolution',
+                   'rate_tracking', 'tracking_span', 'trend_points')
+
+
+@dataclass
+class CacheConfig:
+    """Cache hasil inferensi per frame untuk analisis ulang (lihat inference_cache.py)."""
+    enabled: bool = True
+    directory: str = "saved_signals/inference_cache"
+    max_mb: float = 2048.0              # ukuran total maksimum sebelum eviction
+
+
+@dataclass
+class AlertConfig:
+    """Aturan dan sink alert HR/RR (lihat alerts.py); `subjects` menimpa ambang per subjek."""
+    enabled: bool = True
+    hr_low: float = 45.0
+    hr_high: float = 130.0
+    rr_low: float = 8.0
+    rr_high: float = 25.0
+    hr_hysteresis: float = 3.0          # margin kembali normal (BPM)
+    rr_hysteresis: float = 1.0          # margin kembali normal (Breaths/min)
+    debounce: float = 5.0               # lama pelanggaran sebelum alert (detik)
+    clear_debounce: float = 5.0         # lama kembali normal sebelum alert dihapus (detik)
+    signal_loss: float = 5.0            # lama tanpa wajah/pose sebelum alert (detik)
+    min_quality: float = 0.0            # estimasi dengan kualitas lebih rendah diabaikan
+    max_latency: float = 0.25           # batas latensi event → notifikasi (detik)
+    log_path: str = "saved_signals/alerts.log"
+    socket_host: str = "127.0.0.1"
+    socket_port: int = 0                # 0 = sink socket UDP nonaktif
+    subjects: dict = field(default_factory=dict)    # {subjek: {hr_high: ..., ...}}
+
+    def thresholds(self, subject=None):
+        """Ambang aturan untuk subjek (default ditimpa `subjects[subject]`)."""
+        values = {k: v for k, v in asdict(self).items()
+                  if k in ('hr_low', 'hr_high', 'rr_low', 'rr_high', 'hr_hysteresis', 'rr_hysteresis',
+                           'debounce', 'clear_debounce', 'signal_loss', 'min_quality')}
+        values.update(self.subjects.get(subject, {}))
+        return values
+
+
+@dataclass
+class RecordingConfig:
+    """Perekaman sinyal dan ring riwayat pra-pemicu (lihat modules/recording.py)."""
+    duration: float = 30.0              # panjang rekaman / ekspor "terakhir N detik" (detik)
+    pre_trigger: float = 10.0           # bagian rekaman yang diambil dari sebelum tombol ditekan (detik)
+    history: float = 60.0               # panjang ring riwayat (detik), minimal `duration`
+    frame_scale: float = 0.25           # skala frame yang disimpan di ring (0 = tanpa frame)
+    frame_fps: float = 5.0              # laju frame yang disimpan di ring
+    session_capture: bool = False       # simpan landmark/statistik ROI per frame sesi live (session_capture.py)
+    capture_chunk: int = 300            # frame per chunk terkompresi session capture
+
+
+@dataclass
+class AppConfig:
+    """Konfigurasi lengkap aplikasi."""
+    profile: str = "default"
+    capture: CaptureConfig = field(default_factory=CaptureConfig)
+    filter: FilterConfig = field(default_factory=FilterConfig)
+    processing: ProcessingConfig = field(default_factory=ProcessingConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    alerts: AlertConfig = field(default_factory=AlertConfig)
+    recording: RecordingConfig = field(default_factory=RecordingConfig)
+
+    def to_dict(self):
+        return asdict(self)
+
+    def signal_rate(self, signal_type):
+        """Laju sampling efektif (Hz) setelah decimasi integer untuk "rPPG" atau "respirasi"."""
+        rate = self.processing.rppg_rate if signal_type.lower() == "rppg" else self.processing.respirasi_rate
+        return self.capture.fps / decimation_factor(self.capture.fps, rate)
+
+    def window_samples(self, signal_type):
+        """Panjang jendela analisis (sampel pada laju decimasi) untuk "rPPG" atau "respirasi"."""
+        window = self.processing.rppg_window if signal_type.lower() == "rppg" else self.processing.respirasi_window
+        return int(round(window * self.signal_rate(signal_type)))
+
+    def extraction_settings(self):
+        """Pengaturan yang memengaruhi hasil ekstraksi per frame (tanpa `capture.source`)."""
+        capture = {k: v for k, v in asdict(self.capture).items() if k != 'source'}
+        processing = {k: v for k, v in asdict(self.processing).items() if k not in ANALYSIS_FIELDS}
+        return {'capture': capture, 'processing': processing}
+
+    def spectrogram_kwargs(self, signal_type):
+        """Argumen keyword untuk `spectrogram.IncrementalSTFT` pada laju decimasi sinyal."""
+        p = self.processing
+        window = p.rppg_stft_window if signal_type.lower() == "rppg" else p.respirasi_stft_window
+        return {'fs': self.signal_rate(signal_type), 'window': window, 'hop': p.spectrogram_hop,
+                'band': self.filter.band(signal_type),
+                'columns': max(1, int(round(p.spectrogram_history / p.spectrogram_hop)))}
+
+
+# Profil bernama: override parsial terhadap nilai default
+PROFILES = {
+    "default": {},
+    "low-power-edge": {
+        "capture": {"width": 480, "height": 360},
+        "processing": {"model_complexity": 0, "refine_landmarks": False, "inference_scale": 0.5,
+                       "motion_compensation": True, "pose_interval": 10, "use_skin_mask": False,
+                       "spectrogram": False},
+        "recording": {"frame_scale": 0.0},
+    },
+    "accuracy": {
+        "processing": {"rppg_window": 20.0, "respirasi_window": 90.0, "model_complexity": 2, "refine_landmarks": True,
+                       "inference_scale": 1.0, "pose_interval": 2, "governor": False},
+    },
+    "batch-throughput": {
+        "processing": {"model_complexity": 0, "refine_landmarks": False, "inference_scale": 0.75,
+                       "pose_interval": 5, "governor": False, "spectrogram": False},
+    },
+}
+
+
+def _coerce(key, current, value):
+    """Mengubah nilai (misalnya string dari CLI) ke tipe nilai default field tersebut."""
+    if key == "source":
+        # Sumber capture: angka = indeks webcam, selain itu path
+        if isinstance(value, str) and value.isdigit():
+            return int(value)
+        return value
+    if isinstance(current, dict):
+        return json.loads(value) if isinstance(value, str) else dict(value)
+    if isinstance(current, tuple):
+        if isinstance(value, str):
+            value = value.split(",")
+        return tuple(float(v) for v in value)
+    if not isinstance(value, str):
+        return value
+    if isinstance(current, bool):
+        if value.lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"Invalid boolean value for {key}: {value}")
+    if isinstance(current, int):
+        return int(value)
+    if isinstance(current, float):
+        return float(value)
+    return value
+
+
+def _apply(config, overrides):
+    """Menerapkan dict bertingkat {section: {key: value}} ke konfigurasi."""
+    for section, values in overrides.items():
+        if section == "profile":
+            config.profile = values
+            continue
+        target = getattr(config, section, None)
+        if target is None or not isinstance(values, dict):
+            raise ValueError(f"Unknown config section: {section}")
+        names = {f.name for f in fields(target)}
+        for key, value in values.items():
+            if key not in names:
+                raise ValueError(f"Unknown config key: {section}.{key}")
+            setattr(target, key, _coerce(key, getattr(target, key), value))
+
+
+def validate(config):
+    """
+    Memvalidasi konfigurasi.
+
+    Raises:
+        ValueError: Berisi semua kesalahan yang ditemukan
+    """
+    errors = []
+    c, flt, p = config.capture, config.filter, config.processing
+    nyq = c.fps / 2
+
+    if c.fps <= 0:
+        errors.append("capture.fps must be positive")
+    if c.width <= 0 or c.height <= 0:
+        errors.append("capture.width/height must be positive")
+    for name in ("rppg_band", "respirasi_band"):
+        band = getattr(flt, name)
+        if len(band) != 2 or not 0 < band[0] < band[1]:
+            errors.append(f"filter.{name} must be (low, high) with 0 < low < high")
+        elif band[1] >= nyq:
+            errors.append(f"filter.{name} high cutoff must be below Nyquist ({nyq} Hz)")
+    if flt.median_kernel < 1 or flt.median_kernel % 2 == 0:
+        errors.append("filter.median_kernel must be a positive odd number")
+    if not 0 < flt.savgol_min_window <= flt.savgol_max_window:
+        errors.append("filter.savgol_min_window must be positive and <= savgol_max_window")
+    if flt.savgol_poly_order >= flt.savgol_min_window:
+        errors.append("filter.savgol_poly_order must be less than savgol_min_window")
+    if flt.artifact_threshold <= 0 or flt.motion_threshold <= 0 or flt.artifact_pad < 0:
+        errors.append("filter.artifact_threshold/motion_threshold must be positive and artifact_pad >= 0")
+    if not 1 <= flt.bandpass_order <= 10:
+        errors.append("filter.bandpass_order must be between 1 and 10")
+    # sosfiltfilt membutuhkan data lebih panjang dari padlen (paling banyak 3 * (2 * order + 1))
+    if p.min_plot_samples <= 3 * (2 * flt.bandpass_order + 1):
+        errors.append("processing.min_plot_samples too small for filtfilt with this bandpass_order")
+    for name in ("rppg", "respirasi"):
+        rate = getattr(p, f"{name}_rate")
+        if not 0 < rate <= c.fps:
+            errors.append(f"processing.{name}_rate must be in (0, capture.fps]")
+            continue
+        # Band harus di bawah cutoff anti-alias (0.8 × Nyquist laju decimasi)
+        if getattr(flt, f"{name}_band")[1] >= 0.4 * config.signal_rate(name):
+            errors.append(f"processing.{name}_rate too low for filter.{name}_band "
+                          f"(effective rate {config.signal_rate(name):.2f} Hz)")
+        if config.window_samples(name) < p.min_plot_samples:
+            errors.append(f"processing.{name}_window shorter than min_plot_samples at the decimated rate")
+        if getattr(p, f"{name}_stft_window") * config.signal_rate(name) < 8:
+            errors.append(f"processing.{name}_stft_window must span at least 8 samples at the decimated rate")
+    if p.model_complexity not in (0, 1, 2):
+        errors.append("processing.model_complexity must be 0, 1 or 2")
+    if not 0 < p.inference_scale <= 1:
+        errors.append("processing.inference_scale must be in (0, 1]")
+    if p.pose_interval < 1:
+        errors.append("processing.pose_interval must be >= 1")
+    if p.detect_interval < 1:
+        errors.append("processing.detect_interval must be >= 1")
+    if not 0 < p.spectrogram_hop <= p.spectrogram_history:
+        errors.append("processing.spectrogram_hop must be positive and <= spectrogram_history")
+    if p.estimator not in ("zoom", "periodogram"):
+        errors.append("processing.estimator must be 'zoom' or 'periodogram'")
+    if p.estimator_resolution <= 0 or p.tracking_span <= 0:
+        errors.append("processing.estimator_resolution and tracking_span must be positive")
+    if p.trend_points < 100:
+        errors.append("processing.trend_points must be >= 100")
+    for subject in [None, *config.alerts.subjects]:
+        try:
+            t = config.alerts.thresholds(subject)
+        except (AttributeError, TypeError):
+            errors.append("alerts.subjects must map subject names to threshold dicts")
+            break
+        unknown = set(config.alerts.subjects.get(subject, {})) - set(AlertConfig().thresholds())
+        if unknown:
+            errors.append(f"alerts.subjects[{subject}] has unknown keys: {', '.join(sorted(unknown))}")
+        elif not (t['hr_low'] < t['hr_high'] and t['rr_low'] < t['rr_high']):
+            errors.append(f"alerts thresholds{f' for {subject}' if subject else ''} must have low < high")
+    if config.alerts.max_latency <= 0:
+        errors.append("alerts.max_latency must be positive")
+    if config.cache.max_mb <= 0:
+        errors.append("cache.max_mb must be positive")
+    r = config.recording
+    if r.duration <= 0 or not 0 <= r.pre_trigger <= r.duration:
+        errors.append("recording.duration must be positive and 0 <= pre_trigger <= duration")
+    if r.history < r.duration:
+        errors.append("recording.history must be >= recording.duration")
+    if not 0 <= r.frame_scale <= 1 or r.frame_fps <= 0:
+        errors.append("recording.frame_scale must be in [0, 1] and frame_fps positive")
+    if r.capture_chunk < 1:
+        errors.append("recording.capture_chunk must be >= 1")
+
+    if errors:
+        raise ValueError("Invalid configuration:\n- " + "\n- ".join(errors))
+    return config
+
+
+def load_config(path=None, profile=None, overrides=()):
+    """
+    Membuat konfigurasi dari default, profil, file JSON dan override CLI, lalu memvalidasinya.
+
+    Args:
+        path (str | None): Path file konfigurasi JSON
+        profile (str | None): Nama profil (menimpa `profile` di file)
+        overrides (iterable[str]): Daftar "section.key=value"
+
+    Returns:
+        AppConfig: Konfigurasi yang sudah divalidasi
+    """
+    file_data = {}
+    if path:
+        with open(path) as f:
+            file_data = json.load(f)
+
+    profile = profile or file_data.get("profile", "default")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}'. Available: {', '.join(PROFILES)}")
+
+    config = AppConfig(profile=profile)
+    _apply(config, PROFILES[profile])
+    _apply(config, {k: v for k, v in file_data.items() if k != "profile"})
+
+    for item in overrides:
+        key, sep, value = item.partition("=")
+        section, dot, name = key.strip().partition(".")
+        if not sep or not dot:
+            raise ValueError(f"Override must look like section.key=value, got '{item}'")
+        _apply(config, {section: {name: value.strip()}})
+
+    return validate(config)
+
+
+def add_config_arguments(parser):
+    """Menambahkan argumen --config, --profile dan --set ke argparse parser."""
+    parser.add_argument("--config", default=None, help="Path to a JSON config file")
+    parser.add_argument("--profile", default=None, choices=sorted(PROFILES),
+                        help="Named processing profile")
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="SECTION.KEY=VALUE", help="Override a single config value")
+    return parser
+
+
+def config_from_args(args):
+    """Membuat konfigurasi dari hasil parsing `add_config_arguments`."""
+    return load_config(args.config, args.profile, args.overrides)
+
+
+def parse_args(argv=None):
+    """Parser CLI untuk aplikasi GUI."""
+    parser = add_config_arguments(argparse.ArgumentParser(description="Realtime rPPG and Respiration Rate Tracker"))
+    parser.add_argument("--subject", default="default", help="Subject name (sessions and alert thresholds)")
+    return parser.parse_args(argv)
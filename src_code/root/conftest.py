@@ -0,0 +1 @@
+# Modul aplikasi berada di folder ini (import root-level), sehingga tests/ dapat mengimpornya langsung
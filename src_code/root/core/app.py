@@ -30,16 +30,30 @@ import traceback
 import os
 import threading
 import time
+from collections import deque
 
 from respirasi_signal import RespirasiExtractor
 from rppg_signal import RPPGExtractor
 from signal_filter import apply_bandpass_filter, filter_rppg_signal, filter_respiration_signal
-from utils import estimate_heart_rate, estimate_respiration_rate
+from utils import RateTracker, estimate_heart_rate, estimate_respiration_rate
+from stream_filter import StreamingBandpass, StreamingDecimator, StreamingPreprocessor
+from hrv import IncrementalPeakAnalyzer
+from kernels import warmup as warmup_kernels
 
 from modules.layout import init_layout
 from modules.video_processing import start_video, stop_video, update_video
-from modules.recording import start_30s_recording, save_data, recording_countdown, generate_30s_plots
+from modules.recording import (start_30s_recording, save_data, recording_countdown, history_from_config,
+                               close_session_capture)
 from modules.plotting import update_plot, update_hr_plot, update_rr_plot, _plot_signal_subplot
+from modules.governor import PerformanceGovernor, quality_levels
+from modules.frame_pool import FramePool
+from modules.spectrogram_view import SpectrogramWorker
+from spectrogram import IncrementalSTFT
+from session_store import SessionStore
+from config import load_config
+from extraction_workers import ExtractionWorkers
+from alerts import engine_from_config
+from trend import MinMaxPyramid
 
 
 class RespirasiRPPGApp:
@@ -47,8 +61,13 @@ class RespirasiRPPGApp:
     Pada kode ini, kelas RespirasiRPPGApp mengatur antarmuka pengguna dan logika aplikasi.
     Kelas ini menginisialisasi komponen GUI, menangani pengambilan video, ekstraksi sinyal rPPG dan respirasi,
     
+    Args:
+        config (AppConfig | None): Konfigurasi pemrosesan (lihat config.py); default profil "default"
     """
-    def __init__(self):
+    def __init__(self, config=None, subject="default"):
+        # Konfigurasi terpusat (profil, file config, override CLI)
+        self.config = config or load_config()
+        capture, processing = self.config.capture, self.config.processing
         # Inisialisasi atribut utama aplikasi / plot heart rate dan respiration rate
         self.hr_plot = None
         self.ax_hr = None
@@ -65,39 +84,137 @@ class RespirasiRPPGApp:
         # Inisialisasi variabel untuk menangani video capture, status aplikasi, dan buffer sinyal
         # Inisialisasi variabel utama aplikasi, 
         # running : Status pengambilan video dan pemrosesan sinyal
-        # cap : Objek VideoCapture OpenCV untuk menangkap video dari kamera
+        # cap : Objek FrameSource (lihat frame_source.py) untuk menangkap video
+        # source_spec : Sumber frame (indeks webcam, path video, folder gambar, rekaman .npz)
         # fps : Frame per detik untuk video
-        # buffer_max : Ukuran maksimum buffer untuk menyimpan sinyal
+        # rppg_fs, respirasi_fs : Laju sampling buffer analisis setelah decimasi
+        # rppg_buffer_max, respirasi_buffer_max : Panjang jendela analisis per sinyal (sampel)
         self.running = False
         self.cap = None
-        self.fps = 30
-        self.buffer_max = 300
+        self.source_spec = capture.source
+        self.fps = capture.fps
+        self.rppg_fs = self.config.signal_rate("rPPG")
+        self.respirasi_fs = self.config.signal_rate("respirasi")
+        self.rppg_buffer_max = self.config.window_samples("rPPG")
+        self.respirasi_buffer_max = self.config.window_samples("respirasi")
 
         # Inisialisasi objek ekstraktor sinyal rPPG dan respirasi
+        # Dengan extraction_workers, ekstraktor berjalan di proses worker dan atribut
+        # rppg_extractor/respirasi_extractor berupa proxy (hanya untuk configure)
         # Jika terjadi error saat inisialisasi, tampilkan pesan error
+        respirasi_kwargs = processing.respirasi_kwargs()
+        rppg_kwargs = processing.rppg_kwargs()
+        self.extraction_workers = None
         try:
-            self.respirasi_extractor = RespirasiExtractor()
-            self.rppg_extractor = RPPGExtractor()
+            if processing.extraction_workers:
+                self.extraction_workers = ExtractionWorkers((capture.height, capture.width, 3),
+                                                            rppg_kwargs=rppg_kwargs,
+                                                            respirasi_kwargs=respirasi_kwargs)
+                self.respirasi_extractor = self.extraction_workers.respirasi_extractor
+                self.rppg_extractor = self.extraction_workers.rppg_extractor
+            else:
+                self.respirasi_extractor = RespirasiExtractor(**respirasi_kwargs)
+                self.rppg_extractor = RPPGExtractor(**rppg_kwargs)
         except Exception as e:
             messagebox.showerror("Initialization Error", f"Failed to initialize extractors: {str(e)}")
             return
 
+        # Pool buffer frame (resize, RGB, overlay, tampilan) yang dipakai ulang setiap frame
+        self.frame_pool = FramePool(capture.width, capture.height)
+
+        # Governor performa: menyesuaikan kualitas inferensi agar tetap dalam budget frame
+        # (level 0 = pengaturan dari konfigurasi)
+        self.governor = PerformanceGovernor(
+            target_ms=1000 / self.fps,
+            levels=quality_levels(processing.inference_scale, processing.model_complexity,
+                                  processing.refine_landmarks, processing.detect_interval),
+            enabled=processing.governor,
+        )
+
         # Inisialisasi buffer untuk menyimpan sinyal rPPG dan respirasi
+        # Rantai multirate: sampel per frame melewati lowpass anti-alias lalu didecimasi
+        # ke laju yang sesuai dengan band-nya (misalnya 10 Hz rPPG, 5 Hz respirasi), sehingga
+        # jendela respirasi yang panjang tetap murah untuk difilter dan di-FFT
         self.respirasi_buffer = []
         self.rppg_buffer = []
+        self.rppg_decimator = StreamingDecimator(self.fps, processing.rppg_rate)
+        self.respirasi_decimator = StreamingDecimator(self.fps, processing.respirasi_rate)
+        # Median → Savitzky-Golay rPPG dijalankan per sampel decimasi (biaya per frame konstan);
+        # plot hanya menjalankan bandpass pada buffer yang sudah dihaluskan. Buffer ini tertunda
+        # `rppg_preprocessor.delay` sampel terhadap rppg_buffer.
+        self.rppg_preprocessor = StreamingPreprocessor(**self.config.filter.stream_kwargs(self.rppg_fs))
+        self.rppg_smoothed_buffer = []
         
         self.raw_rgb_buffer = []
         self.respirasi_raw_buffer = []
-        # Inisialisasi variabel untuk status perekaman (30 detik)
+
+        # Buffer pendamping rppg_buffer (sejajar per sampel decimasi) untuk deteksi artefak:
+        # kecepatan landmark wajah maksimum per blok decimasi dan kecerahan seluruh frame.
+        # Panjangnya rppg_companion_max (jendela + delay preprocessor) agar tetap mencakup
+        # seluruh rppg_smoothed_buffer.
+        self.rppg_companion_max = self.rppg_buffer_max + self.rppg_preprocessor.delay
+        self.rppg_motion_buffer = []
+        self.brightness_buffer = []
+        self.brightness_decimator = StreamingDecimator(self.fps, processing.rppg_rate)
+        self.rppg_block_speed = 0.0
+        self.prev_face_points = None
+        # Riwayat 2 detik pada laju frame penuh untuk deteksi artefak streaming,
+        # dan status artefak per sinyal ('rppg', 'respirasi') untuk reset state filter kausal
+        recent = int(2 * self.fps)
+        self.recent_samples = {key: deque(maxlen=recent) for key in ('rppg', 'respirasi', 'speed', 'brightness')}
+        self.artifact_active = {}
+
+        # Analisis domain waktu (puncak, IBI, HRV) yang berjalan per sampel baru,
+        # dengan bandpass kausal karena filtfilt membutuhkan seluruh buffer
+        rppg_band = self.config.filter.band("rPPG")
+        respirasi_band = self.config.filter.band("respirasi")
+        self.rppg_stream_filter = StreamingBandpass(*rppg_band, self.fps, order=self.config.filter.bandpass_order)
+        self.respirasi_stream_filter = StreamingBandpass(*respirasi_band, self.fps,
+                                                         order=self.config.filter.bandpass_order)
+        self.hr_peaks = IncrementalPeakAnalyzer(self.fps, *rppg_band)
+        self.rr_peaks = IncrementalPeakAnalyzer(self.fps, *respirasi_band)
+        # Kernel per sampel dikompilasi sekarang (jika Numba terpasang), bukan saat frame pertama
+        warmup_kernels()
+        # Estimasi laju pada plot: DFT terbatas band dengan pelacakan per sinyal
+        self.hr_tracker = RateTracker(rppg_band, **processing.tracker_kwargs())
+        self.rr_tracker = RateTracker(respirasi_band, **processing.tracker_kwargs())
+        # Spektrogram bergulir per sinyal dari sampel decimasi, dihitung di thread sendiri
+        self.spectrogram_worker = None
+        self.spectrogram_panels = {}
+        if processing.spectrogram:
+            self.spectrogram_worker = SpectrogramWorker({
+                'rppg': IncrementalSTFT(**self.config.spectrogram_kwargs("rPPG")),
+                'respirasi': IncrementalSTFT(**self.config.spectrogram_kwargs("respirasi")),
+            })
+        # Inisialisasi variabel untuk status perekaman (default 30 detik)
+        # recording_trigger : timestamp sumber saat tombol rekam ditekan
+        # recording_pre_trigger : detik rekaman yang diambil dari sebelum pemicu
         self.recording_30s = False
         self.recording_start_time = None
-        self.recording_data = {
-            'raw_rgb': [],
-            'rppg_filtered': [],
-            'respirasi_raw': [],
-            'respirasi_filtered': [],
-            'timestamps': []
-        }
+        self.recording_trigger = None
+        self.recording_pre_trigger = 0.0
+        # Ring riwayat per frame (sinyal sejajar + frame diperkecil) yang diisi terus-menerus,
+        # dialokasikan sekali; rekaman dan ekspor "terakhir N detik" disalin dari sini
+        self.signal_history = history_from_config(self.config, self.fps)
+        # Session capture (.rpcap) sesi live, dibuka saat feed dimulai jika recording.session_capture aktif
+        self.session_capture = None
+        # Basis data sesi: indeks sesi, segmen rekaman dan ringkasan HR/RR per detik
+        # subject : nama subjek yang sedang dipantau
+        # latest_rates : estimasi terakhir per plot, {'BPM': (rate, quality), 'Breaths/min': ...}
+        self.subject = subject
+        self.session_store = SessionStore(os.path.join("saved_signals", "sessions.db"))
+        self.session_id = None
+        self.latest_rates = {}
+        self.last_summary_time = 0.0
+        # Engine alert HR/RR dan kehilangan sinyal (ambang per subjek, notifikasi di thread sendiri)
+        # alert_text : daftar alert aktif untuk label status
+        self.alert_engine = engine_from_config(self.config.alerts, self.subject)
+        self.alert_text = tk.StringVar(value="")
+        # Tren HR/RR sepanjang sesi (piramida min/max, waktu relatif terhadap session_start)
+        self.trends = {'hr': MinMaxPyramid(), 'rr': MinMaxPyramid()}
+        self.session_start = None
+        self.trend_window = None
+
         # Inisialisasi variabel untuk menyimpan nilai heart rate dan respiration rate
         self.hr_label_text = tk.StringVar(value="-- BPM")
         self.rr_label_text = tk.StringVar(value="-- Breaths/min")
@@ -124,10 +241,21 @@ class RespirasiRPPGApp:
         """
         Membersihkan resource saat aplikasi ditutup.
 
-        Melepas objek video capture dan menutup semua jendela OpenCV.
+        Melepas objek video capture, menghentikan worker ekstraksi, spektrogram dan alert, menutup
+        session capture, sesi dan basis data, serta menutup semua jendela OpenCV.
         """
         if self.cap:
             self.cap.release()
+        if self.extraction_workers is not None:
+            self.extraction_workers.close()
+        if self.spectrogram_worker is not None:
+            self.spectrogram_worker.close()
+        if self.alert_engine is not None:
+            self.alert_engine.close()
+        close_session_capture(self)
+        if self.session_id:
+            self.session_store.end_session(self.session_id)
+        self.session_store.close()
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
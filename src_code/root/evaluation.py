@@ -0,0 +1,483 @@
+"""
+Harness evaluasi akurasi vs biaya komputasi terhadap sinyal referensi.
+
+Menjalankan pipeline (ekstraksi → filtering → estimasi spektral per jendela) pada dataset
+klip dengan referensi HR/RR, untuk setiap titik dalam grid konfigurasi (lihat config.py),
+lalu melaporkan MAE, RMSE dan korelasi Pearson bersama throughput terukur. Titik yang
+Pareto-optimal (tidak ada titik lain yang lebih akurat sekaligus lebih cepat) ditandai.
+
+Dataset:
+- Folder klip: setiap klip (video, folder gambar atau rekaman .npz) memiliki file referensi
+  `<nama>.ref.json` berisi {"heart_rate": 72, "respiration_rate": 15} atau deret per detik
+  {"heart_rate": [...], "respiration_rate": [...], "reference_fs": 1.0}. Kunci "source"
+  opsional menunjuk path klip secara eksplisit.
+- Generator sintetis (`synthesize_clip`): sinyal rPPG/respirasi mentah dengan HR/RR yang
+  bervariasi, drift iluminasi, noise dan sampel hilang; berjalan sepenuhnya offline tanpa
+  kamera maupun model MediaPipe (parameter ekstraksi tidak berpengaruh).
+
+Titik konfigurasi dikelompokkan berdasarkan parameter ekstraksi, sehingga setiap klip cukup
+diekstraksi sekali per kelompok; kelompok dijalankan paralel di beberapa proses.
+
+Contoh:
+    python evaluation.py --synthetic 8 --sweep filter.bandpass_order 3 4 5 --sweep processing.respirasi_window 20 30 60
+    python evaluation.py --dataset clips/ --sweep processing.inference_scale 0.5 1.0 --sweep processing.detect_interval 1 3 --workers 2
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_runner import extract_signals, fill_missing
+from artifact import reject_artifacts
+from config import ANALYSIS_FIELDS, add_config_arguments, load_config
+from signal_filter import decimate_signal, preprocess_signal_batch
+from utils import RateTracker
+
+
+Clip = namedtuple('Clip', ['name', 'source', 'reference'])
+
+
+# === Dataset ===
+
+def synthesize_clip(duration=60.0, fs=30.0, heart_rate=72.0, respiration_rate=15.0,
+                    noise=0.002, missing=0.01, artifacts=2, seed=None):
+    """
+    Membuat sinyal mentah sintetis beserta referensi per detik.
+
+    HR dan RR berjalan acak (random walk halus) di sekitar nilai awal; sinyal rPPG berisi
+    fundamental + harmonik kedua, modulasi amplitudo oleh napas, drift iluminasi lambat dan
+    noise putih. Sinyal respirasi berisi gerak napas, sway lambat dan noise. Artefak berupa
+    lompatan iluminasi (terlihat juga di kecerahan frame) dan gerakan kepala singkat
+    (terlihat di kecerahan ROI dan kecepatan landmark).
+
+    Args:
+        duration (float): Durasi klip (detik)
+        fs (float): Frekuensi sampling (Hz)
+        heart_rate (float): Heart rate awal (bpm)
+        respiration_rate (float): Respiration rate awal (breaths/min)
+        noise (float): Standar deviasi noise rPPG (satuan intensitas 0–1)
+        missing (float): Proporsi sampel hilang (NaN, misalnya wajah tidak terdeteksi)
+        artifacts (int): Jumlah artefak (bergantian iluminasi dan gerakan)
+        seed (int | None): Seed generator acak
+
+    Returns:
+        dict: timestamps, rppg_raw, respirasi_raw, landmark_speed, brightness, fs, frames,
+        extraction_time (0) dan reference {'heart_rate', 'respiration_rate', 'reference_fs'}
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration * fs)
+    t = np.arange(n) / fs
+
+    def trajectory(base, spread, lo, hi):
+        # Random walk yang dihaluskan (~10 detik) agar perubahan laju realistis
+        walk = np.cumsum(rng.normal(0, 1, n))
+        kernel = np.ones(int(10 * fs)) / int(10 * fs)
+        walk = np.convolve(walk - walk.mean(), kernel, mode='same')
+        scale = np.abs(walk).max() or 1.0
+        return np.clip(base + spread * walk / scale, lo, hi)
+
+    hr = trajectory(heart_rate, 8.0, 45.0, 170.0)
+    rr = trajectory(respiration_rate, 3.0, 7.0, 28.0)
+    hr_phase = 2 * np.pi * np.cumsum(hr / 60.0) / fs
+    rr_phase = 2 * np.pi * np.cumsum(rr / 60.0) / fs
+
+    breath = np.sin(rr_phase)
+    pulse = np.sin(hr_phase) + 0.4 * np.sin(2 * hr_phase + 0.5)
+    illumination = 0.01 * np.sin(2 * np.pi * 0.02 * t + rng.uniform(0, 2 * np.pi))
+    rppg = 0.5 + illumination + 0.004 * (1 + 0.2 * breath) * pulse + rng.normal(0, noise, n)
+
+    sway = 0.005 * np.sin(2 * np.pi * 0.03 * t + rng.uniform(0, 2 * np.pi))
+    respirasi = 0.02 * breath + sway + rng.normal(0, 0.002, n)
+
+    brightness = 120.0 + 60.0 * illumination + rng.normal(0, 0.2, n)
+    speed = np.abs(rng.normal(0, 0.003, n))
+    for i, at in enumerate(rng.integers(int(fs), max(int(fs) + 1, n - int(fs)), artifacts)):
+        if i % 2 == 0:
+            # Lampu menyala/mati: lompatan level di ROI dan seluruh frame
+            step = rng.choice([-1, 1]) * rng.uniform(0.02, 0.06)
+            rppg[at:] += step
+            brightness[at:] += step * 300
+        else:
+            # Kepala menoleh ~0.5 detik: bayangan di ROI dan landmark bergerak cepat
+            length = int(0.5 * fs)
+            rppg[at:at + length] += rng.uniform(0.02, 0.05) * np.hanning(length)[:len(rppg[at:at + length])]
+            speed[at:at + length] += 0.15
+
+    lost = rng.random(n) < missing
+    rppg[lost] = np.nan
+    respirasi[lost] = np.nan
+
+    seconds = n // int(fs)
+    per_second = lambda x: x[:seconds * int(fs)].reshape(seconds, int(fs)).mean(axis=1)
+    return {
+        'timestamps': t,
+        'rppg_raw': rppg,
+        'respirasi_raw': respirasi,
+        'landmark_speed': speed,
+        'brightness': brightness,
+        'fs': fs,
+        'frames': n,
+        'extraction_time': 0.0,
+        'reference': {'heart_rate': per_second(hr), 'respiration_rate': per_second(rr), 'reference_fs': 1.0},
+    }
+
+
+def synthetic_dataset(count=8, duration=60.0, fs=30.0, seed=0):
+    """
+    Membuat dataset klip sintetis dengan HR 55–110 bpm dan RR 8–24 breaths/min.
+
+    Returns:
+        list[Clip]: Klip dengan source berupa dict sinyal mentah
+    """
+    rng = np.random.default_rng(seed)
+    clips = []
+    for i in range(count):
+        raw = synthesize_clip(duration, fs, heart_rate=rng.uniform(55, 110),
+                              respiration_rate=rng.uniform(8, 24), seed=seed * 1000 + i)
+        clips.append(Clip(f"synthetic_{i:02d}", raw, raw.pop('reference')))
+    return clips
+
+
+def load_dataset(directory):
+    """
+    Memuat klip dari folder berdasarkan file referensi `<nama>.ref.json`.
+
+    Args:
+        directory (str): Folder dataset
+
+    Returns:
+        list[Clip]: Klip dengan source berupa path (dibaca lewat frame_source)
+    """
+    clips = []
+    for ref_path in sorted(glob.glob(os.path.join(directory, "*.ref.json"))):
+        with open(ref_path) as f:
+            reference = json.load(f)
+        stem = ref_path[:-len(".ref.json")]
+        source = reference.pop('source', None)
+        if source is not None:
+            source = os.path.join(directory, source)
+        else:
+            # Klip bernama sama: file "<nama>.<ext>" atau folder gambar "<nama>"
+            candidates = [p for p in glob.glob(glob.escape(stem) + ".*") if p != ref_path]
+            if os.path.isdir(stem):
+                candidates.insert(0, stem)
+            if not candidates:
+                print(f"⚠️ No clip found for reference {ref_path}, skipped.")
+                continue
+            source = candidates[0]
+        clips.append(Clip(os.path.basename(stem), source, reference))
+    return clips
+
+
+def reference_values(reference, key, starts, ends):
+    """
+    Nilai referensi rata-rata untuk setiap jendela [start, end) dalam detik.
+
+    Args:
+        reference (dict): Referensi klip (skalar atau deret dengan `reference_fs`)
+        key (str): 'heart_rate' atau 'respiration_rate'
+        starts, ends (np.ndarray): Batas jendela (detik)
+
+    Returns:
+        np.ndarray: Nilai referensi per jendela (NaN jika tidak tersedia)
+    """
+    value = reference.get(key)
+    if value is None:
+        return np.full(len(starts), np.nan)
+    if np.isscalar(value):
+        return np.full(len(starts), float(value))
+
+    series = np.asarray(value, dtype=float)
+    ref_fs = reference.get('reference_fs', 1.0)
+    out = np.full(len(starts), np.nan)
+    for i, (a, b) in enumerate(zip(starts, ends)):
+        segment = series[int(a * ref_fs):max(int(a * ref_fs) + 1, int(np.ceil(b * ref_fs)))]
+        if len(segment) and not np.all(np.isnan(segment)):
+            out[i] = np.nanmean(segment)
+    return out
+
+
+# === Evaluasi ===
+
+def windowed_estimates(rppg_raw, respirasi_raw, fs, config, hop=1.0, landmark_speed=None, brightness=None):
+    """
+    Estimasi HR/RR pada jendela geser seperti GUI, satu estimasi per `hop` detik.
+
+    Artefak dieksisi sekali pada seluruh sinyal (laju penuh), lalu setiap sinyal didecimasi
+    ke lajunya sendiri dan dipotong menjadi jendela dengan panjang masing-masing
+    (`processing.rppg_window` / `respirasi_window`); semua jendela satu sinyal difilter
+    dalam satu panggilan `preprocess_signal_batch`.
+
+    Returns:
+        dict: {'rPPG': (starts, ends, rates), 'respirasi': (starts, ends, rates)}, waktu dalam detik
+    """
+    flt = config.filter
+    rppg = fill_missing(rppg_raw)
+    respirasi = fill_missing(respirasi_raw)
+    if flt.artifact_rejection:
+        rppg, _ = reject_artifacts(rppg, fs, landmark_speed, brightness, **flt.artifact_kwargs())
+        respirasi, _ = reject_artifacts(respirasi, fs, **flt.artifact_kwargs())
+
+    processing = config.processing
+    return {
+        "rPPG": _windowed_rates(rppg, fs, "rPPG", processing.rppg_rate, processing.rppg_window, config, hop),
+        "respirasi": _windowed_rates(respirasi, fs, "respirasi", processing.respirasi_rate,
+                                     processing.respirasi_window, config, hop),
+    }
+
+
+def _windowed_rates(signal, fs, signal_type, rate, window_s, config, hop):
+    x, fs_d = decimate_signal(signal, fs, rate)
+    n = len(x)
+    window = min(int(round(window_s * fs_d)), n)
+    if window < config.processing.min_plot_samples:
+        empty = np.empty(0)
+        return empty, empty, empty
+
+    step = max(1, int(round(hop * fs_d)))
+    ends = np.arange(window, n + 1, step)
+    idx = ends[:, None] - window + np.arange(window)
+    flt = config.filter
+    filtered = preprocess_signal_batch(x[idx], fs_d, signal_type, **flt.batch_kwargs(fs_d))
+
+    # Jendela berurutan memakai satu tracker, seperti estimasi berulang pada GUI
+    tracker = RateTracker(flt.band(signal_type), **config.processing.tracker_kwargs())
+    rates = np.array([tracker.update(row, fs_d) for row in filtered], dtype=float)
+    return (ends - window) / fs_d, ends / fs_d, rates
+
+
+def error_metrics(estimates, references):
+    """
+    MAE, RMSE dan korelasi Pearson antara estimasi dan referensi (NaN diabaikan).
+
+    Returns:
+        dict: 'mae', 'rmse', 'corr' (None jika tidak terdefinisi) dan 'n'
+    """
+    estimates = np.asarray(estimates, dtype=float)
+    references = np.asarray(references, dtype=float)
+    valid = ~(np.isnan(estimates) | np.isnan(references))
+    est, ref = estimates[valid], references[valid]
+    metrics = {'mae': None, 'rmse': None, 'corr': None, 'n': int(valid.sum())}
+    if len(est) == 0:
+        return metrics
+    err = est - ref
+    metrics['mae'] = float(np.mean(np.abs(err)))
+    metrics['rmse'] = float(np.sqrt(np.mean(err ** 2)))
+    if len(est) >= 2 and np.std(est) > 0 and np.std(ref) > 0:
+        metrics['corr'] = float(np.corrcoef(est, ref)[0, 1])
+    return metrics
+
+
+def _extraction_key(config):
+    """Kunci parameter yang memengaruhi ekstraksi (klip cukup diekstraksi sekali per kunci)."""
+    return json.dumps(config.extraction_settings(), sort_keys=True, default=str)
+
+
+def _extraction_key_field(key):
+    """True jika "section.key" adalah parameter ekstraksi (capture/processing per frame)."""
+    section, _, name = key.partition(".")
+    return (section == "capture" and name != "source") or (section == "processing" and name not in ANALYSIS_FIELDS)
+
+
+def _evaluate_group(clips, configs):
+    """
+    Mengevaluasi beberapa konfigurasi yang berbagi parameter ekstraksi (dijalankan di worker).
+
+    Returns:
+        list[dict]: Hasil per konfigurasi, urutan sama dengan `configs`
+    """
+    collected = [{'hr_est': [], 'hr_ref': [], 'rr_est': [], 'rr_ref': [],
+                  'frames': 0, 'duration': 0.0, 'compute_time': 0.0} for _ in configs]
+
+    for clip in clips:
+        raw = clip.source if isinstance(clip.source, dict) else extract_signals(clip.source, configs[0])
+        fs = raw['fs']
+        for acc, config in zip(collected, configs):
+            start = time.perf_counter()
+            windows = windowed_estimates(raw['rppg_raw'], raw['respirasi_raw'], fs, config,
+                                         landmark_speed=raw.get('landmark_speed'),
+                                         brightness=raw.get('brightness'))
+            # Setiap konfigurasi menanggung biaya ekstraksi penuh, seperti saat dijalankan sendiri
+            acc['compute_time'] += raw['extraction_time'] + time.perf_counter() - start
+            acc['frames'] += raw['frames']
+            acc['duration'] += raw['frames'] / fs
+            starts, ends, hr = windows["rPPG"]
+            acc['hr_est'].append(hr)
+            acc['hr_ref'].append(reference_values(clip.reference, 'heart_rate', starts, ends))
+            starts, ends, rr = windows["respirasi"]
+            acc['rr_est'].append(rr)
+            acc['rr_ref'].append(reference_values(clip.reference, 'respiration_rate', starts, ends))
+
+    results = []
+    for acc in collected:
+        hr = error_metrics(np.concatenate(acc['hr_est']), np.concatenate(acc['hr_ref']))
+        rr = error_metrics(np.concatenate(acc['rr_est']), np.concatenate(acc['rr_ref']))
+        compute = acc['compute_time']
+        results.append({
+            **{f"hr_{k}": v for k, v in hr.items()},
+            **{f"rr_{k}": v for k, v in rr.items()},
+            'throughput': acc['frames'] / compute if compute > 0 else None,    # frame per detik
+            'realtime_factor': acc['duration'] / compute if compute > 0 else None,
+            'compute_time': compute,
+        })
+    return results
+
+
+def sweep_points(sweep):
+    """
+    Grid kartesian dari daftar sweep.
+
+    Args:
+        sweep (list[tuple[str, list]]): [("section.key", [nilai, ...]), ...]
+
+    Returns:
+        list[list[str]]: Daftar override "section.key=value" per titik grid
+    """
+    if not sweep:
+        return [[]]
+    keys = [key for key, _ in sweep]
+    return [[f"{k}={v}" for k, v in zip(keys, combo)]
+            for combo in itertools.product(*(values for _, values in sweep))]
+
+
+def run_evaluation(clips, sweep=(), config_path=None, profile=None, overrides=(), workers=1):
+    """
+    Mengevaluasi seluruh titik grid konfigurasi pada dataset.
+
+    Args:
+        clips (list[Clip]): Dataset (lihat `load_dataset` / `synthetic_dataset`)
+        sweep (list[tuple[str, list]]): Parameter yang di-sweep
+        config_path (str | None): File konfigurasi dasar
+        profile (str | None): Profil dasar
+        overrides (iterable[str]): Override dasar "section.key=value"
+        workers (int): Jumlah proses paralel (1 = di proses ini)
+
+    Returns:
+        list[dict]: Hasil per titik: 'overrides', metrik HR/RR, throughput dan 'pareto'
+    """
+    points, configs = [], []
+    for point in sweep_points(sweep):
+        try:
+            configs.append(load_config(config_path, profile, list(overrides) + point))
+            points.append(point)
+        except ValueError as e:
+            print(f"⚠️ Skipping {point}: {e}")
+
+    # Kelompokkan titik dengan parameter ekstraksi sama agar klip diekstraksi sekali per kelompok
+    groups = {}
+    for i, config in enumerate(configs):
+        groups.setdefault(_extraction_key(config), []).append(i)
+    group_indices = list(groups.values())
+    group_configs = [[configs[i] for i in indices] for indices in group_indices]
+
+    if workers > 1 and len(group_indices) > 1:
+        # Catatan: throughput diukur saat proses berjalan bersamaan (bersaing CPU)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            group_results = list(pool.map(_evaluate_group, [clips] * len(group_configs), group_configs))
+    else:
+        group_results = [_evaluate_group(clips, cfgs) for cfgs in group_configs]
+
+    results = [None] * len(configs)
+    for indices, group in zip(group_indices, group_results):
+        for i, result in zip(indices, group):
+            results[i] = {'overrides': points[i], **result}
+
+    front = set(pareto_front(results))
+    for i, result in enumerate(results):
+        result['pareto'] = i in front
+    return results
+
+
+def pareto_front(results, objectives=(('hr_mae', 'min'), ('rr_mae', 'min'), ('throughput', 'max'))):
+    """
+    Indeks hasil yang tidak didominasi (tidak ada hasil lain yang sama atau lebih baik
+    di semua objektif dan lebih baik di salah satunya). Nilai None dianggap terburuk.
+
+    Returns:
+        list[int]: Indeks hasil Pareto-optimal
+    """
+    def score(result):
+        # Semua objektif diubah menjadi "lebih kecil lebih baik"
+        values = []
+        for key, sense in objectives:
+            value = result.get(key)
+            if value is None:
+                values.append(np.inf)
+            else:
+                values.append(value if sense == 'min' else -value)
+        return np.array(values)
+
+    scores = [score(r) for r in results]
+    front = []
+    for i, si in enumerate(scores):
+        dominated = any(np.all(sj <= si) and np.any(sj < si) for j, sj in enumerate(scores) if j != i)
+        if not dominated:
+            front.append(i)
+    return front
+
+
+def _fmt(value, spec=".2f"):
+    return "--" if value is None else format(value, spec)
+
+
+def print_report(results):
+    """Menampilkan tabel hasil; titik Pareto-optimal ditandai '*'."""
+    print(f"{'':2}{'HR MAE':>8}{'HR RMSE':>9}{'HR r':>7}{'RR MAE':>8}{'RR RMSE':>9}{'RR r':>7}"
+          f"{'frames/s':>10}{'x RT':>8}  config")
+    for r in sorted(results, key=lambda r: (not r['pareto'], r['hr_mae'] if r['hr_mae'] is not None else np.inf)):
+        print(f"{'*' if r['pareto'] else ' ':2}{_fmt(r['hr_mae']):>8}{_fmt(r['hr_rmse']):>9}{_fmt(r['hr_corr']):>7}"
+              f"{_fmt(r['rr_mae']):>8}{_fmt(r['rr_rmse']):>9}{_fmt(r['rr_corr']):>7}"
+              f"{_fmt(r['throughput'], '.0f'):>10}{_fmt(r['realtime_factor'], '.1f'):>8}  "
+              f"{' '.join(r['overrides']) or '(base)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy-vs-cost evaluation of processing configurations")
+    data = parser.add_mutually_exclusive_group(required=True)
+    data.add_argument("--dataset", help="Directory of clips with <name>.ref.json reference files")
+    data.add_argument("--synthetic", type=int, metavar="N", help="Evaluate on N synthetic clips")
+    parser.add_argument("--duration", type=float, default=60.0, help="Synthetic clip duration (s)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic dataset seed")
+    parser.add_argument("--sweep", nargs="+", action="append", default=[], metavar=("SECTION.KEY", "VALUE"),
+                        help="Sweep a config value over several values, e.g. --sweep filter.bandpass_order 3 4 5")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes")
+    parser.add_argument("--output", default=None, help="Save results to this JSON file")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    sweep = []
+    for item in args.sweep:
+        if len(item) < 2:
+            parser.error(f"--sweep needs a key and at least one value, got {item}")
+        sweep.append((item[0], item[1:]))
+
+    if args.dataset:
+        clips = load_dataset(args.dataset)
+    else:
+        base = load_config(args.config, args.profile, args.overrides)
+        clips = synthetic_dataset(args.synthetic, args.duration, base.capture.fps, args.seed)
+        extraction = [key for key, _ in sweep if _extraction_key_field(key)]
+        if extraction:
+            print(f"⚠️ Synthetic clips skip frame extraction; {', '.join(extraction)} has no effect.")
+    if not clips:
+        parser.error("No clips to evaluate")
+
+    results = run_evaluation(clips, sweep, args.config, args.profile, args.overrides, args.workers)
+    print(f"Clips: {len(clips)}, configurations: {len(results)}")
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Backend ekstraksi multiproses dengan handoff frame melalui shared memory.
+
+FaceMesh (rPPG) dan Pose (respirasi) masing-masing berjalan di proses sendiri, sehingga
+inferensi keduanya berjalan paralel di core berbeda dan tidak berebut GIL dengan loop GUI.
+Frame ditulis sekali ke ring slot frame di `multiprocessing.shared_memory` yang
+dialokasikan di awal; worker membaca slot yang sama tanpa pickling. Yang dikirim lewat
+antrean hanya nomor slot dan hasil kecil (landmark, poligon, ROIStats, nilai respirasi).
+
+Kelas:
+- SharedFrameRing: Ring slot frame berukuran tetap di shared memory.
+- ExtractionWorkers: Mengelola kedua proses worker, `submit`/`collect` per frame dan
+  proxy `rppg_extractor`/`respirasi_extractor` yang meneruskan `configure` dan
+  `reset_signal` ke worker (sehingga governor performa tetap dapat mengubah pengaturan
+  inferensi dan sinyal respirasi dimulai dari nol pada setiap sesi).
+"""
+
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+FACE = "face"
+POSE = "pose"
+
+_STARTUP_TIMEOUT = 120.0    # detik; pembuatan model MediaPipe bisa lambat
+_RESULT_TIMEOUT = 10.0
+
+
+class SharedFrameRing:
+    """
+    Ring slot frame uint8 di shared memory.
+
+    Args:
+        slots (int): Jumlah slot frame
+        shape (tuple): Bentuk frame (tinggi, lebar, kanal)
+        name (str | None): Nama blok shared memory yang sudah ada (None = buat baru)
+    """
+    def __init__(self, slots, shape, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        size = slots * int(np.prod(self.shape))
+        self._owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=size)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, slot, frame):
+        """Menyalin frame ke slot (satu-satunya salinan frame di jalur ini)."""
+        np.copyto(self.frames[slot], frame)
+
+    def view(self, slot):
+        """View numpy (tanpa salinan) ke frame di slot."""
+        return self.frames[slot]
+
+    def close(self):
+        """Melepas mapping; pemilik juga menghapus blok shared memory."""
+        self.frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _create_extractor(kind, kwargs):
+    if kind == FACE:
+        from rppg_signal import RPPGExtractor
+        return RPPGExtractor(**kwargs)
+    from respirasi_signal import RespirasiExtractor
+    return RespirasiExtractor(**kwargs)
+
+
+def _worker_main(kind, factory, kwargs, ring_name, slots, shape, requests, results):
+    """
+    Loop proses worker: membaca nomor slot dari antrean, menjalankan `analyze` pada view
+    shared memory, dan mengirim hasil kecil kembali.
+
+    Pesan masuk: ('frame', seq, slot, detect), ('configure', kwargs), ('reset_signal',)
+    atau None (berhenti).
+    Pesan keluar: (kind, seq, result, error); seq None untuk status startup.
+    """
+    try:
+        ring = SharedFrameRing(slots, shape, name=ring_name)
+        extractor = factory(**kwargs) if factory is not None else _create_extractor(kind, kwargs)
+    except Exception as e:
+        results.put((kind, None, None, f"{type(e).__name__}: {e}"))
+        return
+    results.put((kind, None, True, None))
+
+    try:
+        while True:
+            message = requests.get()
+            if message is None:
+                break
+            if message[0] == 'configure':
+                extractor.configure(**message[1])
+                continue
+            if message[0] == 'reset_signal':
+                extractor.reset_signal()
+                continue
+
+            _, seq, slot, detect = message
+            try:
+                results.put((kind, seq, extractor.analyze(ring.view(slot), detect=detect), None))
+            except Exception as e:
+                results.put((kind, seq, None, f"{type(e).__name__}: {e}"))
+    finally:
+        ring.close()
+
+
+class _WorkerProxy:
+    """Pengganti ekstraktor di proses utama; `configure` dan `reset_signal` diteruskan ke worker."""
+    def __init__(self, requests):
+        self._requests = requests
+
+    def configure(self, **kwargs):
+        self._requests.put(('configure', kwargs))
+
+    def reset_signal(self):
+        self._requests.put(('reset_signal',))
+
+
+class ExtractionWorkers:
+    """
+    Backend ekstraksi rPPG + respirasi paralel di dua proses.
+
+    Args:
+        shape (tuple): Bentuk frame kerja (tinggi, lebar, 3), misalnya dari FramePool
+        slots (int): Jumlah slot frame di ring (batas frame yang sedang diproses)
+        rppg_kwargs (dict | None): Argumen RPPGExtractor di worker
+        respirasi_kwargs (dict | None): Argumen RespirasiExtractor di worker
+        factories (tuple | None): (factory_face, factory_pose) top-level yang dapat di-pickle,
+            pengganti RPPGExtractor/RespirasiExtractor (misalnya untuk benchmark)
+    """
+    def __init__(self, shape, slots=4, rppg_kwargs=None, respirasi_kwargs=None, factories=None):
+        self.slots = slots
+        self.ring = SharedFrameRing(slots, shape)
+        # spawn: worker tidak mewarisi state Tk/MediaPipe/thread dari proses utama
+        ctx = mp.get_context("spawn")
+        self._results = ctx.Queue()
+        self._requests = {FACE: ctx.Queue(), POSE: ctx.Queue()}
+        factories = factories or (None, None)
+        kwargs = {FACE: rppg_kwargs or {}, POSE: respirasi_kwargs or {}}
+        self._processes = [
+            ctx.Process(target=_worker_main, daemon=True, name=f"extract-{kind}",
+                        args=(kind, factory, kwargs[kind], self.ring.name, slots, self.ring.shape,
+                              self._requests[kind], self._results))
+            for kind, factory in zip((FACE, POSE), factories)
+        ]
+        for process in self._processes:
+            process.start()
+
+        self.rppg_extractor = _WorkerProxy(self._requests[FACE])
+        self.respirasi_extractor = _WorkerProxy(self._requests[POSE])
+
+        self._next_seq = 0
+        self._pending = {}      # seq -> {kind: (result, error)}
+        self._wait_ready()
+
+    def _wait_ready(self):
+        ready = set()
+        while len(ready) < 2:
+            try:
+                kind, _, ok, error = self._results.get(timeout=_STARTUP_TIMEOUT)
+            except queue.Empty:
+                self.close()
+                raise RuntimeError("Extraction workers did not start in time")
+            if error:
+                self.close()
+                raise RuntimeError(f"Extraction worker '{kind}' failed to start: {error}")
+            ready.add(kind)
+
+    def _receive(self):
+        try:
+            kind, seq, result, error = self._results.get(timeout=_RESULT_TIMEOUT)
+        except queue.Empty:
+            dead = [p.name for p in self._processes if not p.is_alive()]
+            raise RuntimeError(f"Extraction workers not responding{' (exited: ' + ', '.join(dead) + ')' if dead else ''}")
+        if seq in self._pending:
+            self._pending[seq][kind] = (result, error)
+
+    def _done(self, seq):
+        return len(self._pending[seq]) == 2
+
+    def submit(self, frame, detect=True):
+        """
+        Menulis frame ke slot berikutnya dan mengirimkannya ke kedua worker.
+        Jika slot masih dipakai frame lama, tunggu hingga hasil frame tersebut lengkap.
+
+        Args:
+            frame (np.ndarray): Frame BGR dengan bentuk `ring.shape`
+            detect (bool): Jalankan inferensi landmark pada frame ini
+
+        Returns:
+            int: Nomor urut frame untuk `collect`
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        previous = seq - self.slots
+        while previous in self._pending and not self._done(previous):
+            self._receive()
+
+        slot = seq % self.slots
+        self.ring.write(slot, frame)
+        self._pending[seq] = {}
+        for kind in (FACE, POSE):
+            self._requests[kind].put(('frame', seq, slot, detect))
+        return seq
+
+    def collect(self, seq):
+        """
+        Menunggu hasil kedua worker untuk satu frame.
+
+        Returns:
+            tuple: (face, pose, errors) dengan face/pose seperti `analyze` pada ekstraktor
+            masing-masing dan errors berupa dict {kind: pesan} untuk worker yang gagal
+        """
+        while not self._done(seq):
+            self._receive()
+        results = self._pending.pop(seq)
+        errors = {kind: error for kind, (_, error) in results.items() if error}
+        return results[FACE][0], results[POSE][0], errors
+
+    def analyze(self, frame, detect=True):
+        """Submit + collect untuk satu frame (FaceMesh dan Pose berjalan paralel)."""
+        return self.collect(self.submit(frame, detect))
+
+    def close(self):
+        """Menghentikan worker dan melepas shared memory."""
+        for requests in self._requests.values():
+            requests.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._pending.clear()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
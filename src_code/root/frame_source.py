@@ -0,0 +1,292 @@
+"""
+Modul sumber frame (capture source) yang dapat diganti-ganti.
+
+Satu antarmuka ingest untuk GUI live, batch runner dan benchmark:
+- WebcamSource: kamera (cv2.VideoCapture dengan indeks device)
+- VideoFileSource: file video (mp4, avi, ...)
+- ImageDirectorySource: folder berisi urutan gambar
+- ArraySource: frame NumPy di memori
+- RecordedSource: rekaman biner `.npz` (frames + timestamps) dari `save_recording`
+
+Setiap sumber memberikan timestamp per frame (detik sejak frame pertama) dan dapat
+berjalan secepat mungkin (realtime=False) atau dipacing sesuai timestamp (realtime=True).
+Method `read()`, `isOpened()` dan `release()` kompatibel dengan cv2.VideoCapture.
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+class FrameSource(ABC):
+    """
+    Kelas dasar abstrak sumber frame.
+
+    Subclass wajib mengimplementasikan `_open()` dan `_next()` (mengembalikan
+    (timestamp, frame) atau None jika habis); `_close()` opsional.
+    """
+    def __init__(self, realtime=False, fps=30):
+        self.realtime = realtime
+        self.fps = fps
+        self.timestamp = None
+        self.frame_index = -1
+        self._opened = False
+        self._wall_start = None
+
+    def open(self):
+        """Membuka sumber frame. Mengembalikan self agar bisa dipakai berantai."""
+        if not self._opened:
+            self._open()
+            self._opened = True
+            self._wall_start = None
+            self.frame_index = -1
+        return self
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self):
+        """
+        Membaca frame berikutnya.
+
+        Returns:
+            tuple: (ret, frame) seperti cv2.VideoCapture.read(); timestamp frame
+            tersedia di atribut `timestamp`
+        """
+        if not self._opened:
+            return False, None
+
+        item = self._next()
+        if item is None:
+            return False, None
+
+        ts, frame = item
+        self.frame_index += 1
+        self.timestamp = ts
+
+        if self.realtime:
+            # Pacing: tunggu hingga waktu dinding menyusul timestamp frame
+            now = time.perf_counter()
+            if self._wall_start is None:
+                self._wall_start = now - ts
+            delay = self._wall_start + ts - now
+            if delay > 0:
+                time.sleep(delay)
+        return True, frame
+
+    def release(self):
+        if self._opened:
+            self._close()
+            self._opened = False
+
+    def __iter__(self):
+        """Iterasi (timestamp, frame) hingga sumber habis."""
+        self.open()
+        while True:
+            ret, frame = self.read()
+            if not ret:
+                break
+            yield self.timestamp, frame
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    @abstractmethod
+    def _open(self):
+        """Membuka perangkat/file sumber; dipanggil sekali oleh `open()`."""
+
+    @abstractmethod
+    def _next(self):
+        """Frame berikutnya sebagai (timestamp, frame), atau None jika sumber habis."""
+
+    def _close(self):
+        pass
+
+
+class WebcamSource(FrameSource):
+    """Sumber frame dari webcam; timestamp diambil dari jam monotonic saat frame dibaca."""
+    def __init__(self, device=0, width=640, height=480, fps=30):
+        # Kamera sudah berjalan real-time, sehingga tidak perlu pacing tambahan
+        super().__init__(realtime=False, fps=fps)
+        self.device = device
+        self.width = width
+        self.height = height
+        self.cap = None
+        self._t0 = None
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.device)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            raise Exception("Cannot access camera. Please check if camera is connected and not used by other applications.")
+
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        self._t0 = None
+
+    def _next(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        now = time.perf_counter()
+        if self._t0 is None:
+            self._t0 = now
+        return now - self._t0, frame
+
+    def _close(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+
+class VideoFileSource(FrameSource):
+    """Sumber frame dari file video; timestamp dari posisi frame di dalam file."""
+    def __init__(self, path, realtime=False):
+        super().__init__(realtime=realtime)
+        self.path = path
+        self.cap = None
+
+    def _open(self):
+        if not os.path.isfile(self.path):
+            raise FileNotFoundError(f"Video file not found: {self.path}")
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            raise Exception(f"Cannot open video file: {self.path}")
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if fps and fps > 0:
+            self.fps = fps
+
+    def _next(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        pos_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        index = self.frame_index + 1
+        # Beberapa container tidak menyediakan POS_MSEC yang valid; gunakan indeks / fps
+        ts = pos_ms / 1000.0 if pos_ms > 0 or index == 0 else index / self.fps
+        return ts, frame
+
+    def _close(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageDirectorySource(FrameSource):
+    """Sumber frame dari folder gambar berurutan (diurutkan berdasarkan nama file)."""
+    def __init__(self, directory, fps=30, realtime=False):
+        super().__init__(realtime=realtime, fps=fps)
+        self.directory = directory
+        self.files = []
+
+    def _open(self):
+        if not os.path.isdir(self.directory):
+            raise FileNotFoundError(f"Frame directory not found: {self.directory}")
+        self.files = sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise ValueError(f"No image files found in {self.directory}")
+
+    def _next(self):
+        index = self.frame_index + 1
+        if index >= len(self.files):
+            return None
+        frame = cv2.imread(self.files[index])
+        if frame is None:
+            raise Exception(f"Failed to read image: {self.files[index]}")
+        return index / self.fps, frame
+
+
+class ArraySource(FrameSource):
+    """
+    Sumber frame dari array NumPy di memori.
+
+    Args:
+        frames (np.ndarray | list): Frame BGR berbentuk (N, H, W, 3)
+        timestamps (array-like | None): Timestamp per frame (detik); default indeks / fps
+    """
+    def __init__(self, frames, timestamps=None, fps=30, realtime=False):
+        super().__init__(realtime=realtime, fps=fps)
+        self.frames = frames
+        if timestamps is None:
+            timestamps = np.arange(len(frames)) / fps
+        if len(timestamps) != len(frames):
+            raise ValueError("timestamps length must match number of frames")
+        self.timestamps = np.asarray(timestamps, dtype=float)
+
+    def _open(self):
+        pass
+
+    def _next(self):
+        index = self.frame_index + 1
+        if index >= len(self.frames):
+            return None
+        return float(self.timestamps[index] - self.timestamps[0]), self.frames[index]
+
+
+class RecordedSource(ArraySource):
+    """Sumber frame dari rekaman biner `.npz` yang ditulis oleh `save_recording`."""
+    def __init__(self, path, realtime=False):
+        self.path = path
+        with np.load(path) as data:
+            frames = data['frames']
+            timestamps = data['timestamps']
+            fps = float(data['fps']) if 'fps' in data else 30
+        super().__init__(frames, timestamps, fps=fps, realtime=realtime)
+
+
+def save_recording(path, frames, timestamps, fps=30):
+    """
+    Menyimpan frame dan timestamp ke format rekaman biner `.npz` (tanpa kompresi lossy).
+
+    Args:
+        path (str): Path file tujuan
+        frames (array-like): Frame BGR (N, H, W, 3) bertipe uint8
+        timestamps (array-like): Timestamp per frame dalam detik
+        fps (float): Frame rate nominal
+    """
+    np.savez(path, frames=np.asarray(frames, dtype=np.uint8),
+             timestamps=np.asarray(timestamps, dtype=float), fps=fps)
+
+
+def open_source(spec=0, realtime=False, width=640, height=480, fps=30):
+    """
+    Membuat dan membuka sumber frame berdasarkan spesifikasi.
+
+    Args:
+        spec (int | str | np.ndarray | FrameSource): Indeks webcam, path file video,
+            folder gambar, file rekaman `.npz`, array frame, atau sumber yang sudah jadi
+        realtime (bool): Pacing sesuai timestamp (diabaikan untuk webcam)
+        width (int): Lebar frame webcam
+        height (int): Tinggi frame webcam
+        fps (float): FPS webcam / FPS nominal untuk folder gambar dan array
+
+    Returns:
+        FrameSource: Sumber frame yang sudah dibuka
+    """
+    if isinstance(spec, FrameSource):
+        source = spec
+    elif isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        source = WebcamSource(int(spec), width=width, height=height, fps=fps)
+    elif isinstance(spec, (np.ndarray, list)):
+        source = ArraySource(spec, fps=fps, realtime=realtime)
+    elif os.path.isdir(spec):
+        source = ImageDirectorySource(spec, fps=fps, realtime=realtime)
+    elif str(spec).lower().endswith('.npz'):
+        source = RecordedSource(spec, realtime=realtime)
+    else:
+        source = VideoFileSource(spec, realtime=realtime)
+    return source.open()
@@ -0,0 +1,176 @@
+"""
+hrv.py
+
+Modul analisis domain waktu berbasis deteksi puncak untuk sinyal rPPG dan respirasi.
+
+Melengkapi estimasi spektral pada `utils.py` dengan:
+- Interval antar detak (inter-beat interval, IBI) dan heart rate instan
+- Metrik HRV: SDNN, RMSSD, pNN50
+- Interval antar napas (breath-to-breath interval)
+
+Fungsi:
+- detect_peaks(signal, fs, max_rate_hz): Deteksi puncak (kernel `kernels.find_peaks`) dengan interpolasi parabola.
+- interval_metrics(intervals): Menghitung rate rata-rata, SDNN, RMSSD dan pNN50 dari interval (detik).
+
+Kelas:
+- IncrementalPeakAnalyzer: Deteksi puncak inkremental yang hanya memproses sampel baru
+  (ditambah jendela lookback berukuran tetap), dipakai di GUI live dan batch runner.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from kernels import find_peaks
+
+
+def detect_peaks(signal, fs, max_rate_hz=3.0, min_prominence=0.3):
+    """
+    Mendeteksi puncak sinyal secara tervektorisasi.
+
+    Args:
+        signal (array-like): Sinyal terfilter (bandpass)
+        fs (float): Frekuensi sampling (Hz)
+        max_rate_hz (float): Frekuensi maksimum (menentukan jarak minimum antar puncak)
+        min_prominence (float): Prominence minimum relatif terhadap standar deviasi sinyal
+
+    Returns:
+        np.ndarray: Posisi puncak dalam satuan sampel (float, presisi sub-sampel)
+    """
+    signal = np.asarray(signal, dtype=float)
+    if len(signal) < 3:
+        return np.empty(0)
+
+    distance = max(1, int(fs / max_rate_hz))
+    prominence = min_prominence * np.std(signal)
+    peaks = find_peaks(signal, distance, prominence)
+    if len(peaks) == 0:
+        return np.empty(0)
+
+    # Interpolasi parabola tiga titik untuk posisi puncak sub-sampel
+    inner = (peaks > 0) & (peaks < len(signal) - 1)
+    offsets = np.zeros(len(peaks))
+    p = peaks[inner]
+    y0, y1, y2 = signal[p - 1], signal[p], signal[p + 1]
+    denom = y0 - 2 * y1 + y2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offsets[inner] = np.where(denom != 0, 0.5 * (y0 - y2) / denom, 0.0)
+    return peaks + np.clip(offsets, -0.5, 0.5)
+
+
+def interval_metrics(intervals):
+    """
+    Menghitung metrik domain waktu dari deretan interval.
+
+    Args:
+        intervals (array-like): Interval antar puncak dalam detik
+
+    Returns:
+        dict: 'rate' (per menit), 'sdnn' (ms), 'rmssd' (ms), 'pnn50' (%) dan 'count';
+        nilai None jika interval tidak cukup
+    """
+    ibi_ms = np.asarray(intervals, dtype=float) * 1000.0
+    metrics = {'rate': None, 'sdnn': None, 'rmssd': None, 'pnn50': None, 'count': len(ibi_ms)}
+    if len(ibi_ms) == 0:
+        return metrics
+
+    metrics['rate'] = float(60000.0 / np.mean(ibi_ms))
+    if len(ibi_ms) >= 2:
+        diffs = np.diff(ibi_ms)
+        metrics['sdnn'] = float(np.std(ibi_ms, ddof=1))
+        metrics['rmssd'] = float(np.sqrt(np.mean(diffs ** 2)))
+        metrics['pnn50'] = float(100.0 * np.mean(np.abs(diffs) > 50.0))
+    return metrics
+
+
+class IncrementalPeakAnalyzer:
+    """
+    Deteksi puncak inkremental untuk sinyal live.
+
+    Setiap pemanggilan `push` hanya memproses sampel baru ditambah lookback berukuran
+    tetap (dua periode terpanjang), sehingga biaya per update tidak bergantung pada
+    panjang sesi. Puncak baru dikonfirmasi setelah jarak minimum antar puncak terlewati,
+    sehingga puncak yang sudah dikeluarkan tidak pernah berubah.
+
+    Args:
+        fs (float): Frekuensi sampling (Hz)
+        low_hz (float): Frekuensi terendah yang valid (interval maksimum = 1 / low_hz)
+        high_hz (float): Frekuensi tertinggi yang valid (interval minimum = 1 / high_hz)
+        max_intervals (int): Jumlah interval terakhir yang disimpan untuk metrik
+    """
+    def __init__(self, fs, low_hz=0.7, high_hz=3.0, max_intervals=120, min_prominence=0.3):
+        self.fs = fs
+        self.low_hz = low_hz
+        self.high_hz = high_hz
+        self.min_prominence = min_prominence
+        self.min_distance = max(1, int(fs / high_hz))
+        self.lookback = int(np.ceil(2 * fs / low_hz))
+
+        self.intervals = deque(maxlen=max_intervals)
+        self.peak_times = deque(maxlen=max_intervals + 1)
+        self._tail = np.empty(0)
+        self._tail_start = 0
+        self._last_peak = None
+
+    def reset(self):
+        """Menghapus seluruh riwayat puncak dan interval."""
+        self.intervals.clear()
+        self.peak_times.clear()
+        self._tail = np.empty(0)
+        self._tail_start = 0
+        self._last_peak = None
+
+    def push(self, samples):
+        """
+        Memproses sampel baru dan mengembalikan puncak yang baru dikonfirmasi.
+
+        Args:
+            samples (array-like): Sampel terfilter baru (boleh satu nilai)
+
+        Returns:
+            list[float]: Waktu puncak baru (detik sejak sampel pertama)
+        """
+        samples = np.atleast_1d(np.asarray(samples, dtype=float))
+        window = np.concatenate((self._tail, samples))
+        start = self._tail_start
+
+        peaks = detect_peaks(window, self.fs, self.high_hz, self.min_prominence)
+        # Puncak dianggap final jika sudah melewati jarak minimum dari ujung jendela
+        confirmed = peaks[peaks <= len(window) - 1 - self.min_distance] + start
+        if self._last_peak is not None:
+            confirmed = confirmed[confirmed > self._last_peak + self.min_distance / 2]
+
+        new_times = []
+        for peak in confirmed:
+            t = peak / self.fs
+            if self._last_peak is not None:
+                interval = (peak - self._last_peak) / self.fs
+                # Hanya interval dalam rentang fisiologis yang dipakai untuk metrik
+                if 1.0 / self.high_hz <= interval <= 1.0 / self.low_hz:
+                    self.intervals.append(interval)
+            self._last_peak = peak
+            self.peak_times.append(t)
+            new_times.append(t)
+
+        keep = min(len(window), self.lookback)
+        self._tail = window[len(window) - keep:]
+        self._tail_start = start + len(window) - keep
+        return new_times
+
+    def mark_gap(self):
+        """
+        Menandai celah (misalnya artefak): interval yang melintasi celah tidak dihitung.
+        Riwayat interval yang sudah ada tetap disimpan.
+        """
+        self._last_peak = None
+
+    @property
+    def instantaneous_rate(self):
+        """Rate instan (per menit) dari interval terakhir, atau None."""
+        if not self.intervals:
+            return None
+        return 60.0 / self.intervals[-1]
+
+    def metrics(self):
+        """Metrik domain waktu dari interval yang tersimpan (lihat `interval_metrics`)."""
+        return interval_metrics(self.intervals)
@@ -0,0 +1,301 @@
+"""
+Cache on-disk hasil inferensi per frame (FaceMesh/Pose) untuk analisis ulang video arsip.
+
+Inferensi landmark adalah langkah termahal dan hasilnya tidak berubah ketika yang diubah
+hanya parameter filter atau estimator. Cache menyimpan kolom per frame (timestamp,
+statistik RGB per ROI, landmark dahi, nilai respirasi, kecerahan frame) dalam satu file
+`.npz` terkompresi per entri, dengan kunci:
+
+    sha256(isi sumber) + pengaturan ekstraksi (capture + processing) + versi format
+
+sehingga rerun dengan sumber dan pengaturan ekstraksi yang sama melewati decoding dan
+inferensi sepenuhnya. Hash isi file disimpan di indeks kecil berdasarkan (ukuran, mtime)
+agar file besar tidak di-hash ulang setiap kali. Ukuran total dibatasi: entri yang paling
+lama tidak dipakai (mtime, diperbarui setiap kali dibaca) dihapus lebih dulu.
+
+Kelas:
+- FrameColumns: Pengumpul kolom per frame dari hasil `analyze` kedua ekstraktor.
+- InferenceCache: Penyimpanan entri dengan kunci isi dan eviction berbasis ukuran.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from frame_source import IMAGE_EXTENSIONS
+
+
+CACHE_VERSION = 1
+ROI_NAMES = ("forehead", "left_cheek", "right_cheek")
+_CHUNK = 1 << 20
+
+
+class FrameColumns:
+    """
+    Pengumpul kolom per frame dalam bentuk ringkas.
+
+    Landmark disimpan sebagai int16 (koordinat piksel, -1 jika wajah tidak terdeteksi),
+    mean ROI sebagai float64 (nilai sinyal identik dengan tanpa cache) dan varians float32.
+
+    Args:
+        landmarks (bool): Simpan juga poligon landmark per ROI, titik bahu dan ROI dada
+            (dipakai session capture; cache inferensi tidak membutuhkannya)
+    """
+    def __init__(self, landmarks=False):
+        self.landmarks = landmarks
+        self.timestamps, self.face, self.points = [], [], []
+        self.roi_mean, self.roi_var, self.roi_count = [], [], []
+        self.pose_value, self.brightness = [], []
+        self.regions, self.shoulders, self.chest_roi = [], [], []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, ts, face, pose, brightness):
+        """
+        Menambahkan hasil satu frame.
+
+        Args:
+            ts (float): Timestamp frame (detik)
+            face (dict | None): Hasil `RPPGExtractor.analyze`
+            pose (dict | None): Hasil `RespirasiExtractor.analyze`
+            brightness (float): Kecerahan rata-rata frame
+        """
+        rois = face['rois'] if face else {}
+        mean = np.full((len(ROI_NAMES), 3), np.nan)
+        var = np.full((len(ROI_NAMES), 3), np.nan, dtype=np.float32)
+        count = np.zeros(len(ROI_NAMES), dtype=np.int32)
+        for i, name in enumerate(ROI_NAMES):
+            stats = rois.get(name)
+            if stats is not None:
+                mean[i], var[i], count[i] = stats.mean, stats.var, stats.count
+
+        self.timestamps.append(ts)
+        self.face.append(face is not None)
+        self.points.append(face['points'] if face else None)
+        self.roi_mean.append(mean)
+        self.roi_var.append(var)
+        self.roi_count.append(count)
+        self.pose_value.append(pose['value'] if pose is not None else np.nan)
+        self.brightness.append(brightness)
+        if self.landmarks:
+            polygons = face['polygons'] if face else {}
+            self.regions.append([polygons.get(name) for name in ROI_NAMES])
+            self.shoulders.append(pose['shoulders'] if pose is not None else None)
+            self.chest_roi.append(pose.get('chest_roi') if pose is not None else None)
+
+    def to_arrays(self, fs):
+        """Kolom sebagai dict array NumPy (format file cache)."""
+        n_points = max((len(p) for p in self.points if p is not None), default=0)
+        points = np.full((len(self), n_points, 2), -1, dtype=np.int16)
+        for i, p in enumerate(self.points):
+            if p is not None and len(p) == n_points:
+                points[i] = p
+        n = len(self)
+        columns = {
+            'fs': np.float64(fs),
+            'timestamps': np.asarray(self.timestamps, dtype=float),
+            'face': np.asarray(self.face, dtype=bool),
+            'points': points,
+            'roi_names': np.asarray(ROI_NAMES),
+            'roi_mean': np.asarray(self.roi_mean, dtype=float).reshape(n, len(ROI_NAMES), 3),
+            'roi_var': np.asarray(self.roi_var, dtype=np.float32).reshape(n, len(ROI_NAMES), 3),
+            'roi_count': np.asarray(self.roi_count, dtype=np.int32).reshape(n, len(ROI_NAMES)),
+            'pose_value': np.asarray(self.pose_value, dtype=float),
+            'brightness': np.asarray(self.brightness, dtype=float),
+        }
+        if self.landmarks:
+            columns.update(self._landmark_arrays())
+        return columns
+
+    def _landmark_arrays(self):
+        """Poligon ROI (digabung sesuai ROI_NAMES, panjang per ROI di `region_sizes`), bahu dan ROI dada."""
+        sizes = np.zeros(len(ROI_NAMES), dtype=np.int32)
+        for polygons in self.regions:
+            if any(p is not None for p in polygons):
+                sizes = np.asarray([len(p) if p is not None else 0 for p in polygons], dtype=np.int32)
+                break
+        regions = np.full((len(self), int(sizes.sum()), 2), -1, dtype=np.int16)
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        for i, polygons in enumerate(self.regions):
+            for k, p in enumerate(polygons):
+                if p is not None and len(p) == sizes[k]:
+                    regions[i, offsets[k]:offsets[k + 1]] = p
+
+        shoulders = np.full((len(self), 2, 2), -1, dtype=np.int16)
+        chest = np.full((len(self), 4), -1, dtype=np.int16)
+        for i, (points, box) in enumerate(zip(self.shoulders, self.chest_roi)):
+            if points is not None and len(points) == 2:
+                shoulders[i] = points
+            if box is not None:
+                chest[i] = box
+        return {'region_points': regions, 'region_sizes': sizes, 'shoulders': shoulders, 'chest_roi': chest}
+
+
+class InferenceCache:
+    """
+    Cache hasil inferensi per frame dengan kunci isi sumber dan pengaturan ekstraksi.
+
+    Args:
+        directory (str): Folder cache
+        max_bytes (int): Ukuran total maksimum file cache
+    """
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self._index_path = os.path.join(directory, "hashes.json")
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config):
+        """Membuat cache dari `AppConfig.cache`, atau None jika dinonaktifkan."""
+        if not config.cache.enabled:
+            return None
+        return cls(config.cache.directory, config.cache.max_mb * 1024 * 1024)
+
+    # === Kunci ===
+
+    def key(self, source, config):
+        """
+        Kunci entri untuk sumber dan konfigurasi.
+
+        Returns:
+            str | None: Hex digest, atau None jika sumber tidak dapat di-cache (webcam)
+        """
+        digest = self._source_digest(source)
+        if digest is None:
+            return None
+        settings = config.extraction_settings()
+        # Backend worker tidak mengubah hasil ekstraksi
+        settings['processing'].pop('extraction_workers', None)
+        payload = json.dumps([CACHE_VERSION, digest, settings], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _source_digest(self, source):
+        if isinstance(source, np.ndarray):
+            return hashlib.sha256(np.ascontiguousarray(source).data).hexdigest()
+        if not isinstance(source, str) or source.isdigit():
+            return None
+        if os.path.isdir(source):
+            h = hashlib.sha256()
+            for name in sorted(os.listdir(source)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    h.update(name.encode())
+                    h.update(self._file_digest(os.path.join(source, name)).encode())
+            return h.hexdigest()
+        if os.path.isfile(source):
+            return self._file_digest(source)
+        return None
+
+    def _file_digest(self, path):
+        """sha256 isi file; memakai indeks (ukuran, mtime) agar file tidak di-hash ulang."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        index = self._load_index()
+        entry = index.get(path)
+        if entry and entry[:2] == stamp:
+            return entry[2]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+        index[path] = stamp + [h.hexdigest()]
+        self._save_index(index)
+        return index[path][2]
+
+    def _load_index(self):
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        self._atomic_write(self._index_path, lambda f: f.write(json.dumps(index).encode()))
+
+    # === Entri ===
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(self, key):
+        """
+        Membaca entri cache.
+
+        Returns:
+            dict | None: Kolom per frame (lihat `FrameColumns.to_arrays`) beserta
+            extraction_time asli, atau None jika tidak ada/rusak
+        """
+        path = self._entry_path(key)
+        try:
+            with np.load(path) as data:
+                columns = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Corrupt inference cache entry removed ({e}): {path}")
+            self._remove(path)
+            return None
+        os.utime(path)      # tandai baru dipakai (urutan eviction)
+        return columns
+
+    def store(self, key, columns, extraction_time):
+        """
+        Menyimpan kolom per frame lalu menjalankan eviction hingga ukuran total di bawah batas.
+
+        Args:
+            key (str): Kunci dari `key`
+            columns (dict): Hasil `FrameColumns.to_arrays`
+            extraction_time (float): Waktu ekstraksi asli (detik), disimpan sebagai metadata
+        """
+        path = self._entry_path(key)
+        try:
+            self._atomic_write(path, lambda f: np.savez_compressed(
+                f, extraction_time=np.float64(extraction_time), **columns))
+        except OSError as e:
+            print(f"⚠️ Failed to write inference cache: {e}")
+            return
+        self._evict(keep=path)
+
+    def _evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        # Entri terlama dihapus lebih dulu; entri baru dihapus terakhir (hanya jika melebihi batas sendiri)
+        for _, size, path in sorted(entries, key=lambda e: (e[2] == keep, e[0])):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            if path == keep:
+                print(f"⚠️ Inference cache entry larger than cache.max_mb, not kept: {path}")
+
+    def _atomic_write(self, path, write):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
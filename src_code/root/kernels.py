@@ -0,0 +1,320 @@
+"""
+Kernel per-sampel untuk jalur panas streaming, dengan akselerasi JIT opsional (Numba, CPU).
+
+Pada ukuran kecil (satu sampel, jendela beberapa puluh sampel, crop wajah) biaya dispatch
+NumPy/SciPy mendominasi. Setiap kernel ditulis dua kali:
+- versi loop (`_loop_*`) yang dikompilasi dengan `numba.njit` jika Numba terpasang
+- versi NumPy/SciPy (`_numpy_*`), dipakai otomatis jika Numba tidak tersedia
+
+Nama publik (`sos_step`, `sorted_update`, `window_dot`, `find_peaks`, `region_sums`) menunjuk
+ke versi JIT atau fallback sesuai `BACKEND`. Kedua versi dijaga identik oleh `self_check()`
+dan tests/test_kernels.py (versi loop tetap bisa dijalankan sebagai Python biasa tanpa Numba,
+hanya lambat). Pemanggil yang punya implementasi Python murni yang lebih cepat daripada
+fallback NumPy (misalnya `RunningMedian` dengan bisect) memakai kernel hanya jika `JIT_ACTIVE`.
+
+Jalankan `python kernels.py` untuk self-check kesetaraan dan benchmark biaya per sampel
+terhadap fungsi batch `signal_filter`.
+
+Fungsi:
+- sos_step(sos, zi, x): Satu sampel melalui kaskade SOS (seperti sosfilt), zi diperbarui in-place.
+- sorted_update(buf, n, old, new, remove): Ganti/sisipkan satu nilai di jendela terurut.
+- window_dot(coeffs, buf, start): Konvolusi FIR satu titik pada slice buffer.
+- find_peaks(x, distance, prominence): Indeks puncak seperti `scipy.signal.find_peaks`
+  (urutan pemutusan tie pada tinggi puncak yang sama dapat berbeda dari SciPy).
+- region_sums(crop, labels, boxes): Jumlah piksel berlabel r + 1, jumlah dan jumlah kuadrat per kanal
+  untuk setiap region r (kotak r membatasi pencarian label r).
+"""
+
+import time
+
+import numpy as np
+from scipy.signal import find_peaks as _scipy_find_peaks, sosfilt
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    NUMBA_AVAILABLE = False
+
+BACKEND = "numba" if NUMBA_AVAILABLE else "numpy"
+JIT_ACTIVE = NUMBA_AVAILABLE
+
+
+# === Versi loop (dikompilasi Numba jika tersedia) ===
+
+def _loop_sos_step(sos, zi, x):
+    # Direct form II transposed per section, sama dengan implementasi sosfilt SciPy
+    for s in range(sos.shape[0]):
+        y = sos[s, 0] * x + zi[s, 0]
+        zi[s, 0] = sos[s, 1] * x - sos[s, 4] * y + zi[s, 1]
+        zi[s, 1] = sos[s, 2] * x - sos[s, 5] * y
+        x = y
+    return x
+
+
+def _loop_sorted_update(buf, n, old, new, remove):
+    if remove:
+        i = 0
+        while i < n and buf[i] < old:
+            i += 1
+        for j in range(i, n - 1):
+            buf[j] = buf[j + 1]
+        n -= 1
+    # Posisi sisip di kanan nilai yang sama (seperti bisect.insort)
+    i = n
+    while i > 0 and buf[i - 1] > new:
+        buf[i] = buf[i - 1]
+        i -= 1
+    buf[i] = new
+    return n + 1
+
+
+def _loop_window_dot(coeffs, buf, start):
+    total = 0.0
+    for i in range(coeffs.shape[0]):
+        total += coeffs[i] * buf[start + i]
+    return total
+
+
+def _loop_find_peaks(x, distance, prominence):
+    n = x.shape[0]
+    # Maksimum lokal; puncak datar diwakili titik tengahnya
+    peaks = np.empty(n // 2 + 1, dtype=np.int64)
+    m = 0
+    i = 1
+    while i < n - 1:
+        if x[i - 1] < x[i]:
+            ahead = i + 1
+            while ahead < n - 1 and x[ahead] == x[i]:
+                ahead += 1
+            if x[ahead] < x[i]:
+                peaks[m] = (i + ahead - 1) // 2
+                m += 1
+                i = ahead
+        i += 1
+    peaks = peaks[:m]
+
+    # Jarak minimum: puncak tertinggi dipertahankan, tetangga yang terlalu dekat dibuang
+    keep = np.ones(m, dtype=np.bool_)
+    if distance > 1:
+        order = np.argsort(x[peaks])
+        for r in range(m - 1, -1, -1):
+            j = order[r]
+            if not keep[j]:
+                continue
+            k = j - 1
+            while k >= 0 and peaks[j] - peaks[k] < distance:
+                keep[k] = False
+                k -= 1
+            k = j + 1
+            while k < m and peaks[k] - peaks[j] < distance:
+                keep[k] = False
+                k += 1
+
+    # Prominence: puncak dikurangi dasar tertinggi dari kedua sisi (tanpa batas jendela)
+    if prominence > 0:
+        for r in range(m):
+            if not keep[r]:
+                continue
+            p = peaks[r]
+            left_min = x[p]
+            i = p
+            while i >= 0 and x[i] <= x[p]:
+                if x[i] < left_min:
+                    left_min = x[i]
+                i -= 1
+            right_min = x[p]
+            i = p
+            while i < n and x[i] <= x[p]:
+                if x[i] < right_min:
+                    right_min = x[i]
+                i += 1
+            if x[p] - max(left_min, right_min) < prominence:
+                keep[r] = False
+    return peaks[keep]
+
+
+def _loop_region_sums(crop, labels, boxes):
+    out = np.zeros((boxes.shape[0], 7))
+    for r in range(boxes.shape[0]):
+        x1, y1, x2, y2 = boxes[r, 0], boxes[r, 1], boxes[r, 2], boxes[r, 3]
+        for y in range(y1, y2):
+            for x in range(x1, x2):
+                if labels[y, x] == r + 1:
+                    out[r, 0] += 1.0
+                    for c in range(3):
+                        v = float(crop[y, x, c])
+                        out[r, 1 + c] += v
+                        out[r, 4 + c] += v * v
+    return out
+
+
+# === Versi NumPy/SciPy (fallback) ===
+
+def _numpy_sos_step(sos, zi, x):
+    out, zf = sosfilt(sos, (x,), zi=zi)
+    zi[...] = zf
+    return out[0]
+
+
+def _numpy_sorted_update(buf, n, old, new, remove):
+    if remove:
+        i = int(np.searchsorted(buf[:n], old, side='left'))
+        buf[i:n - 1] = buf[i + 1:n]
+        n -= 1
+    i = int(np.searchsorted(buf[:n], new, side='right'))
+    buf[i + 1:n + 1] = buf[i:n]
+    buf[i] = new
+    return n + 1
+
+
+def _numpy_window_dot(coeffs, buf, start):
+    return np.dot(coeffs, buf[start:start + len(coeffs)])
+
+
+def _numpy_find_peaks(x, distance, prominence):
+    peaks, _ = _scipy_find_peaks(x, distance=distance, prominence=prominence if prominence > 0 else None)
+    return peaks
+
+
+def _numpy_region_sums(crop, labels, boxes):
+    # Satu bincount per statistik pada label piksel (label 0 = di luar semua region)
+    n = len(boxes)
+    flat = labels.ravel()
+    pixels = crop.reshape(-1, crop.shape[2])
+    out = np.empty((n, 7))
+    out[:, 0] = np.bincount(flat, minlength=n + 1)[1:n + 1]
+    for c in range(3):
+        v = pixels[:, c].astype(np.float64)
+        out[:, 1 + c] = np.bincount(flat, weights=v, minlength=n + 1)[1:n + 1]
+        out[:, 4 + c] = np.bincount(flat, weights=v * v, minlength=n + 1)[1:n + 1]
+    return out
+
+
+_KERNELS = {
+    'sos_step': (_loop_sos_step, _numpy_sos_step),
+    'sorted_update': (_loop_sorted_update, _numpy_sorted_update),
+    'window_dot': (_loop_window_dot, _numpy_window_dot),
+    'find_peaks': (_loop_find_peaks, _numpy_find_peaks),
+    'region_sums': (_loop_region_sums, _numpy_region_sums),
+}
+
+if NUMBA_AVAILABLE:
+    _ACTIVE = {name: njit(cache=True, nogil=True)(loop) for name, (loop, _) in _KERNELS.items()}
+else:
+    _ACTIVE = {name: fallback for name, (_, fallback) in _KERNELS.items()}
+
+sos_step = _ACTIVE['sos_step']
+sorted_update = _ACTIVE['sorted_update']
+window_dot = _ACTIVE['window_dot']
+find_peaks = _ACTIVE['find_peaks']
+region_sums = _ACTIVE['region_sums']
+
+
+def _sample_inputs(rng=None):
+    """Input uji per kernel: daftar tuple argumen (dipakai warmup, self-check dan benchmark)."""
+    rng = rng or np.random.default_rng(0)
+    from scipy.signal import butter
+    sos = butter(5, [0.7, 3.0], btype='band', fs=30, output='sos')
+    t = np.arange(300) / 30
+    pulse = np.sin(2 * np.pi * 1.2 * t) + 0.3 * rng.standard_normal(len(t))
+    plateau = np.repeat(pulse[::2], 2)  # puncak datar dua sampel (tinggi puncak tetap berbeda)
+    window = np.sort(rng.standard_normal(11))
+    crop = rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)
+    # Kotak saling tumpang tindih; label region r + 1 hanya berada di dalam kotak r
+    boxes = np.array([[0, 0, 40, 35], [30, 10, 80, 60], [5, 30, 45, 58]], dtype=np.int64)
+    labels = np.zeros((60, 80), dtype=np.uint8)
+    for r, (x1, y1, x2, y2) in enumerate(boxes):
+        area = labels[y1:y2, x1:x2]
+        area[rng.random(area.shape) > 0.3] = r + 1
+    return {
+        'sos_step': [(sos, np.full((len(sos), 2), 0.1), float(v)) for v in pulse[:5]],
+        'sorted_update': [(window.copy(), 11, float(window[3]), 0.25, True),
+                          (window.copy(), 6, 0.0, float(window[2]), False)],
+        'window_dot': [(window, np.concatenate((pulse[:11], pulse[:11])), 4)],
+        'find_peaks': [(pulse, 10, 0.3 * float(np.std(pulse))), (plateau, 10, 0.3),
+                       (pulse[:50], 1, 0.0), (plateau, 25, 0.0)],
+        'region_sums': [(crop, labels, boxes)],
+    }
+
+
+def warmup():
+    """Memicu kompilasi JIT di awal (bukan di frame pertama); tidak melakukan apa pun tanpa Numba."""
+    if not NUMBA_AVAILABLE:
+        return
+    for name, cases in _sample_inputs().items():
+        _ACTIVE[name](*cases[0])
+
+
+def self_check(verbose=True):
+    """
+    Memastikan versi loop dan versi NumPy/SciPy setiap kernel memberi hasil yang sama.
+
+    Versi loop dijalankan terkompilasi jika Numba tersedia, selain itu sebagai Python biasa.
+
+    Returns:
+        bool: True jika semua kernel setara
+    """
+    ok = True
+    for name, cases in _sample_inputs().items():
+        loop = _ACTIVE[name] if NUMBA_AVAILABLE else _KERNELS[name][0]
+        fallback = _KERNELS[name][1]
+        for args in cases:
+            # Argumen yang diubah in-place (zi, buffer terurut) disalin untuk tiap versi
+            a = tuple(v.copy() if isinstance(v, np.ndarray) else v for v in args)
+            b = tuple(v.copy() if isinstance(v, np.ndarray) else v for v in args)
+            out_a, out_b = loop(*a), fallback(*b)
+            same = np.shape(out_a) == np.shape(out_b) and np.allclose(out_a, out_b, rtol=1e-12, atol=1e-12)
+            same = same and all(np.allclose(x, y, rtol=1e-12, atol=1e-12)
+                                for x, y in zip(a, b) if isinstance(x, np.ndarray))
+            if not same:
+                ok = False
+                print(f"❌ Kernel {name} differs from the NumPy fallback")
+    if verbose and ok:
+        print(f"✅ All kernels match the NumPy fallback (loop path: {'numba' if NUMBA_AVAILABLE else 'python'})")
+    return ok
+
+
+def _per_call_us(func, args, repeat=2000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def benchmark(fs=30.0, window=10.0):
+    """
+    Mencetak biaya per sampel (µs): kernel aktif vs fallback NumPy, dan filter streaming
+    vs menghitung ulang fungsi batch `signal_filter` pada jendela analisis setiap sampel.
+    """
+    from signal_filter import apply_bandpass_filter, apply_median_filter, apply_savgol_filter
+    from stream_filter import RunningMedian, StreamingBandpass, StreamingSavgol
+
+    print(f"Backend: {BACKEND}")
+    print(f"{'kernel':<16}{'active (us)':>14}{'numpy (us)':>14}")
+    for name, cases in _sample_inputs().items():
+        args = cases[0]
+        copy = lambda: tuple(v.copy() if isinstance(v, np.ndarray) else v for v in args)
+        repeat = 200 if name == 'region_sums' else 2000
+        print(f"{name:<16}{_per_call_us(_ACTIVE[name], copy(), repeat):>14.2f}"
+              f"{_per_call_us(_KERNELS[name][1], copy(), repeat):>14.2f}")
+
+    n = int(fs * window)
+    data = np.sin(2 * np.pi * 1.2 * np.arange(n) / fs) + 0.1 * np.random.default_rng(1).standard_normal(n)
+    bandpass = StreamingBandpass(0.7, 3.0, fs)
+    median, savgol = RunningMedian(5), StreamingSavgol(11, 3)
+    values = iter(np.tile(data, 50))
+    print(f"\nPer sample ({window:g} s window at {fs:g} Hz)")
+    print(f"{'stage':<12}{'streaming (us)':>16}{'signal_filter (us)':>20}")
+    for label, stream, batch in (
+            ("bandpass", lambda: bandpass.push(next(values)), lambda: apply_bandpass_filter(data, 0.7, 3.0, fs)),
+            ("median", lambda: median.push(next(values)), lambda: apply_median_filter(data, 5)),
+            ("savgol", lambda: savgol.push(next(values)), lambda: apply_savgol_filter(data, 11, 3))):
+        print(f"{label:<12}{_per_call_us(stream, (), 5000):>16.2f}{_per_call_us(batch, (), 500):>20.2f}")
+
+
+if __name__ == "__main__":
+    passed = self_check()
+    benchmark()
+    raise SystemExit(0 if passed else 1)
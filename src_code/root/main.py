@@ -1,5 +1,8 @@
+from config import parse_args, config_from_args
 from core.app import RespirasiRPPGApp
 
 if __name__ == "__main__":
-    app = RespirasiRPPGApp()
+    # Profil/konfigurasi dari command line, misalnya: python main.py --profile low-power-edge
+    args = parse_args()
+    app = RespirasiRPPGApp(config_from_args(args), subject=args.subject)
     app.run()
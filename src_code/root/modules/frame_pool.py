@@ -0,0 +1,158 @@
+# modules/frame_pool.py
+
+"""
+Modul frame buffer pool untuk jalur frame dari capture hingga tampilan Tk.
+
+Semua buffer (frame hasil resize, frame RGB untuk inferensi, buffer overlay dan buffer
+RGBA untuk tampilan) dialokasikan sekali dan diisi ulang setiap frame melalui argumen
+`dst` OpenCV. Gambar PIL dibuat di atas buffer RGBA yang sama (berbagi memori), dan
+PhotoImage Tk diperbarui dengan `paste` alih-alih dibuat baru setiap frame, sehingga
+alokasi dan GC di thread GUI berkurang.
+
+Jalankan `python -m modules.frame_pool` untuk membandingkan alokasi (tracemalloc), koleksi
+GC dan waktu per frame terhadap jalur lama yang mengalokasikan buffer baru setiap frame.
+"""
+
+import gc
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class FramePool:
+    """
+    Pool buffer frame berukuran tetap untuk loop video.
+
+    Args:
+        width (int): Lebar frame kerja
+        height (int): Tinggi frame kerja
+    """
+    def __init__(self, width=640, height=480):
+        self.size = (width, height)
+        shape = (height, width, 3)
+        self.frame = np.empty(shape, dtype=np.uint8)      # frame BGR hasil resize
+        self.rgb = np.empty(shape, dtype=np.uint8)        # frame RGB untuk MediaPipe
+        self.display = np.empty(shape, dtype=np.uint8)    # buffer overlay (BGR)
+        self.display_rgba = np.empty((height, width, 4), dtype=np.uint8)
+        # Mode RGBA "raw" membuat PIL memakai memori numpy secara langsung (tanpa salinan)
+        self.image = Image.frombuffer('RGBA', self.size, self.display_rgba, 'raw', 'RGBA', 0, 1)
+        self.photo = None
+
+    def load(self, frame):
+        """
+        Menyalin/resize frame capture ke buffer kerja dan menyiapkan versi RGB-nya.
+
+        Args:
+            frame (np.ndarray): Frame BGR dari sumber frame
+
+        Returns:
+            np.ndarray: Buffer frame BGR berukuran tetap (dipakai ulang setiap frame)
+        """
+        if frame.shape == self.frame.shape:
+            np.copyto(self.frame, frame)
+        else:
+            cv2.resize(frame, self.size, dst=self.frame)
+        cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.frame
+
+    def begin_overlay(self):
+        """Mengisi buffer overlay dengan frame saat ini dan mengembalikannya untuk digambari."""
+        np.copyto(self.display, self.frame)
+        return self.display
+
+    def render(self, label):
+        """
+        Menampilkan buffer overlay ke label Tk dengan memperbarui PhotoImage yang sama.
+
+        Args:
+            label (tk.Label): Label video pada GUI
+        """
+        cv2.cvtColor(self.display, cv2.COLOR_BGR2RGBA, dst=self.display_rgba)
+        if self.photo is None:
+            self.photo = ImageTk.PhotoImage(image=self.image)
+        else:
+            self.photo.paste(self.image)
+
+        # Label dapat dilepas dari gambar (misalnya saat STOP); pasang ulang jika perlu
+        if str(label.cget('image')) != str(self.photo):
+            label.configure(image=self.photo)
+            label.imgtk = self.photo
+
+
+def _allocating_frame(frame, size, label=None):
+    """Jalur lama (sebelum pool): setiap tahap membuat array/gambar baru."""
+    frame = cv2.resize(frame, size)
+    display = frame.copy()
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)          # FaceMesh
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)          # Pose
+    image = Image.fromarray(cv2.cvtColor(display, cv2.COLOR_BGR2RGB))
+    if label is not None:
+        photo = ImageTk.PhotoImage(image=image)
+        label.configure(image=photo)
+        label.imgtk = photo
+
+
+def _pooled_frame(pool, frame, label=None):
+    pool.load(frame)
+    pool.begin_overlay()
+    if label is not None:
+        pool.render(label)
+    else:
+        cv2.cvtColor(pool.display, cv2.COLOR_BGR2RGBA, dst=pool.display_rgba)
+
+
+def _measure(step, frames):
+    """(KB transien per frame dari puncak tracemalloc, koleksi GC gen 0, ms rata-rata, ms p99)."""
+    step(frames[0])
+    gc.collect()
+    collections = gc.get_stats()[0]['collections']
+    times, transient = [], []
+    tracemalloc.start()
+    for frame in frames:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        step(frame)
+        times.append(time.perf_counter() - start)
+        transient.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    times = np.asarray(times) * 1e3
+    return (np.mean(transient) / 1024, gc.get_stats()[0]['collections'] - collections,
+            times.mean(), np.percentile(times, 99))
+
+
+def benchmark(n_frames=300, capture_size=(1280, 720), size=(640, 480)):
+    """
+    Mencetak alokasi transien per frame, jumlah koleksi GC dan waktu per frame untuk jalur
+    alokasi per frame (lama) dan FramePool. Tahap PhotoImage Tk hanya diukur jika display tersedia.
+    """
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (capture_size[1], capture_size[0], 3), dtype=np.uint8)
+    variants = [np.roll(base, i, axis=1) for i in range(8)]
+    frames = [variants[i % len(variants)] for i in range(n_frames)]
+
+    label = root = None
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        label = tk.Label(root)
+    except Exception as e:
+        print(f"⚠️ Tk display unavailable ({e}); PhotoImage step not measured")
+
+    pool = FramePool(*size)
+    print(f"{len(frames)} frames {capture_size[0]}x{capture_size[1]} -> {size[0]}x{size[1]}")
+    print(f"{'path':<12}{'alloc KB/frame':>16}{'gc gen0':>10}{'mean ms':>10}{'p99 ms':>10}")
+    for name, step in (("allocating", lambda f: _allocating_frame(f, size, label)),
+                       ("pool", lambda f: _pooled_frame(pool, f, label))):
+        kb, collections, mean, p99 = _measure(step, frames)
+        print(f"{name:<12}{kb:>16.0f}{collections:>10d}{mean:>10.3f}{p99:>10.3f}")
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    benchmark()
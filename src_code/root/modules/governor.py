@@ -0,0 +1,152 @@
+# modules/governor.py
+
+"""
+Modul governor kualitas/performa untuk loop video real-time.
+
+Governor memantau latensi pemrosesan tiap frame (EMA) dan menurunkan level kualitas
+ketika latensi melebihi budget frame secara konsisten, lalu menaikkannya kembali
+ketika ada headroom. Setiap level mengatur:
+- inference_scale  : skala resolusi frame yang dikirim ke MediaPipe
+- model_complexity : kompleksitas model MediaPipe Pose (RespirasiExtractor)
+- refine_landmarks : refine landmark FaceMesh (iris/bibir, lebih mahal)
+- detect_interval  : inferensi landmark dijalankan setiap N frame
+- plot_interval    : plot diperbarui setiap N frame
+"""
+
+import time
+
+
+# Level 0 = kualitas penuh, level terakhir = paling ringan
+QUALITY_LEVELS = [
+    {'inference_scale': 1.0, 'model_complexity': 1, 'refine_landmarks': True, 'detect_interval': 1, 'plot_interval': 1},
+    {'inference_scale': 1.0, 'model_complexity': 1, 'refine_landmarks': False, 'detect_interval': 1, 'plot_interval': 2},
+    {'inference_scale': 0.75, 'model_complexity': 0, 'refine_landmarks': False, 'detect_interval': 1, 'plot_interval': 3},
+    {'inference_scale': 0.75, 'model_complexity': 0, 'refine_landmarks': False, 'detect_interval': 2, 'plot_interval': 4},
+    {'inference_scale': 0.5, 'model_complexity': 0, 'refine_landmarks': False, 'detect_interval': 3, 'plot_interval': 6},
+]
+
+
+def quality_levels(inference_scale=1.0, model_complexity=1, refine_landmarks=True, detect_interval=1):
+    """
+    Menyusun level kualitas dengan level 0 = pengaturan dasar dari konfigurasi.
+    Level berikutnya tidak pernah lebih berat dari pengaturan dasar.
+
+    Args:
+        inference_scale (float): Skala inferensi dasar
+        model_complexity (int): Kompleksitas model Pose dasar
+        refine_landmarks (bool): Refine landmark FaceMesh dasar
+        detect_interval (int): Interval inferensi landmark dasar (frame)
+
+    Returns:
+        list[dict]: Level kualitas untuk PerformanceGovernor
+    """
+    return [
+        dict(level,
+             inference_scale=min(level['inference_scale'], inference_scale),
+             model_complexity=min(level['model_complexity'], model_complexity),
+             refine_landmarks=level['refine_landmarks'] and refine_landmarks,
+             detect_interval=max(level['detect_interval'], detect_interval))
+        for level in QUALITY_LEVELS
+    ]
+
+
+class PerformanceGovernor:
+    """
+    Governor adaptif berbasis latensi frame.
+
+    Args:
+        target_ms (float): Budget waktu per frame (ms), misalnya 1000 / fps
+        levels (list[dict]): Daftar level kualitas, dari terbaik ke teringan
+        alpha (float): Faktor smoothing EMA latensi
+        degrade_after (int): Jumlah frame berturut-turut di atas budget sebelum turun level
+        recover_after (int): Jumlah frame berturut-turut dengan headroom sebelum naik level
+        headroom (float): Rasio latensi/budget yang dianggap cukup longgar untuk naik level
+        enabled (bool): Jika False, level tetap 0 (hanya latensi yang dipantau)
+    """
+    def __init__(self, target_ms=33.3, levels=None, alpha=0.2,
+                 degrade_after=10, recover_after=90, headroom=0.6, enabled=True):
+        self.target_ms = target_ms
+        self.enabled = enabled
+        self.levels = levels or QUALITY_LEVELS
+        self.alpha = alpha
+        self.degrade_after = degrade_after
+        self.recover_after = recover_after
+        self.headroom = headroom
+
+        self.level = 0
+        self.latency_ms = None
+        self.frame_count = 0
+        self.history = []
+        self._over = 0
+        self._under = 0
+
+    @property
+    def settings(self):
+        """Pengaturan (dict) untuk level kualitas saat ini."""
+        return self.levels[self.level]
+
+    def should_detect(self):
+        """True jika inferensi landmark harus dijalankan pada frame ini."""
+        return self.frame_count % self.settings['detect_interval'] == 0
+
+    def should_plot(self):
+        """True jika plot harus diperbarui pada frame ini."""
+        return self.frame_count % self.settings['plot_interval'] == 0
+
+    def update(self, latency_ms):
+        """
+        Memasukkan latensi satu frame dan menyesuaikan level bila perlu.
+
+        Args:
+            latency_ms (float): Waktu pemrosesan frame terakhir (ms)
+
+        Returns:
+            bool: True jika level kualitas berubah
+        """
+        self.frame_count += 1
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.alpha * (latency_ms - self.latency_ms)
+
+        if self.latency_ms > self.target_ms:
+            self._over += 1
+            self._under = 0
+        elif self.latency_ms < self.target_ms * self.headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = 0
+            self._under = 0
+
+        if not self.enabled:
+            return False
+        if self._over >= self.degrade_after and self.level < len(self.levels) - 1:
+            return self._set_level(self.level + 1)
+        if self._under >= self.recover_after and self.level > 0:
+            return self._set_level(self.level - 1)
+        return False
+
+    def _set_level(self, level):
+        old = self.level
+        self.level = level
+        self._over = 0
+        self._under = 0
+        self.history.append((time.time(), old, level, self.latency_ms))
+        direction = "degrade" if level > old else "recover"
+        print(f"⚙️ Governor {direction}: level {old} → {level} "
+              f"(latency {self.latency_ms:.1f} ms, budget {self.target_ms:.1f} ms) {self.settings}")
+        return True
+
+    def apply(self, app):
+        """
+        Menerapkan pengaturan level saat ini ke ekstraktor aplikasi.
+
+        Args:
+            app: Objek utama aplikasi yang memiliki rppg_extractor dan respirasi_extractor
+        """
+        s = self.settings
+        app.rppg_extractor.configure(inference_scale=s['inference_scale'],
+                                     refine_landmarks=s['refine_landmarks'])
+        app.respirasi_extractor.configure(inference_scale=s['inference_scale'],
+                                          model_complexity=s['model_complexity'])
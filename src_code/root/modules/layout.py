@@ -6,8 +6,10 @@ import tkinter.messagebox as messagebox
 from matplotlib import pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from modules.video_processing import start_video, stop_video
-from modules.recording import start_30s_recording, save_data
+from modules.recording import start_30s_recording, export_last, save_data
 from modules.plotting import build_plot
+from modules.spectrogram_view import build_spectrogram
+from modules.trend_view import open_trend_window
 
 def init_layout(app):
     """
@@ -47,21 +49,34 @@ def init_layout(app):
     # Panel kanan untuk grafik
     app.right_panel = tk.Frame(app.window, bg="#1e1e1e")
     app.right_panel.grid(row=1, column=1, sticky="nsew", padx=10, pady=10)
-    app.right_panel.rowconfigure(0, weight=1)
-    app.right_panel.rowconfigure(1, weight=1)
-    app.right_panel.rowconfigure(2, weight=0)  # Status recording
+    app.right_panel.rowconfigure(0, weight=2)
+    app.right_panel.rowconfigure(1, weight=1)  # Spektrogram HR (opsional)
+    app.right_panel.rowconfigure(2, weight=2)
+    app.right_panel.rowconfigure(3, weight=1)  # Spektrogram RR (opsional)
+    app.right_panel.rowconfigure(4, weight=0)  # Status recording
+    app.right_panel.rowconfigure(5, weight=0)  # Alert aktif
     app.right_panel.columnconfigure(0, weight=1)
 
     # Build plots
     build_plot(app, app.right_panel, 0, "❤️ Heart Rate", "deeppink", "hr_plot", "ax_hr", "canvas_hr", "BPM")
-    build_plot(app, app.right_panel, 1, "💨 Respiration Rate", "cyan", "rr_plot", "ax_rr", "canvas_rr", "Breaths/min")
+    build_plot(app, app.right_panel, 2, "💨 Respiration Rate", "cyan", "rr_plot", "ax_rr", "canvas_rr", "Breaths/min")
+    if app.spectrogram_worker is not None:
+        build_spectrogram(app, app.right_panel, 1, 'rppg', "Spectrogram rPPG", "deeppink")
+        build_spectrogram(app, app.right_panel, 3, 'respirasi', "Spectrogram Respiration", "cyan")
 
     # Recording status
     app.recording_status_label = tk.Label(app.right_panel, 
                                          textvariable=app.recording_status_text,
                                          fg="yellow", bg="#1e1e1e", 
                                          font=("Arial", 10, "bold"))
-    app.recording_status_label.grid(row=2, column=0, pady=5)
+    app.recording_status_label.grid(row=4, column=0, pady=5)
+
+    # Alert aktif (HR/RR di luar rentang, wajah/pose hilang)
+    app.alert_label = tk.Label(app.right_panel,
+                               textvariable=app.alert_text,
+                               fg="red", bg="#1e1e1e",
+                               font=("Arial", 10, "bold"))
+    app.alert_label.grid(row=5, column=0, pady=5)
 
       # === Tombol Kontrol ===
     button_frame = tk.Frame(app.window, bg="#2e2e2e")
@@ -94,7 +109,7 @@ def init_layout(app):
     # Tombol: Rekam 30 Detik
     record_btn = tk.Button(
         button_frame,
-        text="📊 RECORD 30s",
+        text=f"📊 RECORD {app.config.recording.duration:g}s",
         command=lambda: start_30s_recording(app),
         bg="orange",
         fg="white",
@@ -103,6 +118,18 @@ def init_layout(app):
     )
     record_btn.pack(side=tk.LEFT, padx=10)
 
+    # Tombol: Ekspor instan N detik terakhir dari ring riwayat
+    last_btn = tk.Button(
+        button_frame,
+        text=f"⏪ LAST {app.config.recording.duration:g}s",
+        command=lambda: export_last(app),
+        bg="dark orange",
+        fg="white",
+        font=("Arial", 12, "bold"),
+        width=12
+    )
+    last_btn.pack(side=tk.LEFT, padx=10)
+
     # Tombol: Simpan Data
     save_btn = tk.Button(
         button_frame,
@@ -114,3 +141,15 @@ def init_layout(app):
         width=12
     )
     save_btn.pack(side=tk.LEFT, padx=10)
+
+    # Tombol: Tren Sesi
+    trend_btn = tk.Button(
+        button_frame,
+        text="📈 TREND",
+        command=lambda: open_trend_window(app),
+        bg="medium purple",
+        fg="white",
+        font=("Arial", 12, "bold"),
+        width=12
+    )
+    trend_btn.pack(side=tk.LEFT, padx=10)
@@ -7,8 +7,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 # Import modul-modul yang diperlukan
-from signal_filter import apply_bandpass_filter, filter_rppg_signal
-from utils import estimate_heart_rate, estimate_respiration_rate
+from artifact import reject_artifacts
+from signal_filter import apply_bandpass_filter
 
 
 # Fungsi untuk membangun plot pada antarmuka pengguna
@@ -54,7 +54,8 @@ def build_plot(app, parent, row, title, color, attr_plot, attr_ax, attr_canvas,
     setattr(app, attr_canvas, canvas)
 
 
-def update_plot(app, buffer, filter_func, fps, plot_line, ax, canvas, label_suffix, title_color):
+def update_plot(app, buffer, filter_func, fps, plot_line, ax, canvas, label_suffix, title_color, tracker,
+                extra_title=None):
     """ Memperbarui plot dengan data sinyal yang telah difilter.
     Fungsi ini memfilter sinyal, memperbarui data plot, dan menghitung estimasi heart rate atau respiratory rate.
     Parameters yang digunakan:
@@ -66,9 +67,12 @@ def update_plot(app, buffer, filter_func, fps, plot_line, ax, canvas, label_suff
         canvas : canvas untuk menggambar ulang
         label_suffix : satuan teks (BPM, Breaths/min)
         title_color : warna teks judul plot
+        tracker : RateTracker (utils.py) untuk estimasi laju pada sinyal ini
+        extra_title : teks tambahan di judul (misalnya metrik HRV), opsional
     """
     
-    if not buffer or len(buffer) < 60 or plot_line is None or ax is None or canvas is None:
+    min_samples = app.config.processing.min_plot_samples
+    if not buffer or len(buffer) < min_samples or plot_line is None or ax is None or canvas is None:
         return
 
     try:
@@ -85,11 +89,18 @@ def update_plot(app, buffer, filter_func, fps, plot_line, ax, canvas, label_suff
         padding = y_range * 0.1 if y_range > 0 else 0.01
         ax.set_ylim(y_min - padding, y_max + padding)
 
-        # Hitung heart rate atau respiratory rate
-        rate = estimate_heart_rate(filtered, fps) if label_suffix == 'BPM' \
-            else estimate_respiration_rate(filtered, fps)
-
-        ax.set_title(f"{rate} {label_suffix}", color=title_color, fontsize=12, fontweight='bold')
+        # Hitung heart rate atau respiratory rate pada band dari konfigurasi (estimator zoom
+        # dengan pelacakan); kualitas = rasio daya puncak terhadap daya band pada bin asli
+        rate = tracker.update(filtered, fps)
+        quality = tracker.quality
+        app.latest_rates[label_suffix] = (rate, quality)
+        if app.alert_engine is not None:
+            app.alert_engine.update('hr' if label_suffix == 'BPM' else 'rr', rate, quality)
+
+        title = f"{rate:.1f} {label_suffix}"
+        if extra_title:
+            title += f"  |  {extra_title}"
+        ax.set_title(title, color=title_color, fontsize=12, fontweight='bold')
         canvas.draw()
 
     # Handle exceptions during plot update
@@ -97,20 +108,62 @@ def update_plot(app, buffer, filter_func, fps, plot_line, ax, canvas, label_suff
         print(f"Plot update error ({label_suffix}): {e}")
 
 
+def _hrv_title(metrics):
+    """ Teks ringkas metrik HRV (SDNN, RMSSD) dari analisis puncak, atau None jika belum cukup data.
+    """
+    if metrics['sdnn'] is None:
+        return None
+    return f"SDNN {metrics['sdnn']:.0f} ms, RMSSD {metrics['rmssd']:.0f} ms"
+
+
+def _breath_title(metrics):
+    """ Teks ringkas interval antar napas rata-rata, atau None jika belum cukup data.
+    """
+    if metrics['rate'] is None:
+        return None
+    return f"BBI {60.0 / metrics['rate']:.1f} s"
+
+
+def _reject_artifacts(app, buffer, fs, landmark_speed=None, brightness=None):
+    """ Mengeksisi artefak iluminasi/gerakan dari buffer sebelum filtering (lihat artifact.py),
+    agar satu lompatan tidak merusak periodogram selama seluruh panjang buffer.
+    """
+    flt = app.config.filter
+    if not flt.artifact_rejection:
+        return buffer
+    repaired, _ = reject_artifacts(buffer, fs, landmark_speed, brightness, **flt.artifact_kwargs())
+    return repaired
+
+
+def _aligned_companion(app, companion, n):
+    """ Bagian buffer pendamping (sejajar rppg_buffer) yang sejajar dengan n sampel terakhir
+    rppg_smoothed_buffer, yang tertunda `rppg_preprocessor.delay` sampel.
+    """
+    end = len(companion) - app.rppg_preprocessor.delay
+    return companion[max(end - n, 0):end]
+
+
 def update_hr_plot(app):
     """ Memperbarui plot heart rate dengan data rPPG yang telah difilter.
-    Fungsi ini memfilter sinyal rPPG, memperbarui data plot, dan menghitung estimasi heart rate.
+    Median dan Savitzky-Golay sudah dijalankan per sampel (app.rppg_preprocessor), sehingga
+    di sini hanya eksisi artefak dan bandpass yang memproses seluruh buffer.
     """
+    flt = app.config.filter
     update_plot(
         app=app,
-        buffer=app.rppg_buffer,
-        filter_func=filter_rppg_signal,
-        fps=app.fps,
+        buffer=app.rppg_smoothed_buffer,
+        filter_func=lambda buf, fs: apply_bandpass_filter(
+            _reject_artifacts(app, buf, fs, _aligned_companion(app, app.rppg_motion_buffer, len(buf)),
+                              _aligned_companion(app, app.brightness_buffer, len(buf))),
+            *flt.band("rPPG"), fs, flt.bandpass_order),
+        fps=app.rppg_fs,
         plot_line=app.hr_plot,
         ax=app.ax_hr,
         canvas=app.canvas_hr,
         label_suffix='BPM',
-        title_color='deeppink'
+        title_color='deeppink',
+        tracker=app.hr_tracker,
+        extra_title=_hrv_title(app.hr_peaks.metrics())
     )
 
 
@@ -121,20 +174,36 @@ def update_rr_plot(app):
     update_plot(
         app=app,
         buffer=app.respirasi_buffer,
-        filter_func=lambda buf, fs: apply_bandpass_filter(buf, 0.1, 0.5, fs),
-        fps=app.fps,
+        filter_func=lambda buf, fs: apply_bandpass_filter(_reject_artifacts(app, buf, fs),
+                                                          *app.config.filter.band("respirasi"), fs,
+                                                          app.config.filter.bandpass_order),
+        fps=app.respirasi_fs,
         plot_line=app.rr_plot,
         ax=app.ax_rr,
         canvas=app.canvas_rr,
         label_suffix='Breaths/min',
-        title_color='cyan'
+        title_color='cyan',
+        tracker=app.rr_tracker,
+        extra_title=_breath_title(app.rr_peaks.metrics())
     )
 
 
+def respirasi_signal_label(motion_compensation):
+    """ (deskripsi, satuan) sinyal respirasi mentah sesuai mode ekstraksi RespirasiExtractor:
+    Y tengah bahu ternormalisasi, atau perpindahan dada terakumulasi (optical flow) dalam
+    satuan lebar bahu jika motion compensation aktif.
+    """
+    if motion_compensation:
+        return "Chest displacement, motion compensated", "Displacement (shoulder widths)"
+    return "Shoulder Y-coordinate", "Y Coordinate (normalized)"
+
+
 def _plot_signal_subplot(ax, time_sec, data, color, title, ylabel):
     """ Membuat subplot untuk menampilkan sinyal dengan waktu dan data yang diberikan.
+    Nilai NaN (sampel yang tidak tersedia) ditampilkan sebagai celah pada garis.
     """
-    if data:
+    data = np.asarray(data, dtype=float)
+    if len(data) and not np.all(np.isnan(data)):
         ax.plot(time_sec[:len(data)], data, color, linewidth=1)
         ax.set_title(title, fontweight='bold')
         ax.set_xlabel('Time (seconds)')
@@ -3,18 +3,151 @@ import time
 import threading
 import traceback
 from datetime import datetime
+import cv2
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from tkinter import messagebox
-from modules.plotting import _plot_signal_subplot
+
+from frame_source import save_recording
+from session_capture import CAPTURE_EXTENSION, SessionCaptureWriter
+from modules.plotting import _plot_signal_subplot, respirasi_signal_label
+
+
+# Satu baris per frame; NaN menandakan nilai yang tidak tersedia pada frame tersebut
+RECORDING_DTYPE = np.dtype([
+    ('timestamps', 'f8'),
+    ('raw_rgb', 'f8'),
+    ('rppg_filtered', 'f8'),
+    ('respirasi_raw', 'f8'),
+    ('respirasi_filtered', 'f8'),
+])
+
+RECORDING_COLUMNS = RECORDING_DTYPE.names
+
+
+class HistoryRing:
+    """
+    Ring riwayat per frame berukuran tetap yang diisi terus-menerus selama feed berjalan.
+
+    Baris sinyal (structured array NumPy, satu baris per frame, semua kanal sejajar dengan
+    timestamp) dan frame yang diperkecil (opsional, pada laju `frame_fps`) dialokasikan
+    sekali; frame terlama ditimpa. Rekaman dapat mencakup detik-detik sebelum tombol
+    ditekan, dan ekspor "terakhir N detik" cukup menyalin isi ring tanpa menunggu.
+
+    Args:
+        seconds (float): Panjang riwayat (detik)
+        fs (float): Frame rate nominal
+        frame_size (tuple | None): (lebar, tinggi) frame yang disimpan, None = tanpa frame
+        frame_fps (float): Laju frame yang disimpan
+        margin (float): Margin kapasitas untuk jitter frame rate
+    """
+    def __init__(self, seconds=60, fs=30, frame_size=None, frame_fps=5.0, margin=1.5):
+        self.capacity = int(np.ceil(seconds * fs * margin))
+        self._data = np.full(self.capacity, np.nan, dtype=RECORDING_DTYPE)
+        self.frame_size = frame_size
+        self.frame_interval = 1.0 / frame_fps
+        self._frames = self._frame_times = None
+        if frame_size is not None:
+            width, height = frame_size
+            count = int(np.ceil(seconds * min(frame_fps, fs) * margin))
+            self._frames = np.zeros((count, height, width, 3), dtype=np.uint8)
+            self._frame_times = np.full(count, np.nan)
+        self.clear()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def latest(self):
+        """Timestamp baris terbaru, atau None jika kosong."""
+        return self._data['timestamps'][self._head - 1] if self._size else None
+
+    @property
+    def span(self):
+        """Rentang waktu yang tersedia di ring (detik)."""
+        if not self._size:
+            return 0.0
+        return self.latest - self._data['timestamps'][(self._head - self._size) % self.capacity]
+
+    def clear(self):
+        """Mengosongkan ring tanpa alokasi ulang."""
+        self._head = self._size = 0
+        self._frame_head = self._frame_count = 0
+        self._next_frame_time = -np.inf
+
+    def append(self, timestamp, raw_rgb=None, rppg_filtered=None, respirasi_raw=None,
+               respirasi_filtered=None, frame=None):
+        """
+        Menambahkan satu baris (satu frame), menimpa baris terlama jika ring penuh.
+        Nilai None disimpan sebagai NaN; `frame` (BGR) diperkecil dan disimpan hanya
+        jika ring menyimpan frame dan jarak dari frame tersimpan sebelumnya cukup.
+        """
+        self._data[self._head] = tuple(
+            np.nan if v is None else v
+            for v in (timestamp, raw_rgb, rppg_filtered, respirasi_raw, respirasi_filtered)
+        )
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+        if frame is not None and self._frames is not None and timestamp >= self._next_frame_time:
+            slot = self._frame_head
+            cv2.resize(frame, self.frame_size, dst=self._frames[slot], interpolation=cv2.INTER_AREA)
+            self._frame_times[slot] = timestamp
+            self._frame_head = (slot + 1) % len(self._frames)
+            self._frame_count = min(self._frame_count + 1, len(self._frames))
+            # Jadwal tetap per interval (jitter frame tidak menggeser laju); setelah jeda
+            # panjang jadwal dimulai ulang dari frame ini
+            self._next_frame_time = max(self._next_frame_time + self.frame_interval,
+                                        timestamp + 0.5 * self.frame_interval)
+
+    @staticmethod
+    def _ordered(head, size, capacity):
+        return (head - size + np.arange(size)) % capacity
+
+    def snapshot(self, since=None):
+        """
+        Menyalin isi ring (urut waktu) sejak timestamp `since`.
+
+        Args:
+            since (float | None): Timestamp awal (inklusif); None = seluruh ring
+
+        Returns:
+            tuple: (rows, frames, frame_timestamps) — rows berupa structured array
+            RECORDING_DTYPE; frames (N, H, W, 3) dan frame_timestamps None jika ring
+            tidak menyimpan frame
+        """
+        order = self._ordered(self._head, self._size, self.capacity)
+        if since is not None:
+            order = order[np.searchsorted(self._data['timestamps'][order], since):]
+        rows = self._data[order]
+
+        frames = frame_times = None
+        if self._frames is not None:
+            order = self._ordered(self._frame_head, self._frame_count, len(self._frames))
+            if since is not None:
+                order = order[np.searchsorted(self._frame_times[order], since):]
+            frames, frame_times = self._frames[order], self._frame_times[order]
+        return rows, frames, frame_times
+
+
+def history_from_config(config, fs):
+    """Membuat HistoryRing dari `AppConfig.recording` dan ukuran frame capture."""
+    r = config.recording
+    frame_size = None
+    if r.frame_scale > 0:
+        frame_size = (max(1, int(round(config.capture.width * r.frame_scale))),
+                      max(1, int(round(config.capture.height * r.frame_scale))))
+    return HistoryRing(seconds=r.history, fs=fs, frame_size=frame_size, frame_fps=r.frame_fps)
 
 
 def start_30s_recording(app):
     """
-    Memulai proses perekaman sinyal selama 30 detik.
+    Memulai perekaman sinyal selama `recording.duration` detik (default 30).
 
-    Fungsi ini akan memeriksa apakah video feed aktif. Jika ya, maka akan menginisialisasi buffer
-    penyimpanan data sinyal dan memulai thread untuk menghitung mundur waktu rekaman.
+    Sebanyak `recording.pre_trigger` detik diambil dari ring riwayat (sebelum tombol ditekan),
+    sehingga hanya sisa durasinya yang perlu ditunggu. Thread hitung mundur menjadwalkan
+    ekspor saat durasi terpenuhi.
 
     Args:
         app: Objek utama aplikasi yang memiliki atribut dan buffer sinyal.
@@ -27,112 +160,224 @@ def start_30s_recording(app):
         messagebox.showinfo("Info", "Recording already in progress!")
         return
 
-    app.recording_data = {
-        'raw_rgb': [],
-        'rppg_filtered': [],
-        'respirasi_raw': [],
-        'respirasi_filtered': [],
-        'timestamps': []
-    }
-
+    r = app.config.recording
+    pre_trigger = min(r.pre_trigger, app.signal_history.span)
     app.recording_30s = True
-    app.recording_start_time = time.time()
-    app.recording_status_text.set("Recording... 0s/30s")
+    app.recording_trigger = app.signal_history.latest if len(app.signal_history) else None
+    app.recording_pre_trigger = pre_trigger
+    app.recording_start_time = time.time() - pre_trigger
+    app.recording_status_text.set(f"Recording... {pre_trigger:.0f}s/{r.duration:g}s")
 
     threading.Thread(target=lambda: recording_countdown(app), daemon=True).start()
-    messagebox.showinfo("Recording Started", "Recording 30 seconds of signal data...")
+    messagebox.showinfo("Recording Started",
+                        f"Recording {r.duration:g} seconds of signal data "
+                        f"({pre_trigger:.0f} s before the trigger)...")
 
 
 def recording_countdown(app):
     """
-    Mengatur hitung mundur selama 30 detik saat perekaman berlangsung.
+    Mengatur hitung mundur sisa durasi rekaman (durasi dikurangi bagian pra-pemicu).
 
     Fungsi ini akan terus memperbarui label status waktu perekaman di antarmuka pengguna dan
-    memicu proses penyimpanan dan visualisasi saat perekaman selesai.
+    menjadwalkan pengambilan isi ring beserta ekspornya di thread GUI saat perekaman selesai.
 
     Args:
         app: Objek utama aplikasi yang merekam data.
     """
+    duration = app.config.recording.duration
+    pre_trigger = app.recording_pre_trigger
     start_time = time.time()
-    while app.recording_30s and (time.time() - start_time) < 30:
-        elapsed = int(time.time() - start_time)
-        app.recording_status_text.set(f"Recording... {elapsed}s/30s")
+    while app.recording_30s and (time.time() - start_time) < duration - pre_trigger:
+        elapsed = int(pre_trigger + time.time() - start_time)
+        app.recording_status_text.set(f"Recording... {elapsed}s/{duration:g}s")
         time.sleep(0.5)
 
     if app.recording_30s:
         app.recording_30s = False
         app.recording_status_text.set("Processing & Saving...")
-        app.window.after(100, lambda: generate_30s_plots(app))
+        app.window.after(0, lambda: _finish_recording(app))
+
 
+def _finish_recording(app):
+    """Mengambil rekaman dari ring (thread GUI, sama dengan penulis ring) lalu mengekspornya."""
+    trigger = app.recording_trigger
+    since = None if trigger is None else trigger - app.recording_pre_trigger
+    rows, frames, frame_times = app.signal_history.snapshot(since)
+    _export_async(app, rows, frames, frame_times, 'recording_30s', app.recording_start_time,
+                  trigger=trigger)
 
-def generate_30s_plots(app):
+
+def export_last(app):
     """
-    Menghasilkan grafik dan menyimpan data sinyal setelah 30 detik perekaman.
+    Mengekspor `recording.duration` detik terakhir dari ring riwayat secara instan.
 
-    Fungsi ini menyimpan 4 plot sinyal (RGB, rPPG, respiras raw & filtered) dalam satu gambar,
-    dan juga menyimpan data numerik ke file teks.
+    Isi ring disalin di thread GUI (hanya salinan array); plot dan file ditulis di thread
+    latar belakang sehingga capture tidak terhenti.
 
     Args:
-        app: Objek utama aplikasi dengan data perekaman.
+        app: Objek utama aplikasi yang memiliki ring riwayat.
     """
-    try:
-        if not app.recording_data['timestamps']:
-            messagebox.showwarning("Warning", "No data recorded!")
-            app.recording_status_text.set("Ready")
+    if not len(app.signal_history):
+        messagebox.showwarning("Warning", "No signal history yet. Please start video feed first!")
+        return
+    duration = app.config.recording.duration
+    rows, frames, frame_times = app.signal_history.snapshot(app.signal_history.latest - duration)
+    app.recording_status_text.set(f"Saving last {duration:g}s...")
+    span = rows['timestamps'][-1] - rows['timestamps'][0]
+    _export_async(app, rows, frames, frame_times, 'history_export', time.time() - span)
+
+
+def _export_async(app, rows, frames, frame_times, kind, started_at, trigger=None):
+    """Menulis ekspor di thread latar belakang lalu melaporkan hasilnya di thread GUI."""
+    ended_at = time.time()
+
+    def work():
+        try:
+            paths = export_recording(rows, app.fps, "saved_signals", frames, frame_times,
+                                     app.config.recording.frame_fps, trigger,
+                                     app.config.processing.motion_compensation)
+        except Exception as e:
+            print(f"Plot generation error: {traceback.format_exc()}")
+            app.window.after(0, lambda: _export_failed(app, e))
             return
+        app.window.after(0, lambda: _export_done(app, kind, started_at, ended_at, paths))
 
-        output_dir = "saved_signals"
-        os.makedirs(output_dir, exist_ok=True)
-        now = datetime.now().strftime("%Y%m%d_%H%M%S")
-        timestamps = np.array(app.recording_data['timestamps'])
-        time_sec = timestamps - timestamps[0]
-
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        fig.suptitle(f'30-Second Signal Analysis - {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', 
-                     fontsize=16, fontweight='bold')
-
-        _plot_signal_subplot(axes[0, 0], time_sec, app.recording_data['raw_rgb'], 
-                             'g-', "Raw RGB Green Channel Signal", "RGB Green Value (0-255)")
-        _plot_signal_subplot(axes[0, 1], time_sec, app.recording_data['rppg_filtered'], 
-                             'r-', "Filtered rPPG Signal (Heart Rate)", "Normalized Amplitude")
-        _plot_signal_subplot(axes[1, 0], time_sec, app.recording_data['respirasi_raw'], 
-                             'b-', "Raw Respiration Signal (Shoulder Y-coordinate)", "Y Coordinate (normalized)")
-        _plot_signal_subplot(axes[1, 1], time_sec, app.recording_data['respirasi_filtered'], 
-                             'c-', "Filtered Respiration Signal", "Filtered Amplitude")
-
-        plt.tight_layout()
-        plot_filename = os.path.join(output_dir, f"signal_analysis_{now}.png")
-        plt.savefig(plot_filename, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        data_filename = os.path.join(output_dir, f"signal_data_{now}.txt")
-        with open(data_filename, 'w') as f:
-            f.write(f"# 30-Second Signal Data Export - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Sampling Rate: {app.fps} Hz\n")
-            f.write(f"# Duration: {len(app.recording_data['timestamps'])/app.fps:.1f} seconds\n\n")
-            f.write("Time(s)\tRaw_RGB\trPPG_Filtered\tRespi_Raw\tRespi_Filtered\n")
-
-            max_len = max(len(app.recording_data[key]) for key in app.recording_data if key != 'timestamps')
-            for i in range(max_len):
-                time_val = time_sec[i] if i < len(time_sec) else ""
-                row = [
-                    time_val,
-                    app.recording_data['raw_rgb'][i] if i < len(app.recording_data['raw_rgb']) else "",
-                    app.recording_data['rppg_filtered'][i] if i < len(app.recording_data['rppg_filtered']) else "",
-                    app.recording_data['respirasi_raw'][i] if i < len(app.recording_data['respirasi_raw']) else "",
-                    app.recording_data['respirasi_filtered'][i] if i < len(app.recording_data['respirasi_filtered']) else "",
-                ]
-                f.write("\t".join(map(str, row)) + "\n")
-
-        messagebox.showinfo("Save Successful", f"30-second analysis saved:\nPlot: {plot_filename}\nData: {data_filename}")
+    threading.Thread(target=work, daemon=True).start()
 
-    except Exception as e:
-        error_msg = f"Failed to generate plots: {str(e)}"
-        messagebox.showerror("Plot Error", error_msg)
-        print(f"Plot generation error: {traceback.format_exc()}")
 
-    finally:
-        app.recording_status_text.set("Ready")
+def _export_done(app, kind, started_at, ended_at, paths):
+    app.recording_status_text.set("Ready")
+    if paths is None:
+        messagebox.showwarning("Warning", "No data recorded!")
+        return
+    if app.session_id:
+        app.session_store.add_segment(app.session_id, kind, started_at, ended_at,
+                                      plot_path=paths['plot'], data_path=paths['data'],
+                                      recording_path=paths.get('frames'))
+    message = f"Signal analysis saved:\nPlot: {paths['plot']}\nData: {paths['data']}"
+    if paths.get('frames'):
+        message += f"\nFrames: {paths['frames']}"
+    messagebox.showinfo("Save Successful", message)
+
+
+def _export_failed(app, error):
+    app.recording_status_text.set("Ready")
+    messagebox.showerror("Plot Error", f"Failed to generate plots: {error}")
+
+
+def export_recording(rows, fs, output_dir, frames=None, frame_timestamps=None, frame_fps=None,
+                     trigger=None, motion_compensation=False):
+    """
+    Menyimpan 4 plot sinyal (RGB, rPPG, respirasi raw & filtered) dalam satu gambar, data
+    numerik ke file teks, dan frame yang diperkecil (jika ada) sebagai rekaman `.npz`.
+
+    Memakai Figure berorientasi objek (tanpa pyplot), sehingga aman dipanggil dari thread
+    selain thread GUI.
+
+    Args:
+        rows (np.ndarray): Baris RECORDING_DTYPE (dari `HistoryRing.snapshot`)
+        fs (float): Frame rate nominal
+        output_dir (str): Folder tujuan
+        frames (np.ndarray | None): Frame BGR yang diperkecil
+        frame_timestamps (np.ndarray | None): Timestamp per frame
+        frame_fps (float | None): Laju frame yang disimpan
+        trigger (float | None): Timestamp saat tombol rekam ditekan (ditandai di plot)
+        motion_compensation (bool): Mode ekstraksi respirasi (label dan satuan sinyal mentah)
+
+    Returns:
+        dict | None: Path 'plot', 'data' dan (opsional) 'frames', atau None jika kosong
+    """
+    if len(rows) == 0:
+        return None
+
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now()
+    now = stamp.strftime("%Y%m%d_%H%M%S")
+    timestamps = rows['timestamps']
+    time_sec = timestamps - timestamps[0]
+    duration = time_sec[-1]
+
+    fig = Figure(figsize=(15, 10))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(2, 2)
+    fig.suptitle(f'{duration:.0f}-Second Signal Analysis - {stamp.strftime("%Y-%m-%d %H:%M:%S")}',
+                 fontsize=16, fontweight='bold')
+
+    _plot_signal_subplot(axes[0, 0], time_sec, rows['raw_rgb'],
+                         'g-', "Raw RGB Green Channel Signal", "RGB Green Value (0-255)")
+    _plot_signal_subplot(axes[0, 1], time_sec, rows['rppg_filtered'],
+                         'r-', "Filtered rPPG Signal (Heart Rate)", "Normalized Amplitude")
+    respirasi_desc, respirasi_unit = respirasi_signal_label(motion_compensation)
+    _plot_signal_subplot(axes[1, 0], time_sec, rows['respirasi_raw'],
+                         'b-', f"Raw Respiration Signal ({respirasi_desc})", respirasi_unit)
+    _plot_signal_subplot(axes[1, 1], time_sec, rows['respirasi_filtered'],
+                         'c-', "Filtered Respiration Signal", "Filtered Amplitude")
+    if trigger is not None:
+        for ax in axes.flat:
+            ax.axvline(trigger - timestamps[0], color='k', linestyle='--', linewidth=1)
+
+    fig.tight_layout()
+    plot_filename = os.path.join(output_dir, f"signal_analysis_{now}.png")
+    fig.savefig(plot_filename, dpi=300, bbox_inches='tight')
+
+    # Semua kolom sejajar per frame; nilai yang hilang ditulis sebagai "nan"
+    data_filename = os.path.join(output_dir, f"signal_data_{now}.txt")
+    columns = np.column_stack([time_sec] + [rows[key] for key in RECORDING_COLUMNS[1:]])
+    with open(data_filename, 'w') as f:
+        f.write(f"# {duration:.0f}-Second Signal Data Export - {stamp.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"# Sampling Rate: {fs} Hz\n")
+        f.write(f"# Duration: {duration:.1f} seconds\n")
+        if trigger is not None:
+            f.write(f"# Trigger: {trigger - timestamps[0]:.1f} seconds\n")
+        f.write(f"# Respi_Raw: {respirasi_desc}, {respirasi_unit}\n")
+        f.write("\n")
+        np.savetxt(f, columns, fmt='%.6f', delimiter='\t', comments='',
+                   header="Time(s)\tRaw_RGB\trPPG_Filtered\tRespi_Raw\tRespi_Filtered")
+
+    paths = {'plot': plot_filename, 'data': data_filename}
+    # Frame diperkecil dalam format rekaman biner, dapat diputar ulang sebagai sumber frame
+    if frames is not None and len(frames):
+        paths['frames'] = os.path.join(output_dir, f"signal_frames_{now}.npz")
+        save_recording(paths['frames'], frames, frame_timestamps, fps=frame_fps or fs)
+    return paths
+
+
+def open_session_capture(app):
+    """
+    Membuka session capture untuk sesi yang baru dimulai jika `recording.session_capture` aktif.
+
+    Setiap frame sesi (landmark, statistik ROI, bahu) disimpan ringkas ke file `.rpcap`
+    sehingga sesi dapat dianalisis ulang tanpa menyimpan video.
+
+    Args:
+        app: Objek utama aplikasi (setelah `session_id` dibuat).
+    """
+    r = app.config.recording
+    if not r.session_capture:
+        return
+    now = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join("saved_signals", f"session_{app.session_id}_{now}{CAPTURE_EXTENSION}")
+    try:
+        app.session_capture = SessionCaptureWriter(
+            path, app.fps, chunk_frames=r.capture_chunk,
+            metadata={'subject': app.subject, 'session_id': app.session_id, 'source': app.source_spec,
+                      'settings': app.config.extraction_settings()})
+    except OSError as e:
+        print(f"⚠️ Failed to open session capture: {e}")
+
+
+def close_session_capture(app):
+    """Menutup session capture aktif dan mendaftarkannya sebagai segmen sesi."""
+    writer = app.session_capture
+    if writer is None:
+        return
+    app.session_capture = None
+    writer.close()
+    if app.session_id:
+        app.session_store.add_segment(app.session_id, 'session_capture', app.session_start, time.time(),
+                                      recording_path=writer.path)
+    print(f"Session capture saved: {writer.path} ({writer.frames} frames, "
+          f"{writer.bytes_written / 1024 / 1024:.1f} MB)")
 
 
 def save_data(app):
@@ -159,16 +404,18 @@ def save_data(app):
 
         with open(filename, 'w') as f:
             f.write(f"# Signal Data Export - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Sampling Rate: {app.fps} Hz\n")
+            f.write(f"# Sampling Rate: rPPG={app.rppg_fs:g} Hz, Respirasi={app.respirasi_fs:g} Hz "
+                    f"(decimated from {app.fps} Hz)\n")
             f.write(f"# Buffer Size: rPPG={len(app.rppg_buffer)}, Respirasi={len(app.respirasi_buffer)}\n\n")
 
             f.write("# rPPG Signal (Normalized Green Channel)\n")
             for i, val in enumerate(app.rppg_buffer):
-                f.write(f"{i/app.fps:.3f}\t{val:.6f}\n")
+                f.write(f"{i/app.rppg_fs:.3f}\t{val:.6f}\n")
 
-            f.write(f"\n# Respirasi Signal (Shoulder Y-coordinate)\n")
+            respirasi_desc, respirasi_unit = respirasi_signal_label(app.config.processing.motion_compensation)
+            f.write(f"\n# Respirasi Signal ({respirasi_desc}, {respirasi_unit})\n")
             for i, val in enumerate(app.respirasi_buffer):
-                f.write(f"{i/app.fps:.3f}\t{val:.6f}\n")
+                f.write(f"{i/app.respirasi_fs:.3f}\t{val:.6f}\n")
 
         app.video_label.configure(text=f"Data berhasil disimpan ke:\n{filename}", fg="lime")
         messagebox.showinfo("Save Successful", f"Data berhasil disimpan ke:\n{filename}")
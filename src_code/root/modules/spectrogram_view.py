@@ -0,0 +1,156 @@
+# modules/spectrogram_view.py
+
+"""
+Panel spektrogram bergulir (rPPG dan respirasi) pada GUI.
+
+Kolom STFT dihitung di thread latar belakang (`SpectrogramWorker`): loop video hanya
+memasukkan sampel decimasi ke antrean. Gambar ditampilkan dengan blitting: latar sumbu
+(label, tick) disimpan sekali setiap kali canvas digambar penuh, lalu setiap pembaruan
+hanya memulihkan latar tersebut dan menggambar ulang artist gambar.
+"""
+
+import queue
+import threading
+import tkinter as tk
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from spectrogram import FLOOR_DB
+
+
+_STOP = object()
+_RESET = object()
+
+
+class SpectrogramWorker:
+    """
+    Thread penghitung spektrogram untuk beberapa sinyal.
+
+    Args:
+        stfts (dict): {key: IncrementalSTFT}
+    """
+    def __init__(self, stfts):
+        self.stfts = stfts
+        self.lock = threading.Lock()
+        self._dirty = set()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def push(self, key, value):
+        """Mengantrekan satu sampel baru untuk sinyal `key` (dipanggil dari loop video)."""
+        self._queue.put((key, value))
+
+    def reset(self):
+        """Mengosongkan semua spektrogram (diproses berurutan dengan sampel di antrean)."""
+        self._queue.put(_RESET)
+
+    def take_dirty(self, key):
+        """True jika `key` mendapat kolom baru sejak pemanggilan terakhir."""
+        with self.lock:
+            if key in self._dirty:
+                self._dirty.discard(key)
+                return True
+        return False
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join(timeout=2)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # Ambil semua sampel yang sudah menunggu agar FFT kolom dihitung per blok
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending = {}
+            for item in items:
+                if item is _STOP:
+                    return
+                if item is _RESET:
+                    pending.clear()
+                    with self.lock:
+                        for stft in self.stfts.values():
+                            stft.reset()
+                        self._dirty.update(self.stfts)
+                    continue
+                key, value = item
+                pending.setdefault(key, []).append(value)
+
+            for key, values in pending.items():
+                with self.lock:
+                    if self.stfts[key].push(values):
+                        self._dirty.add(key)
+
+
+def build_spectrogram(app, parent, row, key, title, color):
+    """
+    Membangun panel spektrogram untuk satu sinyal dan menyimpannya di `app.spectrogram_panels`.
+
+    Parameters:
+        app : objek utama aplikasi (memiliki `spectrogram_worker`)
+        parent : frame parent untuk meletakkan panel
+        row : posisi baris di grid layout
+        key : 'rppg' atau 'respirasi' (kunci IncrementalSTFT di worker)
+        title : judul panel
+        color : warna teks judul
+    """
+    stft = app.spectrogram_worker.stfts[key]
+    frame = tk.Frame(parent, bg="#1e1e1e")
+    frame.grid(row=row, column=0, sticky="nsew", padx=10, pady=2)
+
+    fig, ax = plt.subplots(figsize=(4, 1.3))
+    fig.patch.set_facecolor('#1e1e1e')
+    ax.set_facecolor('#1e1e1e')
+    ax.tick_params(colors='white', labelsize=8)
+    for spine in ax.spines.values():
+        spine.set_color('white')
+
+    # Sumbu tetap (detik yang lalu × per menit), sehingga latar dapat di-cache untuk blitting
+    history = stft.image.shape[1] * stft.hop / stft.fs
+    extent = (-history, 0, stft.freqs[0] * 60, stft.freqs[-1] * 60)
+    image = ax.imshow(stft.image, aspect='auto', origin='lower', extent=extent, cmap='magma',
+                      vmin=FLOOR_DB, vmax=0, interpolation='nearest', animated=True)
+    ax.set_title(title, color=color, fontsize=10, fontweight='bold')
+    ax.set_ylabel("per min", color='white', fontsize=8)
+    fig.tight_layout()
+
+    canvas = FigureCanvasTkAgg(fig, master=frame)
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    panel = {'image': image, 'ax': ax, 'canvas': canvas, 'background': None}
+    canvas.mpl_connect('draw_event', lambda event: _on_draw(app, key, panel))
+    app.spectrogram_panels[key] = panel
+
+
+def _on_draw(app, key, panel):
+    """Menyimpan latar sumbu setelah gambar penuh (awal atau resize), lalu blit gambar terkini."""
+    canvas = panel['canvas']
+    panel['background'] = canvas.copy_from_bbox(panel['ax'].bbox)
+    _blit(app, key, panel)
+
+
+def _blit(app, key, panel):
+    with app.spectrogram_worker.lock:
+        panel['image'].set_data(app.spectrogram_worker.stfts[key].image)
+    canvas, ax = panel['canvas'], panel['ax']
+    canvas.restore_region(panel['background'])
+    ax.draw_artist(panel['image'])
+    canvas.blit(ax.bbox)
+
+
+def update_spectrograms(app):
+    """Menggambar ulang panel yang mendapat kolom baru (dipanggil dari loop video)."""
+    if app.spectrogram_worker is None:
+        return
+    for key, panel in app.spectrogram_panels.items():
+        if panel['background'] is None or not app.spectrogram_worker.take_dirty(key):
+            continue
+        try:
+            _blit(app, key, panel)
+        except Exception as e:
+            print(f"Spectrogram update error ({key}): {e}")
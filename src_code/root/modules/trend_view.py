@@ -0,0 +1,108 @@
+# modules/trend_view.py
+
+"""
+Jendela tren HR/RR sepanjang sesi.
+
+Estimasi per detik disimpan di piramida min/max (trend.py); setiap pembaruan hanya
+menggambar titik dari level yang sesuai dengan rentang yang terlihat (anggaran
+`processing.trend_points`), sehingga zoom/pan pada sesi berjam-jam tetap ringan.
+Selama tampilan mencakup ujung terbaru, sumbu waktu mengikuti data baru; setelah
+pengguna zoom/pan ke bagian lama, rentang tampilan dipertahankan.
+"""
+
+import tkinter as tk
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+
+_SERIES = (('hr', "Heart Rate (BPM)", 'deeppink'), ('rr', "Respiration (Breaths/min)", 'cyan'))
+
+
+def open_trend_window(app):
+    """Membuka jendela tren (atau memunculkannya kembali jika sudah terbuka)."""
+    if app.trend_window is not None:
+        app.trend_window['top'].lift()
+        return
+
+    top = tk.Toplevel(app.window)
+    top.title("Session Trends")
+    top.configure(bg="#1e1e1e")
+    fig, axes = plt.subplots(2, 1, sharex=True, figsize=(8, 4))
+    fig.patch.set_facecolor('#1e1e1e')
+    lines = {}
+    for ax, (key, label, color) in zip(axes, _SERIES):
+        ax.set_facecolor('#1e1e1e')
+        ax.tick_params(colors='white')
+        for spine in ax.spines.values():
+            spine.set_color('white')
+        ax.set_ylabel(label, color=color, fontsize=9)
+        lines[key], = ax.plot([], [], color=color, linewidth=1)
+    axes[-1].set_xlabel("Session time (min)", color='white')
+    # Rentang x dikelola sendiri (autoscale lazy akan memicu xlim_changed tanpa aksi pengguna)
+    axes[0].set_autoscalex_on(False)
+    axes[0].set_xlim(0, 1)
+    fig.tight_layout()
+
+    canvas = FigureCanvasTkAgg(fig, master=top)
+    toolbar = NavigationToolbar2Tk(canvas, top)
+    toolbar.update()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    view = {'top': top, 'fig': fig, 'axes': axes, 'lines': lines, 'canvas': canvas,
+            'follow': True, 'updating': False}
+    # Zoom/pan pengguna: query ulang rentang baru; ikuti data baru hanya jika ujung terbaru terlihat
+    axes[0].callbacks.connect('xlim_changed', lambda ax: _on_xlim_changed(app, view))
+    top.protocol("WM_DELETE_WINDOW", lambda: close_trend_window(app))
+    app.trend_window = view
+    update_trends(app)
+
+
+def close_trend_window(app):
+    if app.trend_window is not None:
+        plt.close(app.trend_window['fig'])
+        app.trend_window['top'].destroy()
+        app.trend_window = None
+
+
+def _latest_minutes(app):
+    spans = [pyramid.span for pyramid in app.trends.values() if pyramid.span is not None]
+    return max(span[1] for span in spans) / 60 if spans else 0.0
+
+
+def _on_xlim_changed(app, view):
+    if view['updating']:
+        return
+    view['follow'] = view['axes'][0].get_xlim()[1] >= _latest_minutes(app)
+    _redraw(app, view, *view['axes'][0].get_xlim())
+
+
+def _redraw(app, view, x0, x1):
+    budget = app.config.processing.trend_points
+    for ax, (key, _, _) in zip(view['axes'], _SERIES):
+        t, values = app.trends[key].query(x0 * 60, x1 * 60, budget)
+        view['lines'][key].set_data(t / 60, values)
+        if len(values):
+            pad = max(1.0, 0.1 * (values.max() - values.min()))
+            ax.set_ylim(values.min() - pad, values.max() + pad)
+    view['canvas'].draw_idle()
+
+
+def update_trends(app):
+    """Memperbarui jendela tren dengan data terbaru (dipanggil setiap ringkasan per detik)."""
+    view = app.trend_window
+    if view is None:
+        return
+    try:
+        latest = _latest_minutes(app)
+        x0, x1 = view['axes'][0].get_xlim()
+        if view['follow']:
+            x0, x1 = (0.0 if x0 <= 0 or not latest else x0), max(latest, 1 / 60)
+            view['updating'] = True
+            try:
+                view['axes'][0].set_xlim(x0, x1)
+            finally:
+                view['updating'] = False
+        _redraw(app, view, x0, x1)
+    except Exception as e:
+        print(f"Trend update error: {e}")
@@ -10,39 +10,65 @@ serta pembaruan visualisasi dan penyimpanan data.
 import cv2
 import time
 import numpy as np
-from PIL import Image, ImageTk
 from tkinter import messagebox
 
-from signal_filter import apply_bandpass_filter
+from artifact import detect_artifacts, landmark_speed
+from frame_source import open_source
 from modules.plotting import update_hr_plot, update_rr_plot
+from modules.recording import open_session_capture, close_session_capture
+from modules.spectrogram_view import update_spectrograms
+from modules.trend_view import update_trends
 
 def start_video(app):
     """
-    Menginisialisasi dan memulai pengambilan video dari webcam.
+    Menginisialisasi dan memulai pengambilan video dari sumber frame `app.source_spec`
+    (default webcam 0; bisa juga file video, folder gambar atau rekaman `.npz`).
     Mengatur resolusi, fps, serta mengatur ulang buffer dan status aplikasi.
     """
     if not app.running:
         try:
-            app.cap = cv2.VideoCapture(0)
-            if not app.cap.isOpened():
-                raise Exception("Cannot access camera. Please check if camera is connected and not used by other applications.")
-
-            app.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            app.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            app.cap.set(cv2.CAP_PROP_FPS, 30)
+            capture = app.config.capture
+            app.cap = open_source(app.source_spec, width=capture.width, height=capture.height, fps=app.fps)
 
             app.running = True
             app.video_label.configure(text="")
 
             app.respirasi_buffer.clear()
             app.rppg_buffer.clear()
+            app.rppg_smoothed_buffer.clear()
             app.raw_rgb_buffer.clear()
             app.respirasi_raw_buffer.clear()
+            app.rppg_motion_buffer.clear()
+            app.brightness_buffer.clear()
+            app.rppg_block_speed = 0.0
+            app.prev_face_points = None
+            app.artifact_active.clear()
+            for samples in app.recent_samples.values():
+                samples.clear()
+            for stage in (app.rppg_stream_filter, app.respirasi_stream_filter, app.hr_peaks, app.rr_peaks,
+                          app.rppg_decimator, app.respirasi_decimator, app.brightness_decimator,
+                          app.rppg_preprocessor,
+                          app.hr_tracker, app.rr_tracker):
+                stage.reset()
+            # Sinyal respirasi motion compensation adalah perpindahan terakumulasi: mulai dari nol
+            app.respirasi_extractor.reset_signal()
+            app.latest_rates.clear()
+            if app.spectrogram_worker is not None:
+                app.spectrogram_worker.reset()
+            if app.alert_engine is not None:
+                app.alert_engine.reset()
+                app.alert_text.set("")
+            for pyramid in app.trends.values():
+                pyramid.clear()
+            app.signal_history.clear()
+            app.session_start = time.time()
+            app.session_id = app.session_store.start_session(app.subject, source=app.source_spec, fs=app.fps)
+            open_session_capture(app)
 
             update_video(app)
 
         except Exception as e:
-            error_msg = f"Failed to start camera: {str(e)}"
+            error_msg = f"Failed to start video source: {str(e)}"
             app.video_label.configure(text=error_msg, fg="red", wraplength=400)
             messagebox.showerror("Camera Error", error_msg)
             app.running = False
@@ -60,6 +86,10 @@ def stop_video(app):
     if app.cap:
         app.cap.release()
         app.cap = None
+    close_session_capture(app)
+    if app.session_id:
+        app.session_store.end_session(app.session_id)
+        app.session_id = None
     app.video_label.configure(
         image='',
         text="Feed dihentikan. Tekan START untuk mulai lagi.",
@@ -67,6 +97,33 @@ def stop_video(app):
     )
     app.recording_status_text.set("Ready")
 
+def _append_bounded(buffer, value, max_len):
+    buffer.append(value)
+    if len(buffer) > max_len:
+        buffer.pop(0)
+
+
+def _check_stream_artifact(app, key, samples, stream_filter, peaks, speed=None, brightness=None):
+    """
+    Mengecek artefak pada sampel terbaru (riwayat 2 detik laju penuh, tervektorisasi).
+    Saat artefak mulai, state bandpass kausal di-reset dan analyzer puncak diberi celah,
+    sehingga lompatan tidak berdering di filter maupun menghasilkan interval palsu.
+    """
+    flt = app.config.filter
+    if not flt.artifact_rejection or len(samples) < 3:
+        return False
+    mask = detect_artifacts(np.asarray(samples), app.fps,
+                            np.asarray(speed) if speed is not None else None,
+                            np.asarray(brightness) if brightness is not None else None,
+                            threshold=flt.artifact_threshold, motion_threshold=flt.motion_threshold, pad=0)
+    active = bool(mask[-1])
+    if active and not app.artifact_active.get(key):
+        stream_filter.reset()
+        peaks.mark_gap()
+    app.artifact_active[key] = active
+    return active
+
+
 def update_video(app):
     """
     Fungsi utama untuk membaca frame dari webcam,
@@ -74,104 +131,190 @@ def update_video(app):
     mengekstraksi sinyal rPPG dan respirasi,
     memperbarui grafik sinyal, dan menyimpan data jika merekam.
     """
+    frame_start = time.perf_counter()
     if app.running and app.cap:
         try:
+            # Governor menentukan apakah inferensi landmark dan plot dijalankan pada frame ini
+            detect = app.governor.should_detect()
+
             ret, frame = app.cap.read()
             if not ret:
-                raise Exception("Failed to read frame from camera")
+                raise Exception("Failed to read frame from video source")
 
-            frame = cv2.resize(frame, (640, 480))
-            display_frame = frame.copy()
+            # Buffer frame, RGB dan overlay dipakai ulang dari pool (tanpa alokasi per frame)
+            frame = app.frame_pool.load(frame)
+            frame_rgb = app.frame_pool.rgb
+            display_frame = app.frame_pool.begin_overlay()
+
+            # === Inferensi ===
+            # Dengan worker ekstraksi, frame diserahkan lewat shared memory dan FaceMesh/Pose
+            # berjalan paralel di proses terpisah; tanpa worker keduanya dijalankan di sini
+            face = pose = None
+            face_error = pose_error = None
+            if app.extraction_workers is not None:
+                face, pose, errors = app.extraction_workers.analyze(frame, detect=detect)
+                face_error, pose_error = errors.get('face'), errors.get('pose')
+            else:
+                try:
+                    face = app.rppg_extractor.analyze(frame, detect=detect, frame_rgb=frame_rgb)
+                except Exception as e:
+                    face_error = e
+                try:
+                    pose = app.respirasi_extractor.analyze(frame, detect=detect, frame_rgb=frame_rgb)
+                except Exception as e:
+                    pose_error = e
+            if face_error:
+                print(f"rPPG processing error: {face_error}")
+            if pose_error:
+                print(f"Respiration processing error: {pose_error}")
 
             # === rPPG Processing ===
+            # FaceMesh dijalankan sekali; ROI yang sama dipakai untuk raw RGB dan sinyal rPPG
             raw_rgb_value = None
+            green = None
+            face_speed = 0.0
             try:
-                points = app.rppg_extractor.get_landmarks(frame)
-                for x, y in points:
-                    cv2.circle(display_frame, (x, y), 2, (0, 255, 0), -1)
-
-                bbox = app.rppg_extractor.get_forehead_bbox(frame)
-                if bbox:
-                    x1, y1, x2, y2 = bbox
-                    cv2.rectangle(display_frame, (x1, y1), (x2, y2), (0, 255, 255), 2)
-                    cv2.putText(display_frame, "ROI Forehead", (x1, y1 - 5),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
-
-                    roi = frame[y1:y2, x1:x2]
-                    if roi.size > 0:
-                        avg_color = np.mean(roi, axis=(0, 1))
-                        raw_rgb_value = avg_color[1]
+                if face is not None:
+                    for x, y in face['points']:
+                        cv2.circle(display_frame, (x, y), 2, (0, 255, 0), -1)
+
+                    for name, pts in face['polygons'].items():
+                        if name in face['rois']:
+                            cv2.polylines(display_frame, [pts], True, (0, 255, 255), 1)
+
+                    forehead = face['rois'].get('forehead')
+                    if forehead is not None:
+                        x1, y1, _, _ = forehead.bbox
+                        cv2.putText(display_frame, "ROI Forehead", (x1, y1 - 5),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
+                        raw_rgb_value = forehead.mean[1]
+                        green = raw_rgb_value / 255.0
+
+                    face_speed = landmark_speed(face['points'], app.prev_face_points)
+                    app.prev_face_points = face['points']
+                else:
+                    app.prev_face_points = None
 
             except Exception as e:
                 print(f"rPPG processing error: {e}")
 
             # === Respirasi Processing ===
+            # Pose dijalankan sekali; posisi bahu dan nilai respirasi dari hasil yang sama
             raw_respirasi_value = None
             try:
-                shoulders = app.respirasi_extractor.get_shoulders(frame)
-                for x, y in shoulders:
-                    cv2.circle(display_frame, (x, y), 5, (255, 0, 0), -1)
-                    cv2.putText(display_frame, "Shoulder", (x - 30, y + 15),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 0, 0), 1)
+                if pose is not None:
+                    for x, y in pose['shoulders']:
+                        cv2.circle(display_frame, (x, y), 5, (255, 0, 0), -1)
+                        cv2.putText(display_frame, "Shoulder", (x - 30, y + 15),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 0, 0), 1)
+
+                    if pose.get('chest_roi'):
+                        x1, y1, x2, y2 = pose['chest_roi']
+                        cv2.rectangle(display_frame, (x1, y1), (x2, y2), (255, 128, 0), 1)
 
-                raw_respirasi_value = app.respirasi_extractor.extract(frame)
+                    raw_respirasi_value = pose['value']
 
             except Exception as e:
                 print(f"Respiration processing error: {e}")
 
             # === Buffer Update ===
-            try:
-                y_res = app.respirasi_extractor.extract(frame)
-                if y_res is not None:
-                    app.respirasi_buffer.append(y_res)
-                    if len(app.respirasi_buffer) > app.buffer_max:
-                        app.respirasi_buffer.pop(0)
-            except Exception as e:
-                print(f"Respiration extraction error: {e}")
+            # Artefak dicek sebelum sampel masuk filter kausal, agar state filter di-reset
+            # tepat pada lompatan (bukan berdering selama beberapa detik setelahnya)
+            # Buffer analisis diisi dari decimator (laju per sinyal), analisis puncak tetap laju penuh
+            recent = app.recent_samples
+            filtered_resp_value = None
+            brightness = None
+            if raw_respirasi_value is not None:
+                recent['respirasi'].append(raw_respirasi_value)
+                _check_stream_artifact(app, 'respirasi', recent['respirasi'],
+                                       app.respirasi_stream_filter, app.rr_peaks)
+                # Keluaran bandpass kausal juga menjadi kanal respirasi terfilter di ring riwayat
+                filtered_resp_value = app.respirasi_stream_filter.push(raw_respirasi_value)
+                app.rr_peaks.push(filtered_resp_value)
 
-            try:
-                green = app.rppg_extractor.extract(frame)
-                if green is not None:
-                    app.rppg_buffer.append(green)
-                    if len(app.rppg_buffer) > app.buffer_max:
-                        app.rppg_buffer.pop(0)
-            except Exception as e:
-                print(f"rPPG extraction error: {e}")
+                decimated = app.respirasi_decimator.push(raw_respirasi_value)
+                if decimated is not None:
+                    _append_bounded(app.respirasi_buffer, decimated, app.respirasi_buffer_max)
+                    if app.spectrogram_worker is not None:
+                        app.spectrogram_worker.push('respirasi', decimated)
 
-            # === Perekaman Data (30s) ===
-            if app.recording_30s:
-                current_time = time.time()
-                app.recording_data['timestamps'].append(current_time)
+            if green is not None:
+                brightness = cv2.mean(frame)[1]
+                recent['rppg'].append(green)
+                recent['speed'].append(face_speed)
+                recent['brightness'].append(brightness)
+                _check_stream_artifact(app, 'rppg', recent['rppg'], app.rppg_stream_filter, app.hr_peaks,
+                                       recent['speed'], recent['brightness'])
+                app.hr_peaks.push(app.rppg_stream_filter.push(green))
 
-                if raw_rgb_value is not None:
-                    app.recording_data['raw_rgb'].append(raw_rgb_value)
+                # Decimator kecerahan dan rPPG memiliki faktor dan fase yang sama (sampel sejajar)
+                app.rppg_block_speed = max(app.rppg_block_speed, face_speed)
+                decimated_brightness = app.brightness_decimator.push(brightness)
+                decimated = app.rppg_decimator.push(green)
+                if decimated is not None:
+                    _append_bounded(app.rppg_buffer, decimated, app.rppg_buffer_max)
+                    _append_bounded(app.rppg_motion_buffer, app.rppg_block_speed, app.rppg_companion_max)
+                    _append_bounded(app.brightness_buffer, decimated_brightness, app.rppg_companion_max)
+                    smoothed = app.rppg_preprocessor.push(decimated)
+                    if smoothed is not None:
+                        _append_bounded(app.rppg_smoothed_buffer, smoothed, app.rppg_buffer_max)
+                    if app.spectrogram_worker is not None:
+                        app.spectrogram_worker.push('rppg', decimated)
+                    app.rppg_block_speed = 0.0
 
-                if green is not None:
-                    app.recording_data['rppg_filtered'].append(green)
+            # === Alert (status deteksi per frame, waktu event = awal frame) ===
+            if app.alert_engine is not None:
+                app.alert_engine.update('face', green is not None, t=frame_start)
+                app.alert_engine.update('pose', raw_respirasi_value is not None, t=frame_start)
+                alert_text = "  ".join(f"⚠️ {name}" for name in app.alert_engine.active())
+                if alert_text != app.alert_text.get():
+                    app.alert_text.set(alert_text)
 
-                if raw_respirasi_value is not None:
-                    app.recording_data['respirasi_raw'].append(raw_respirasi_value)
+            # === Ring Riwayat ===
+            # Satu baris per frame, diisi terus-menerus (rekaman dapat mencakup detik sebelum
+            # tombol ditekan); kanal yang tidak tersedia disimpan sebagai NaN.
+            # Timestamp dari sumber frame (akurat juga untuk file/rekaman)
+            app.signal_history.append(
+                app.cap.timestamp,
+                raw_rgb=raw_rgb_value,
+                rppg_filtered=green,
+                respirasi_raw=raw_respirasi_value,
+                respirasi_filtered=filtered_resp_value,
+                frame=frame,
+            )
 
-                if len(app.respirasi_buffer) >= 60:
-                    try:
-                        filtered_resp = apply_bandpass_filter(app.respirasi_buffer, 0.1, 0.5, app.fps)
-                        if filtered_resp is not None and len(filtered_resp) > 0:
-                            app.recording_data['respirasi_filtered'].append(filtered_resp[-1])
-                        else:
-                            print("⚠️ Filtered respiration data is empty or None.")
-                    except Exception as e:
-                        print(f"❌ Error in apply_bandpass_filter: {e}")
+            # === Session Capture (hasil ekstraksi per frame, ditulis thread latar belakang) ===
+            if app.session_capture is not None:
+                app.session_capture.append(app.cap.timestamp, face, pose,
+                                           cv2.mean(frame)[1] if brightness is None else brightness)
 
             # === Tampilan Frame ke GUI ===
-            frame_rgb = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
-            imgtk = ImageTk.PhotoImage(image=img)
-            app.video_label.imgtk = imgtk
-            app.video_label.configure(image=imgtk)
+            app.frame_pool.render(app.video_label)
 
             # === Update Plot ===
-            update_hr_plot(app)
-            update_rr_plot(app)
+            if app.governor.should_plot():
+                update_hr_plot(app)
+                update_rr_plot(app)
+                update_spectrograms(app)
+
+            # === Ringkasan Sesi (per detik, ditulis oleh thread basis data) ===
+            now = time.time()
+            if app.session_id and now - app.last_summary_time >= 1.0:
+                app.last_summary_time = now
+                hr, hr_quality = app.latest_rates.get('BPM', (None, None))
+                rr, rr_quality = app.latest_rates.get('Breaths/min', (None, None))
+                if hr is not None or rr is not None:
+                    app.session_store.add_summary(app.session_id, now, hr, rr, hr_quality, rr_quality)
+                if hr is not None:
+                    app.trends['hr'].append(now - app.session_start, hr)
+                if rr is not None:
+                    app.trends['rr'].append(now - app.session_start, rr)
+                update_trends(app)
+
+            # === Governor Performa ===
+            latency_ms = (time.perf_counter() - frame_start) * 1000
+            if app.governor.update(latency_ms):
+                app.governor.apply(app)
 
         except Exception as e:
             error_msg = f"Video processing error: {str(e)}"
@@ -180,4 +323,7 @@ def update_video(app):
             app.running = False
 
     if app.running:
-        app.window.after(33, lambda: update_video(app))  # ~30 FPS
+        # Jadwalkan frame berikutnya dengan mengurangi waktu pemrosesan dari budget frame (~30 FPS)
+        elapsed_ms = (time.perf_counter() - frame_start) * 1000
+        delay_ms = max(1, int(1000 / app.fps - elapsed_ms))
+        app.window.after(delay_ms, lambda: update_video(app))
@@ -1,26 +1,296 @@
 # respirasi_signal.py
 
 import cv2
+import numpy as np
 from mediapipe import solutions as mp_solutions
 
 
+# Indeks landmark MediaPipe Pose
+NOSE, LEFT_EAR, RIGHT_EAR = 0, 7, 8
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+
+
+class ChestMotionTracker:
+    """
+    Pelacak gerakan dada berbasis optical flow (Lucas-Kanade) di antara deteksi Pose.
+
+    Titik torso (bahu + fitur sudut di ROI dada) dan titik kepala (hidung, telinga)
+    dilacak dari frame ke frame pada citra grayscale beresolusi rendah. Sinyal respirasi
+    adalah akumulasi median perpindahan vertikal torso dikurangi perpindahan kepala
+    (kompensasi goyangan tubuh), dinormalisasi dengan lebar bahu agar tidak bergantung
+    pada jarak subjek ke kamera.
+
+    Args:
+        track_scale (float): Skala citra untuk optical flow (lebih kecil = lebih ringan)
+        sway_weight (float): Bobot pengurangan gerakan kepala (0 = tanpa kompensasi)
+        max_features (int): Jumlah maksimum fitur sudut di ROI dada
+        min_points (int): Jumlah minimum titik torso yang masih terlacak
+    """
+    def __init__(self, track_scale=0.5, sway_weight=1.0, max_features=30, min_points=4):
+        self.track_scale = track_scale
+        self.sway_weight = sway_weight
+        self.max_features = max_features
+        self.min_points = min_points
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        self.value = 0.0
+        self.reset()
+
+    def reset(self):
+        """
+        Menghapus state pelacakan (misalnya saat subjek hilang). Nilai sinyal yang sudah
+        terakumulasi dipertahankan agar sinyal tetap kontinu setelah `reseed` berikutnya.
+        """
+        self.shoulder_width = None
+        self.chest_roi = None
+        self._prev_gray = None
+        self._torso_pts = None
+        self._head_pts = None
+        self._n_shoulders = 0
+
+    def reset_signal(self):
+        """Menghapus state pelacakan sekaligus nilai terakumulasi (awal sesi baru)."""
+        self.value = 0.0
+        self.reset()
+
+    @property
+    def tracking(self):
+        return self._torso_pts is not None and len(self._torso_pts) >= self.min_points
+
+    def _gray(self, frame):
+        small = cv2.resize(frame, None, fx=self.track_scale, fy=self.track_scale,
+                           interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def _track(self, gray, pts):
+        new_pts, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, pts, None, **self.lk_params)
+        good = status.ravel() == 1
+        return new_pts, good
+
+    def update(self, frame):
+        """
+        Melacak titik dari frame sebelumnya dan mengakumulasi perpindahan vertikal.
+
+        Args:
+            frame (np.ndarray): Frame video BGR
+
+        Returns:
+            bool: True jika pelacakan masih valid
+        """
+        gray = self._gray(frame)
+        if self._prev_gray is None or self._torso_pts is None:
+            self._prev_gray = gray
+            return False
+
+        new_torso, good_torso = self._track(gray, self._torso_pts)
+        if good_torso.sum() < self.min_points:
+            self._torso_pts = None
+            self._prev_gray = gray
+            return False
+
+        dy = np.median(new_torso[good_torso, 0, 1] - self._torso_pts[good_torso, 0, 1])
+
+        dy_head = 0.0
+        if self._head_pts is not None and len(self._head_pts):
+            new_head, good_head = self._track(gray, self._head_pts)
+            if good_head.any():
+                dy_head = np.median(new_head[good_head, 0, 1] - self._head_pts[good_head, 0, 1])
+                self._head_pts = new_head[good_head]
+            else:
+                self._head_pts = None
+
+        # Perpindahan dalam piksel citra kecil, dinormalisasi dengan lebar bahu (citra kecil)
+        self.value += (dy - self.sway_weight * dy_head) / self.shoulder_width
+
+        # Titik bahu selalu berada di awal array; hitung ulang berapa yang tersisa
+        self._n_shoulders = int(good_torso[:self._n_shoulders].sum())
+        self._torso_pts = new_torso[good_torso]
+        self._prev_gray = gray
+        return True
+
+    def reseed(self, frame, shoulders, head=()):
+        """
+        Menginisialisasi ulang titik pelacakan dari hasil deteksi Pose terbaru.
+        Nilai sinyal yang sudah terakumulasi tidak direset, sehingga sinyal tetap kontinu.
+
+        Args:
+            frame (np.ndarray): Frame video BGR (sama dengan frame terakhir di `update`)
+            shoulders (list[tuple[float, float]]): Koordinat piksel bahu kiri & kanan
+            head (list[tuple[float, float]]): Koordinat piksel titik kepala yang terlihat
+        """
+        gray = self._gray(frame) if self._prev_gray is None else self._prev_gray
+        s = self.track_scale
+        shoulders = np.asarray(shoulders, dtype=np.float32) * s
+        width = float(np.linalg.norm(shoulders[0] - shoulders[1]))
+        if width < 2:
+            return
+
+        # ROI dada: di antara kedua bahu, memanjang ke bawah sekitar 60% lebar bahu
+        x1, x2 = sorted((shoulders[0][0], shoulders[1][0]))
+        y1 = float(min(shoulders[0][1], shoulders[1][1]))
+        y2 = y1 + 0.6 * width
+        gh, gw = gray.shape
+        x1, x2 = int(max(x1, 0)), int(min(x2, gw))
+        y1, y2 = int(max(y1, 0)), int(min(y2, gh))
+
+        features = None
+        if x2 > x1 and y2 > y1:
+            mask = np.zeros_like(gray)
+            mask[y1:y2, x1:x2] = 255
+            features = cv2.goodFeaturesToTrack(gray, self.max_features, 0.01, 5, mask=mask)
+
+        pts = [shoulders.reshape(-1, 1, 2)]
+        if features is not None:
+            pts.append(features.astype(np.float32))
+
+        self._torso_pts = np.concatenate(pts).astype(np.float32)
+        self._n_shoulders = len(shoulders)
+        self._head_pts = (np.asarray(head, dtype=np.float32).reshape(-1, 1, 2) * s) if len(head) else None
+        self.shoulder_width = width
+        self.chest_roi = tuple(int(v / s) for v in (x1, y1, x2, y2))
+        self._prev_gray = gray
+
+    def shoulder_points(self):
+        """Koordinat piksel (resolusi penuh) titik bahu yang sedang dilacak."""
+        if self._torso_pts is None:
+            return []
+        s = self.track_scale
+        return [(int(p[0][0] / s), int(p[0][1] / s)) for p in self._torso_pts[:self._n_shoulders]]
+
+
 class RespirasiExtractor:
     """
     Ekstraktor sinyal respirasi berdasarkan pergerakan vertikal bahu kiri dan kanan.
     Menggunakan MediaPipe Pose untuk mendeteksi landmark tubuh.
 
+    Dengan `motion_compensation=True`, Pose hanya dijalankan setiap `pose_interval` frame
+    dan ROI dada dilacak di antaranya dengan ChestMotionTracker (fusi bahu + fitur dada,
+    dikompensasi terhadap gerakan kepala/tubuh).
+
     Penanggung jawab dan penjelas kode: Fajrul Ramadhana Aqsa
     """
-    def __init__(self):
+    def __init__(self, model_complexity=1, inference_scale=1.0, motion_compensation=True, pose_interval=5):
         self.mp_pose = mp_solutions.pose  # type: ignore[attr-defined]
-        self.pose = self.mp_pose.Pose(
+        self.model_complexity = model_complexity
+        # Skala resolusi frame untuk inferensi Pose (landmark ternormalisasi tidak terpengaruh)
+        self.inference_scale = inference_scale
+        self.pose = self._create_pose()
+        # Hasil deteksi terakhir, dipakai ulang saat inferensi dilewati
+        self._last_result = None
+
+        self.motion_compensation = motion_compensation
+        self.pose_interval = pose_interval
+        self.tracker = ChestMotionTracker()
+        self._frames_since_pose = 0
+
+    def reset_signal(self):
+        """
+        Memulai sinyal dari awal (misalnya saat feed video dimulai ulang): perpindahan dada
+        terakumulasi, state pelacakan dan hasil deteksi terakhir dihapus.
+        """
+        self.tracker.reset_signal()
+        self._last_result = None
+        self._frames_since_pose = 0
+
+    def _create_pose(self):
+        return self.mp_pose.Pose(
             static_image_mode=False,
-            model_complexity=1,
+            model_complexity=self.model_complexity,
             enable_segmentation=False,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
 
+    def configure(self, inference_scale=None, model_complexity=None):
+        """
+        Mengubah pengaturan inferensi saat runtime (dipakai oleh governor performa).
+        Model Pose hanya dibuat ulang jika `model_complexity` berubah.
+        """
+        if inference_scale is not None:
+            self.inference_scale = inference_scale
+        if model_complexity is not None and model_complexity != self.model_complexity:
+            self.model_complexity = model_complexity
+            self.pose.close()
+            self.pose = self._create_pose()
+
+    def _detect(self, frame, frame_rgb=None):
+        """Menjalankan Pose dan mengembalikan landmark, atau None jika tidak terdeteksi."""
+        if frame_rgb is None:
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self.inference_scale != 1.0:
+            frame_rgb = cv2.resize(frame_rgb, None, fx=self.inference_scale, fy=self.inference_scale,
+                                   interpolation=cv2.INTER_AREA)
+        results = self.pose.process(frame_rgb)
+        if not results.pose_landmarks:
+            return None
+        return results.pose_landmarks.landmark
+
+    def analyze(self, frame, detect=True, frame_rgb=None):
+        """
+        Mengembalikan nilai respirasi beserta posisi bahu untuk satu frame.
+
+        Args:
+            frame (np.ndarray): Frame video dalam format BGR
+            detect (bool): Jika False, Pose tidak dijalankan pada frame ini
+                (hasil terakhir dipakai ulang, atau hanya pelacakan optical flow)
+            frame_rgb (np.ndarray | None): Versi RGB dari frame jika sudah tersedia
+
+        Returns:
+            dict | None: Berisi 'value' (sinyal respirasi), 'shoulders' (koordinat piksel
+            bahu kiri & kanan) dan 'chest_roi' (x1, y1, x2, y2 atau None),
+            atau None jika tidak terdeteksi
+        """
+        if self.motion_compensation:
+            return self._analyze_tracked(frame, detect, frame_rgb)
+
+        if not detect and self._last_result is not None:
+            return self._last_result
+
+        h, w, _ = frame.shape
+        lm = self._detect(frame, frame_rgb)
+        if lm is None:
+            self._last_result = None
+            return None
+
+        left = lm[LEFT_SHOULDER]
+        right = lm[RIGHT_SHOULDER]
+        self._last_result = {
+            'value': (left.y + right.y) / 2,
+            'shoulders': [(int(left.x * w), int(left.y * h)), (int(right.x * w), int(right.y * h))],
+            'chest_roi': None,
+        }
+        return self._last_result
+
+    def _analyze_tracked(self, frame, detect, frame_rgb=None):
+        h, w, _ = frame.shape
+        tracked = self.tracker.update(frame)
+        self._frames_since_pose += 1
+
+        run_pose = not tracked or self._frames_since_pose >= self.pose_interval
+        if run_pose and (detect or not tracked):
+            lm = self._detect(frame, frame_rgb)
+            if lm is None:
+                self.tracker.reset()
+                self._last_result = None
+                return None
+
+            shoulders = [(lm[i].x * w, lm[i].y * h) for i in (LEFT_SHOULDER, RIGHT_SHOULDER)]
+            head = [(lm[i].x * w, lm[i].y * h) for i in (NOSE, LEFT_EAR, RIGHT_EAR)
+                    if lm[i].visibility > 0.5]
+            self.tracker.reseed(frame, shoulders, head)
+            self._frames_since_pose = 0
+
+        if self.tracker.shoulder_width is None:
+            self._last_result = None
+            return None
+
+        self._last_result = {
+            'value': self.tracker.value,
+            'shoulders': self.tracker.shoulder_points(),
+            'chest_roi': self.tracker.chest_roi,
+        }
+        return self._last_result
+
     def extract(self, frame):
         """
         Mengekstraksi nilai Y (vertikal) rata-rata dari bahu kiri dan kanan.
@@ -30,16 +300,12 @@ class RespirasiExtractor:
             frame (np.ndarray): Frame video dalam format BGR
 
         Returns:
-            float | None: Nilai Y tengah antara dua bahu, atau None jika tidak terdeteksi
+            float | None: Sinyal respirasi (Y tengah bahu 0–1, atau perpindahan torso
+            ternormalisasi lebar bahu bila motion compensation aktif), atau None jika tidak terdeteksi
         """
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(frame_rgb)
-
-        if results.pose_landmarks:
-            lm = results.pose_landmarks.landmark
-            left = lm[self.mp_pose.PoseLandmark.LEFT_SHOULDER]
-            right = lm[self.mp_pose.PoseLandmark.RIGHT_SHOULDER]
-            return (left.y + right.y) / 2  # Nilai normalisasi [0–1]
+        result = self.analyze(frame)
+        if result is not None:
+            return result['value']
         return None
 
     def get_shoulders(self, frame):
@@ -53,16 +319,7 @@ class RespirasiExtractor:
         Returns:
             list[tuple[int, int]]: Daftar koordinat bahu kiri dan kanan, atau list kosong jika gagal.
         """
-        h, w, _ = frame.shape
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(frame_rgb)
-
-        if results.pose_landmarks:
-            lm = results.pose_landmarks.landmark
-            return [
-                (int(lm[self.mp_pose.PoseLandmark.LEFT_SHOULDER].x * w),
-                 int(lm[self.mp_pose.PoseLandmark.LEFT_SHOULDER].y * h)),
-                (int(lm[self.mp_pose.PoseLandmark.RIGHT_SHOULDER].x * w),
-                 int(lm[self.mp_pose.PoseLandmark.RIGHT_SHOULDER].y * h))
-            ]
+        result = self.analyze(frame)
+        if result is not None:
+            return result['shoulders']
         return []
@@ -0,0 +1,149 @@
+"""
+Modul ROI engine untuk ekstraksi statistik warna kulit dari beberapa region wajah.
+
+Satu engine dipakai bersama oleh GUI dan RPPGExtractor:
+- Mask poligon dari landmark FaceMesh (dahi, pipi kiri, pipi kanan)
+- Skin-color masking di ruang warna YCrCb untuk membuang rambut, alis dan background
+- Statistik per kanal (mean, variance, jumlah piksel) untuk semua region dari
+  `kernels.region_sums` pada citra label region (satu pass JIT dengan Numba, bincount tanpa Numba)
+"""
+
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from kernels import region_sums
+
+
+# Indeks landmark FaceMesh untuk poligon tiap region
+FOREHEAD_INDICES = [10, 338, 297, 332, 333, 334, 296, 336, 9, 107, 66, 105, 104, 103, 67, 109]
+LEFT_CHEEK_INDICES = [50, 101, 118, 117, 123, 147, 187, 205]
+RIGHT_CHEEK_INDICES = [280, 330, 347, 346, 352, 376, 411, 425]
+
+DEFAULT_REGIONS = {
+    "forehead": FOREHEAD_INDICES,
+    "left_cheek": LEFT_CHEEK_INDICES,
+    "right_cheek": RIGHT_CHEEK_INDICES,
+}
+
+# Batas warna kulit pada ruang YCrCb (Y, Cr, Cb)
+SKIN_LOWER = np.array([0, 133, 77], dtype=np.uint8)
+SKIN_UPPER = np.array([255, 173, 127], dtype=np.uint8)
+
+
+# mean dan var dalam urutan kanal frame (BGR), count = jumlah piksel valid
+ROIStats = namedtuple("ROIStats", ["mean", "var", "count", "bbox"])
+
+
+def landmarks_to_pixels(landmarks, indices, width, height):
+    """
+    Mengubah landmark ternormalisasi MediaPipe menjadi koordinat piksel.
+
+    Args:
+        landmarks: Daftar landmark MediaPipe (atribut x, y dalam 0–1)
+        indices (list[int]): Indeks landmark yang diambil
+        width (int): Lebar frame
+        height (int): Tinggi frame
+
+    Returns:
+        np.ndarray: Array int32 berbentuk (len(indices), 2) berisi koordinat (x, y)
+    """
+    coords = np.array([(landmarks[i].x, landmarks[i].y) for i in indices], dtype=np.float32)
+    coords *= (width, height)
+    return coords.astype(np.int32)
+
+
+class ROIEngine:
+    """
+    Menghitung statistik RGB beberapa ROI poligon sekaligus.
+
+    Citra label (poligon region ke-i bernilai i + 1, dikalikan mask kulit) dibuat sekali
+    per frame pada crop yang mencakup semua region, lalu jumlah piksel, kuadratnya dan
+    jumlah piksel per label dihitung sekaligus oleh `kernels.region_sums`. Bounding box
+    region boleh tumpang tindih (misalnya dahi dan pipi saat kepala miring); piksel pada
+    irisan poligon dihitung untuk region yang digambar terakhir.
+    """
+    def __init__(self, regions=None, use_skin_mask=True, min_pixels=20):
+        self.regions = dict(regions or DEFAULT_REGIONS)
+        self.use_skin_mask = use_skin_mask
+        self.min_pixels = min_pixels
+
+    def skin_mask(self, frame):
+        """
+        Membuat mask biner piksel kulit dari frame BGR.
+
+        Args:
+            frame (np.ndarray): Frame (atau crop) BGR
+
+        Returns:
+            np.ndarray: Mask uint8 bernilai 0 atau 1
+        """
+        ycrcb = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb)
+        return cv2.inRange(ycrcb, SKIN_LOWER, SKIN_UPPER) // 255
+
+    def region_polygons(self, landmarks, width, height):
+        """
+        Menghitung poligon piksel untuk setiap region dari landmark wajah.
+
+        Returns:
+            dict[str, np.ndarray]: Nama region → array titik (N, 2)
+        """
+        return {name: landmarks_to_pixels(landmarks, idx, width, height)
+                for name, idx in self.regions.items()}
+
+    def compute(self, frame, polygons):
+        """
+        Menghitung mean, variance, dan jumlah piksel per kanal untuk setiap region.
+
+        Args:
+            frame (np.ndarray): Frame video BGR
+            polygons (dict[str, np.ndarray]): Nama region → titik poligon (x, y) piksel
+
+        Returns:
+            dict[str, ROIStats]: Statistik per region; region kosong/terlalu kecil tidak dimasukkan
+        """
+        h, w = frame.shape[:2]
+        if not polygons:
+            return {}
+
+        # Bounding box tiap region (dibatasi ke dalam frame)
+        bboxes = {}
+        for name, pts in polygons.items():
+            x1, y1 = np.maximum(pts.min(axis=0), 0)
+            x2, y2 = np.minimum(pts.max(axis=0) + 1, (w, h))
+            if x2 > x1 and y2 > y1:
+                bboxes[name] = (int(x1), int(y1), int(x2), int(y2))
+        if not bboxes:
+            return {}
+
+        # Crop gabungan semua region, agar mask dan penjumlahan hanya dihitung di area wajah
+        cx1 = min(b[0] for b in bboxes.values())
+        cy1 = min(b[1] for b in bboxes.values())
+        cx2 = max(b[2] for b in bboxes.values())
+        cy2 = max(b[3] for b in bboxes.values())
+        crop = frame[cy1:cy2, cx1:cx2]
+
+        labels = np.zeros(crop.shape[:2], dtype=np.uint8)
+        for label, name in enumerate(bboxes, start=1):
+            cv2.fillPoly(labels, [(polygons[name] - (cx1, cy1)).astype(np.int32)], label)
+        if self.use_skin_mask:
+            skin = labels * self.skin_mask(crop)
+            # Jika skin mask membuang hampir semua piksel (cahaya ekstrem), pakai mask poligon saja
+            if np.count_nonzero(skin) >= self.min_pixels:
+                labels = skin
+
+        boxes = np.array([(x1 - cx1, y1 - cy1, x2 - cx1, y2 - cy1) for x1, y1, x2, y2 in bboxes.values()],
+                         dtype=np.int64)
+        sums = region_sums(crop, labels, boxes)
+
+        stats = {}
+        for name, row in zip(bboxes, sums):
+            n = row[0]
+            if n < self.min_pixels:
+                continue
+            s, ss = row[1:4], row[4:7]
+            mean = s / n
+            var = np.maximum(ss / n - mean * mean, 0.0)
+            stats[name] = ROIStats(mean, var, int(n), bboxes[name])
+        return stats
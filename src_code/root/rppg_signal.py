@@ -1,9 +1,10 @@
 # rppg_signal.py
 
 import cv2
-import numpy as np
 import mediapipe as mp
 
+from roi_engine import ROIEngine
+
 class RPPGExtractor:
     """
     Ekstraktor sinyal rPPG (remote photoplethysmography) dari video wajah.
@@ -11,53 +12,100 @@ class RPPGExtractor:
     
     Penanggung jawab dan penjelas kode: Fajrul Ramadhana Aqsa
     """
-    def __init__(self):
-        self.face_mesh = mp.solutions.face_mesh.FaceMesh(  # type: ignore[attr-defined]
+    def __init__(self, refine_landmarks=True, inference_scale=1.0, use_skin_mask=True):
+        self.refine_landmarks = refine_landmarks
+        # Skala resolusi frame untuk inferensi FaceMesh (ROI tetap dihitung di resolusi penuh)
+        self.inference_scale = inference_scale
+        self.face_mesh = self._create_face_mesh()
+        # Indeks landmark dahi untuk ROI rPPG
+        self.forehead_indices = [10, 338, 297, 332, 284, 251, 389, 356]
+        # ROI engine bersama (poligon dahi + pipi, skin mask, citra label per region)
+        self.roi_engine = ROIEngine(use_skin_mask=use_skin_mask)
+        # Hasil landmark terakhir, dipakai ulang saat inferensi dilewati
+        self._last_face = None
+
+    def _create_face_mesh(self):
+        return mp.solutions.face_mesh.FaceMesh(  # type: ignore[attr-defined]
             static_image_mode=False,
             max_num_faces=1,
-            refine_landmarks=True,
+            refine_landmarks=self.refine_landmarks,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        # Indeks landmark dahi untuk ROI rPPG
-        self.forehead_indices = [10, 338, 297, 332, 284, 251, 389, 356]
 
-    def extract(self, frame):
+    def configure(self, inference_scale=None, refine_landmarks=None):
         """
-        Mengekstraksi nilai rata-rata green channel dari ROI dahi.
-        Ini adalah sinyal rPPG yang digunakan untuk estimasi heart rate.
+        Mengubah pengaturan inferensi saat runtime (dipakai oleh governor performa).
+        Model FaceMesh hanya dibuat ulang jika `refine_landmarks` berubah.
+        """
+        if inference_scale is not None:
+            self.inference_scale = inference_scale
+        if refine_landmarks is not None and refine_landmarks != self.refine_landmarks:
+            self.refine_landmarks = refine_landmarks
+            self.face_mesh.close()
+            self.face_mesh = self._create_face_mesh()
+
+    def _inference_input(self, frame, frame_rgb=None):
+        if frame_rgb is None:
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self.inference_scale != 1.0:
+            frame_rgb = cv2.resize(frame_rgb, None, fx=self.inference_scale, fy=self.inference_scale,
+                                   interpolation=cv2.INTER_AREA)
+        return frame_rgb
+
+    def analyze(self, frame, detect=True, frame_rgb=None):
+        """
+        Menjalankan FaceMesh sekali dan menghitung semua ROI untuk satu frame.
 
         Args:
             frame (np.ndarray): Frame video BGR
+            detect (bool): Jika False, inferensi dilewati dan poligon dari deteksi
+                terakhir dipakai ulang (statistik ROI tetap dihitung dari frame baru)
+            frame_rgb (np.ndarray | None): Versi RGB dari frame jika sudah tersedia
+                (menghindari konversi warna ulang)
 
         Returns:
-            float | None: Nilai rPPG (green channel, ternormalisasi 0–1), atau None jika gagal
+            dict | None: Berisi 'points' (landmark dahi untuk visualisasi), 'polygons'
+            (poligon piksel per region) dan 'rois' (ROIStats per region),
+            atau None jika wajah tidak terdeteksi
         """
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(frame_rgb)
+        if detect or self._last_face is None:
+            results = self.face_mesh.process(self._inference_input(frame, frame_rgb))
 
-        if not results.multi_face_landmarks:
-            return None
+            if not results.multi_face_landmarks:
+                self._last_face = None
+                return None
 
-        h, w, _ = frame.shape
-        lm = results.multi_face_landmarks[0].landmark
+            h, w, _ = frame.shape
+            lm = results.multi_face_landmarks[0].landmark
+            self._last_face = {
+                'points': [(int(lm[idx].x * w), int(lm[idx].y * h)) for idx in self.forehead_indices],
+                'polygons': self.roi_engine.region_polygons(lm, w, h),
+            }
+
+        face = self._last_face
+        return {
+            'points': face['points'],
+            'polygons': face['polygons'],
+            'rois': self.roi_engine.compute(frame, face['polygons']),
+        }
 
-        # Ambil titik-titik dahi dari landmark
-        xs, ys = [], []
-        for idx in self.forehead_indices:
-            x = int(lm[idx].x * w)
-            y = int(lm[idx].y * h)
-            xs.append(x)
-            ys.append(y)
+    def extract(self, frame):
+        """
+        Mengekstraksi nilai rata-rata green channel dari ROI dahi.
+        Ini adalah sinyal rPPG yang digunakan untuk estimasi heart rate.
 
-        x_min, x_max = max(min(xs), 0), min(max(xs), w)
-        y_min, y_max = max(min(ys), 0), min(max(ys), h)
+        Args:
+            frame (np.ndarray): Frame video BGR
 
-        roi = frame[y_min:y_max, x_min:x_max]
-        if roi.size == 0:
+        Returns:
+            float | None: Nilai rPPG (green channel, ternormalisasi 0–1), atau None jika gagal
+        """
+        result = self.analyze(frame)
+        if result is None or 'forehead' not in result['rois']:
             return None
-        
-        avg_color = np.mean(roi, axis=(0, 1))  # [B, G, R]
+
+        avg_color = result['rois']['forehead'].mean  # [B, G, R]
         return avg_color[1] / 255.0  # Normalisasi green channel (0–1)
 
     def get_landmarks(self, frame):
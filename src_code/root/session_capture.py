@@ -0,0 +1,175 @@
+"""
+Session capture: rekaman ringkas hasil ekstraksi per frame sebagai pengganti video mentah.
+
+Setiap frame sesi live disimpan sebagai kolom yang sama dengan cache inferensi
+(`inference_cache.FrameColumns`): timestamp, landmark dahi, poligon landmark dahi dan pipi,
+mean/varians/jumlah piksel RGB per ROI, nilai respirasi, titik bahu, ROI dada dan kecerahan
+frame. Sesi dapat dianalisis ulang sepenuhnya (filter, estimator, artefak) tanpa inferensi:
+`batch_runner.py sesi.rpcap` membaca file ini seperti sumber biasa.
+
+Format file (chunked, dapat dibaca walaupun penulisan terputus di tengah chunk):
+
+    MAGIC | record(header JSON) | record(chunk .npz terkompresi) | record(...) | ...
+    record = panjang payload (uint32 little-endian) + payload
+
+Loop video hanya menambahkan baris ke chunk yang sedang diisi; chunk penuh dikompresi dan
+ditulis oleh thread latar belakang.
+
+Kelas/fungsi:
+- SessionCaptureWriter: append(ts, face, pose, brightness) dan close().
+- read_capture(path): (header, kolom per frame) dari file capture.
+- is_capture(source): True jika sumber adalah file capture.
+"""
+
+import io
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+from inference_cache import FrameColumns, ROI_NAMES
+
+
+CAPTURE_VERSION = 1
+CAPTURE_EXTENSION = ".rpcap"
+MAGIC = b"RPPGCAP\n"
+_LENGTH = struct.Struct("<I")
+_STOP = object()
+
+
+def is_capture(source):
+    """True jika `source` adalah path file session capture."""
+    return isinstance(source, str) and source.lower().endswith(CAPTURE_EXTENSION)
+
+
+class SessionCaptureWriter:
+    """
+    Penulis session capture dengan kompresi dan penulisan di thread latar belakang.
+
+    Args:
+        path (str): Path file tujuan (`.rpcap`)
+        fs (float): Frame rate nominal
+        chunk_frames (int): Jumlah frame per chunk terkompresi
+        metadata (dict | None): Informasi tambahan untuk header (subjek, sumber, pengaturan)
+    """
+    def __init__(self, path, fs, chunk_frames=300, metadata=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.fs = fs
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self.bytes_written = 0
+        self._columns = FrameColumns(landmarks=True)
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        header = {'version': CAPTURE_VERSION, 'fs': fs, 'roi_names': list(ROI_NAMES),
+                  'created': time.time(), **(metadata or {})}
+        self._write_record(json.dumps(header, default=str).encode())
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def append(self, ts, face, pose, brightness):
+        """
+        Menambahkan hasil satu frame (lihat `FrameColumns.append`); dipanggil dari loop video.
+        """
+        self._columns.append(ts, face, pose, brightness)
+        self.frames += 1
+        if len(self._columns) >= self.chunk_frames:
+            self._flush()
+
+    def _flush(self):
+        if len(self._columns):
+            self._queue.put(self._columns)
+            self._columns = FrameColumns(landmarks=True)
+
+    def _write_record(self, payload):
+        self._file.write(_LENGTH.pack(len(payload)))
+        self._file.write(payload)
+        self.bytes_written += _LENGTH.size + len(payload)
+
+    def _run(self):
+        while True:
+            columns = self._queue.get()
+            if columns is _STOP:
+                return
+            try:
+                buffer = io.BytesIO()
+                np.savez_compressed(buffer, **columns.to_arrays(self.fs))
+                self._write_record(buffer.getvalue())
+                self._file.flush()
+            except Exception as e:
+                print(f"⚠️ Session capture write error: {e}")
+
+    def close(self):
+        """Menulis chunk terakhir, menunggu thread penulis, lalu menutup file."""
+        self._flush()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+
+
+def _read_record(f):
+    raw = f.read(_LENGTH.size)
+    if len(raw) < _LENGTH.size:
+        return None
+    (length,) = _LENGTH.unpack(raw)
+    payload = f.read(length)
+    if len(payload) < length:
+        print(f"⚠️ Truncated session capture chunk ignored: {f.name}")
+        return None
+    return payload
+
+
+def _concat(key, arrays):
+    """Menggabungkan kolom antar chunk; kolom landmark dipadatkan ke jumlah titik terbanyak (-1)."""
+    if key in ('points', 'region_points'):
+        n_points = max(a.shape[1] for a in arrays)
+        arrays = [a if a.shape[1] == n_points else
+                  np.concatenate((a, np.full((len(a), n_points - a.shape[1], 2), -1, dtype=a.dtype)), axis=1)
+                  for a in arrays]
+    return np.concatenate(arrays)
+
+
+def read_capture(path):
+    """
+    Membaca file session capture.
+
+    Args:
+        path (str): Path file `.rpcap`
+
+    Returns:
+        tuple: (header dict, kolom per frame seperti `FrameColumns.to_arrays`)
+
+    Raises:
+        ValueError: Jika file bukan session capture
+    """
+    chunks = []
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a session capture file: {path}")
+        header = _read_record(f)
+        if header is None:
+            raise ValueError(f"Session capture header missing: {path}")
+        header = json.loads(header)
+        while True:
+            payload = _read_record(f)
+            if payload is None:
+                break
+            with np.load(io.BytesIO(payload)) as data:
+                chunks.append({name: data[name] for name in data.files})
+
+    if not chunks:
+        return header, FrameColumns(landmarks=True).to_arrays(header['fs'])
+    columns = {key: _concat(key, [chunk[key] for chunk in chunks]) for key, value in chunks[0].items()
+               if value.ndim and key not in ('roi_names', 'region_sizes')}
+    # Kolom tetap (bukan per frame) diambil dari chunk yang memiliki landmark wajah
+    sizes = next((c['region_sizes'] for c in chunks if c['region_sizes'].any()), chunks[0]['region_sizes'])
+    columns.update(fs=chunks[0]['fs'], roi_names=chunks[0]['roi_names'], region_sizes=sizes)
+    return header, columns
@@ -0,0 +1,223 @@
+"""
+Modul basis data hasil sesi (SQLite lokal).
+
+Menyimpan indeks semua sesi, subjek, segmen rekaman dan ringkasan per detik
+(heart rate, respiration rate, kualitas sinyal), beserta referensi ke file ekspor
+dan rekaman biner mentah. Query berindeks berdasarkan rentang waktu dan subjek.
+
+Penulisan dilakukan oleh satu thread latar belakang yang menggabungkan banyak insert
+dalam satu transaksi (executemany), sehingga thread UI tidak pernah menunggu disk.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subjects (
+    name TEXT PRIMARY KEY,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    subject TEXT NOT NULL REFERENCES subjects(name),
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    source TEXT,
+    fs REAL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    kind TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    plot_path TEXT,
+    data_path TEXT,
+    recording_path TEXT
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    t REAL NOT NULL,
+    heart_rate REAL,
+    respiration_rate REAL,
+    hr_quality REAL,
+    rr_quality REAL,
+    PRIMARY KEY (session_id, t)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_subject ON sessions(subject, started_at);
+CREATE INDEX IF NOT EXISTS idx_segments_session ON segments(session_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_summaries_t ON summaries(t);
+"""
+
+_STOP = object()
+
+
+class SessionStore:
+    """
+    Penyimpanan sesi berbasis SQLite dengan penulis latar belakang.
+
+    Args:
+        path (str): Path file basis data
+        batch_size (int): Jumlah maksimum operasi per transaksi
+        flush_interval (float): Waktu tunggu maksimum (detik) sebelum batch ditulis
+    """
+    def __init__(self, path, batch_size=500, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run_writer, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        # WAL: pembacaan (query) tidak diblokir oleh penulis latar belakang
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # === Penulisan (asinkron) ===
+
+    def _submit(self, sql, params):
+        self._queue.put((sql, params))
+
+    def _run_writer(self):
+        conn = self._connect()
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                # Kumpulkan operasi lain yang datang dalam jendela flush
+                while item is not _STOP and len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+
+                ops = [op for op in batch if op is not _STOP]
+                if ops:
+                    self._write_batch(conn, ops)
+                for _ in batch:
+                    self._queue.task_done()
+                if any(op is _STOP for op in batch):
+                    break
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write_batch(conn, ops):
+        try:
+            with conn:
+                # Operasi berurutan dengan SQL sama digabung menjadi satu executemany
+                i = 0
+                while i < len(ops):
+                    sql = ops[i][0]
+                    j = i
+                    while j < len(ops) and ops[j][0] == sql:
+                        j += 1
+                    conn.executemany(sql, [params for _, params in ops[i:j]])
+                    i = j
+        except sqlite3.Error as e:
+            print(f"❌ Session store write error: {e}")
+
+    def start_session(self, subject="default", source=None, fs=None, started_at=None):
+        """
+        Mendaftarkan sesi baru (dan subjek jika belum ada).
+
+        Returns:
+            str: ID sesi (dibuat di sisi klien, sehingga tidak perlu menunggu penulis)
+        """
+        session_id = uuid.uuid4().hex
+        now = started_at if started_at is not None else time.time()
+        self._submit("INSERT OR IGNORE INTO subjects (name, created_at) VALUES (?, ?)", (subject, now))
+        self._submit("INSERT INTO sessions (id, subject, started_at, source, fs) VALUES (?, ?, ?, ?, ?)",
+                     (session_id, subject, now, None if source is None else str(source), fs))
+        return session_id
+
+    def end_session(self, session_id, ended_at=None):
+        """Menandai sesi selesai."""
+        self._submit("UPDATE sessions SET ended_at = ? WHERE id = ?",
+                     (ended_at if ended_at is not None else time.time(), session_id))
+
+    def add_summary(self, session_id, t, heart_rate=None, respiration_rate=None,
+                    hr_quality=None, rr_quality=None):
+        """Menambahkan ringkasan per detik (t = waktu epoch dalam detik)."""
+        self._submit("INSERT OR REPLACE INTO summaries (session_id, t, heart_rate, respiration_rate, "
+                     "hr_quality, rr_quality) VALUES (?, ?, ?, ?, ?, ?)",
+                     (session_id, t, heart_rate, respiration_rate, hr_quality, rr_quality))
+
+    def add_segment(self, session_id, kind, started_at, ended_at, plot_path=None,
+                    data_path=None, recording_path=None):
+        """Mendaftarkan segmen rekaman beserta referensi file ekspor/rekaman mentah."""
+        self._submit("INSERT INTO segments (session_id, kind, started_at, ended_at, plot_path, "
+                     "data_path, recording_path) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (session_id, kind, started_at, ended_at, plot_path, data_path, recording_path))
+
+    def flush(self):
+        """Menunggu hingga semua operasi yang antre sudah ditulis."""
+        self._queue.join()
+
+    def close(self):
+        """Menulis sisa antrean dan menghentikan thread penulis."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    # === Query (sinkron, koneksi baca terpisah) ===
+
+    def _query(self, sql, params=()):
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def sessions(self, start=None, end=None, subject=None):
+        """
+        Daftar sesi yang dimulai dalam rentang waktu [start, end), opsional per subjek.
+        """
+        sql = "SELECT * FROM sessions WHERE started_at >= ? AND started_at < ?"
+        params = [start if start is not None else 0, end if end is not None else float('inf')]
+        if subject is not None:
+            sql += " AND subject = ?"
+            params.append(subject)
+        return self._query(sql + " ORDER BY started_at", params)
+
+    def summaries(self, session_id=None, start=None, end=None, subject=None):
+        """
+        Ringkasan per detik dalam rentang waktu, difilter per sesi dan/atau subjek.
+        """
+        sql = "SELECT s.* FROM summaries s"
+        where = ["s.t >= ?", "s.t < ?"]
+        params = [start if start is not None else 0, end if end is not None else float('inf')]
+        if subject is not None:
+            sql += " JOIN sessions ses ON ses.id = s.session_id"
+            where.append("ses.subject = ?")
+            params.append(subject)
+        if session_id is not None:
+            where.append("s.session_id = ?")
+            params.append(session_id)
+        return self._query(f"{sql} WHERE {' AND '.join(where)} ORDER BY s.t", params)
+
+    def segments(self, session_id):
+        """Daftar segmen rekaman untuk satu sesi."""
+        return self._query("SELECT * FROM segments WHERE session_id = ? ORDER BY started_at", (session_id,))
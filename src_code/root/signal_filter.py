@@ -9,12 +9,21 @@ Digunakan untuk preprocessing sinyal rPPG dan respirasi:
 penanggung jawab code dan yang menjelaksan code: Fajrul Ramadhana Aqsa
 """
 
-from scipy.signal import butter, filtfilt, medfilt, savgol_filter
+from scipy.signal import butter, decimate, medfilt, savgol_filter, sosfiltfilt
 import numpy as np
 import warnings
 
+from stream_filter import decimation_factor
 
-def butter_bandpass(lowcut, highcut, fs, order=5):
+
+# Rentang frekuensi fisiologis (Hz) untuk tiap jenis sinyal
+SIGNAL_BANDS = {
+    "rppg": (0.7, 3.0),
+    "respirasi": (0.1, 0.5),
+}
+
+
+def butter_bandpass(lowcut, highcut, fs, order=5, output='ba'):
     """
     Membuat filter Butterworth bandpass.
 
@@ -23,9 +32,10 @@ def butter_bandpass(lowcut, highcut, fs, order=5):
         highcut (float): Frekuensi cutoff atas (Hz)
         fs (float): Frekuensi sampling (Hz)
         order (int): Orde filter
+        output (str): 'ba' (koefisien polinomial) atau 'sos' (second-order sections)
 
     Returns:
-        tuple: Koefisien filter (b, a)
+        tuple | np.ndarray: Koefisien filter (b, a), atau array SOS jika output='sos'
     """
     if lowcut <= 0 or highcut <= 0:
         raise ValueError("Cutoff frequencies must be positive")
@@ -41,12 +51,12 @@ def butter_bandpass(lowcut, highcut, fs, order=5):
     high = highcut / nyq
 
     try:
-        result = butter(order, [low, high], btype='band')
+        result = butter(order, [low, high], btype='band', output=output)
         if result is None:
             raise ValueError("❌ scipy.signal.butter() returned None")
-        if not isinstance(result, tuple) or len(result) != 2:
+        if output == 'ba' and (not isinstance(result, tuple) or len(result) != 2):
             raise ValueError(f"❌ Unexpected butter() output: {result}")
-        return result  # b, a
+        return result  # (b, a) atau sos
     except Exception as e:
         print(f"❌ Error in butter_bandpass(): {e}")
         return None
@@ -56,7 +66,11 @@ def butter_bandpass(lowcut, highcut, fs, order=5):
 
 def apply_bandpass_filter(data, lowcut, highcut, fs, order=5):
     """
-    Terapkan filter bandpass Butterworth ke data sinyal.
+    Terapkan filter bandpass Butterworth (zero-phase) ke data sinyal.
+
+    Filter dijalankan sebagai second-order sections (sosfiltfilt): bentuk (b, a) orde tinggi
+    dengan band sempit relatif terhadap fs (misalnya respirasi 0.1–0.5 Hz) tidak stabil secara
+    numerik dan memperbesar selisih pembulatan kecil pada input.
 
     Args:
         data (array-like): Data sinyal
@@ -72,11 +86,10 @@ def apply_bandpass_filter(data, lowcut, highcut, fs, order=5):
         raise ValueError("Data is None or too short for filtering")
 
     try:
-        result = butter_bandpass(lowcut, highcut, fs, order)
-        if result is None:
+        sos = butter_bandpass(lowcut, highcut, fs, order, output='sos')
+        if sos is None:
             raise ValueError("butter_bandpass() returned None")
-        b, a = result
-        filtered_data = filtfilt(b, a, data)
+        filtered_data = sosfiltfilt(sos, data)
         return filtered_data
     except Exception as e:
         print(f"Filtering error: {e}. Returning original data.")
@@ -144,7 +157,17 @@ def apply_savgol_filter(data, window_length=11, poly_order=3):
         return data
 
 
-def preprocess_signal(data, fs, signal_type="rPPG", apply_median=True, apply_savgol=True):
+def _savgol_window(n_samples, savgol_window):
+    """Panjang jendela Savitzky-Golay adaptif: n/3 dibatasi (min, max), selalu ganjil."""
+    min_window, max_window = savgol_window
+    window_len = max(min_window, min(max_window, n_samples // 3))
+    if window_len % 2 == 0:
+        window_len -= 1
+    return window_len
+
+
+def preprocess_signal(data, fs, signal_type="rPPG", apply_median=True, apply_savgol=True,
+                      kernel_size=5, savgol_window=(5, 11), poly_order=3, order=5, band=None):
     """
     Pipeline preprocessing sinyal (median → savgol → bandpass)
 
@@ -154,6 +177,11 @@ def preprocess_signal(data, fs, signal_type="rPPG", apply_median=True, apply_sav
         signal_type (str): "rPPG" atau "respirasi"
         apply_median (bool): Aktifkan median filter
         apply_savgol (bool): Aktifkan Savitzky-Golay
+        kernel_size (int): Ukuran kernel median filter
+        savgol_window (tuple): Batas (min, max) panjang jendela Savitzky-Golay
+        poly_order (int): Orde polinomial Savitzky-Golay
+        order (int): Orde filter bandpass Butterworth
+        band (tuple | None): Band (low, high) Hz; default dari SIGNAL_BANDS sesuai signal_type
 
     Returns:
         np.ndarray: Sinyal hasil preprocessing
@@ -169,21 +197,19 @@ def preprocess_signal(data, fs, signal_type="rPPG", apply_median=True, apply_sav
 
     try:
         if apply_median:
-            processed_data = apply_median_filter(processed_data, kernel_size=5)
+            processed_data = apply_median_filter(processed_data, kernel_size=kernel_size)
 
         if apply_savgol:
-            window_len = max(5, min(11, len(processed_data) // 3))
-            if window_len % 2 == 0:
-                window_len -= 1
-            if window_len >= 5:
+            window_len = _savgol_window(len(processed_data), savgol_window)
+            if window_len >= savgol_window[0]:
                 processed_data = apply_savgol_filter(processed_data,
                                                      window_length=window_len,
-                                                     poly_order=3)
+                                                     poly_order=poly_order)
 
-        if signal_type.lower() == "rppg":
-            processed_data = apply_bandpass_filter(processed_data, 0.7, 3.0, fs)
-        elif signal_type.lower() == "respirasi":
-            processed_data = apply_bandpass_filter(processed_data, 0.1, 0.5, fs)
+        if band is None:
+            band = SIGNAL_BANDS.get(signal_type.lower())
+        if band is not None:
+            processed_data = apply_bandpass_filter(processed_data, band[0], band[1], fs, order)
         else:
             print(f"Warning: Unknown signal type '{signal_type}'. Skipping bandpass filter.")
 
@@ -194,13 +220,117 @@ def preprocess_signal(data, fs, signal_type="rPPG", apply_median=True, apply_sav
         return data
 
 
+def preprocess_signal_batch(data, fs, signal_type="rPPG", axis=-1, apply_median=True, apply_savgol=True,
+                            kernel_size=5, savgol_window=(5, 11), poly_order=3, order=5, bands=None):
+    """
+    Pipeline preprocessing (median → savgol → bandpass) untuk banyak sinyal sekaligus.
+
+    Semua kanal difilter dalam satu panggilan SciPy per tahap di sepanjang `axis`,
+    sehingga biaya filtering sebanding dengan ukuran data, bukan jumlah sinyal.
+    Hasil tiap baris sama dengan `preprocess_signal` pada baris tersebut (hingga pembulatan
+    floating point; bandpass SOS tidak memperbesar selisih tersebut).
+
+    Args:
+        data (array-like): Array 2-D (kanal × sampel), misalnya trace RGB atau banyak subjek
+        fs (float): Frekuensi sampling
+        signal_type (str | list[str]): Satu jenis sinyal untuk semua kanal, atau
+            daftar jenis sinyal per kanal ("rPPG" / "respirasi")
+        axis (int): Sumbu waktu (sampel)
+        apply_median (bool): Aktifkan median filter
+        apply_savgol (bool): Aktifkan Savitzky-Golay
+        kernel_size (int): Ukuran kernel median filter
+        savgol_window (tuple): Batas (min, max) panjang jendela Savitzky-Golay
+        poly_order (int): Orde polinomial Savitzky-Golay
+        order (int): Orde filter bandpass Butterworth
+        bands (dict | None): Override band per jenis sinyal, misalnya {"rppg": (0.7, 3.0)}
+
+    Returns:
+        np.ndarray: Array hasil preprocessing dengan bentuk yang sama dengan input
+    """
+    data = np.asarray(data, dtype=float)
+    if data.ndim != 2:
+        raise ValueError("Batch data must be a 2-D array (channels x samples)")
+
+    # Pindahkan sumbu waktu ke akhir agar indexing kanal selalu di sumbu 0
+    data = np.moveaxis(data, axis, -1)
+    n_channels, n_samples = data.shape
+
+    if isinstance(signal_type, str):
+        signal_types = [signal_type] * n_channels
+    else:
+        signal_types = list(signal_type)
+        if len(signal_types) != n_channels:
+            raise ValueError("signal_type list length must match number of channels")
+
+    if n_samples < 30:
+        print("Warning: Data too short for preprocessing. Returning original data.")
+        return np.moveaxis(data, -1, axis)
+
+    processed_data = data.copy()
+
+    try:
+        if apply_median:
+            if kernel_size % 2 == 0:
+                kernel_size += 1
+            # Kernel (1, k): median hanya di sepanjang sumbu waktu
+            processed_data = medfilt(processed_data, kernel_size=(1, kernel_size))
+
+        if apply_savgol:
+            window_len = _savgol_window(n_samples, savgol_window)
+            if window_len >= savgol_window[0]:
+                processed_data = savgol_filter(processed_data, window_len, poly_order, axis=-1)
+
+        band_table = dict(SIGNAL_BANDS, **(bands or {}))
+
+        # Kelompokkan kanal berdasarkan band agar tiap band cukup satu sosfiltfilt
+        groups = {}
+        for i, name in enumerate(signal_types):
+            band = band_table.get(name.lower())
+            if band is None:
+                print(f"Warning: Unknown signal type '{name}'. Skipping bandpass filter.")
+                continue
+            groups.setdefault(band, []).append(i)
+
+        for (lowcut, highcut), rows in groups.items():
+            sos = butter_bandpass(lowcut, highcut, fs, order, output='sos')
+            if sos is None:
+                raise ValueError("butter_bandpass() returned None")
+            processed_data[rows] = sosfiltfilt(sos, processed_data[rows], axis=-1)
+
+        return np.moveaxis(processed_data, -1, axis)
+
+    except Exception as e:
+        print(f"Batch preprocessing error: {e}. Returning original data.")
+        return np.moveaxis(data, -1, axis)
+
+
 # === Convenience functions untuk GUI ===
 
-def filter_rppg_signal(data, fs=30):
+def filter_rppg_signal(data, fs=30, **kwargs):
     """Sinyal preprocessing khusus rPPG."""
-    return preprocess_signal(data, fs, signal_type="rPPG")
+    return preprocess_signal(data, fs, signal_type="rPPG", **kwargs)
     
 
-def filter_respiration_signal(data, fs=30):
+def filter_respiration_signal(data, fs=30, **kwargs):
     """Sinyal preprocessing khusus respirasi."""
-    return preprocess_signal(data, fs, signal_type="respirasi")
+    return preprocess_signal(data, fs, signal_type="respirasi", **kwargs)
+
+
+def decimate_signal(data, fs, target_rate):
+    """
+    Decimasi batch (anti-alias IIR zero-phase) ke laju yang sesuai dengan band sinyal.
+
+    Args:
+        data (array-like): Sinyal input (1-D)
+        fs (float): Frekuensi sampling input
+        target_rate (float): Frekuensi sampling yang diinginkan
+
+    Returns:
+        tuple[np.ndarray, float]: (sinyal hasil decimasi, frekuensi sampling baru)
+    """
+    data = np.asarray(data, dtype=float)
+    factor = decimation_factor(fs, target_rate)
+    # decimate(ftype='iir') memakai filtfilt dengan padlen bawaan; sinyal pendek tidak didecimasi
+    if factor == 1 or len(data) <= 27:
+        return data, fs
+    return decimate(data, factor, ftype='iir', zero_phase=True), fs / factor
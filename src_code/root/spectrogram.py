@@ -0,0 +1,147 @@
+"""
+Spektrogram (STFT) inkremental untuk tampilan waktu-frekuensi rPPG dan respirasi.
+
+Harmonik dan HR yang bergeser sulit terlihat dari satu angka per sinyal; spektrogram
+bergulir menampilkan seluruh spektrum band terhadap waktu. Kolom STFT baru dihitung
+hanya saat satu hop sampel baru terkumpul (tidak menghitung ulang seluruh jendela), dan
+ditulis langsung ke array gambar yang dialokasikan sekali.
+
+Kolom dinormalisasi terhadap puncaknya sendiri (dB relatif, dibatasi FLOOR_DB), sehingga
+skala warna tetap dan tampilan tidak bergantung pada amplitudo sinyal.
+
+Kelas dan fungsi:
+- IncrementalSTFT: STFT bergulir per hop dengan gambar kolom (frekuensi × waktu) di tempat.
+- spectrogram(signal, fs, ...): Versi batch dengan jendela dan hop yang sama (batch runner).
+- normalize_db(power): Daya → dB relatif terhadap puncak per kolom.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import detrend
+
+
+FLOOR_DB = -30.0      # batas bawah skala warna (dB relatif terhadap puncak kolom)
+
+
+def _fft_size(n):
+    """Panjang FFT (pangkat dua, minimal 256) agar sumbu frekuensi tampilan cukup halus."""
+    return max(256, 1 << (int(n) - 1).bit_length())
+
+
+def _band_bins(nfft, fs, band):
+    freqs = np.fft.rfftfreq(nfft, 1.0 / fs)
+    bins = np.flatnonzero((freqs >= band[0]) & (freqs <= band[1]))
+    return bins, freqs[bins]
+
+
+def _frame_power(frames, taper, nfft, bins):
+    """Daya spektrum band untuk setiap baris frame (detrend linear + jendela Hann)."""
+    x = detrend(frames, axis=-1, type='linear') * taper
+    return np.abs(np.fft.rfft(x, n=nfft, axis=-1)[..., bins]) ** 2
+
+
+def normalize_db(power):
+    """
+    Mengubah daya menjadi dB relatif terhadap puncak setiap kolom.
+
+    Args:
+        power (np.ndarray): Daya dengan frekuensi pada sumbu terakhir
+
+    Returns:
+        np.ndarray: dB dalam rentang [FLOOR_DB, 0]
+    """
+    peak = np.max(power, axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        db = 10.0 * np.log10(power / np.maximum(peak, 1e-20))
+    return np.clip(np.nan_to_num(db, nan=FLOOR_DB), FLOOR_DB, 0.0)
+
+
+class IncrementalSTFT:
+    """
+    STFT bergulir: satu kolom baru per hop sampel, ditulis ke gambar yang dialokasikan sekali.
+
+    Args:
+        fs (float): Laju sampling sinyal masukan (Hz)
+        window (float): Panjang jendela STFT (detik)
+        hop (float): Jarak antar kolom (detik)
+        band (tuple): Rentang frekuensi (low, high) Hz yang disimpan
+        columns (int): Jumlah kolom riwayat pada gambar
+    """
+    def __init__(self, fs, window, hop, band, columns):
+        self.fs = fs
+        self.n = max(8, int(round(window * fs)))
+        self.hop = max(1, int(round(hop * fs)))
+        self.nfft = _fft_size(self.n)
+        self.bins, self.freqs = _band_bins(self.nfft, fs, band)
+        self.taper = np.hanning(self.n)
+        # Gambar (frekuensi × waktu), kolom terbaru di kanan
+        self.image = np.full((len(self.bins), columns), FLOOR_DB)
+        self._samples = np.zeros(self.n)
+        self.reset()
+
+    def reset(self):
+        """Mengosongkan riwayat sampel dan gambar (misalnya saat feed video dimulai ulang)."""
+        self.image.fill(FLOOR_DB)
+        self._pos = 0
+        self._filled = 0
+        self._since_column = 0
+        self.count = 0
+
+    def push(self, values):
+        """
+        Menambahkan sampel baru dan menghitung kolom untuk setiap hop yang lengkap.
+
+        Args:
+            values (array-like): Satu atau beberapa sampel baru
+
+        Returns:
+            int: Jumlah kolom baru pada `image`
+        """
+        columns = []
+        for value in np.atleast_1d(np.asarray(values, dtype=float)):
+            self._samples[self._pos] = value
+            self._pos = (self._pos + 1) % self.n
+            self._filled = min(self._filled + 1, self.n)
+            self._since_column += 1
+            if self._filled == self.n and self._since_column >= self.hop:
+                self._since_column = 0
+                columns.append(np.roll(self._samples, -self._pos))
+        if not columns:
+            return 0
+
+        power = _frame_power(np.array(columns), self.taper, self.nfft, self.bins)
+        new = normalize_db(power).T[:, -self.image.shape[1]:]
+        k = new.shape[1]
+        # Geser gambar ke kiri di tempat lalu tulis kolom baru di kanan
+        self.image[:, :-k] = self.image[:, k:]
+        self.image[:, -k:] = new
+        self.count += len(columns)
+        return len(columns)
+
+
+def spectrogram(signal, fs, window, hop, band):
+    """
+    Spektrogram batch dengan jendela dan hop yang sama seperti `IncrementalSTFT`.
+
+    Args:
+        signal (array-like): Sinyal (tanpa NaN)
+        fs (float): Laju sampling (Hz)
+        window (float): Panjang jendela STFT (detik)
+        hop (float): Jarak antar kolom (detik)
+        band (tuple): Rentang frekuensi (low, high) Hz
+
+    Returns:
+        tuple: (times, freqs, power) — waktu akhir tiap kolom (detik), frekuensi (Hz) dan
+        daya linear dengan bentuk (len(times), len(freqs))
+    """
+    x = np.asarray(signal, dtype=float)
+    n = max(8, int(round(window * fs)))
+    step = max(1, int(round(hop * fs)))
+    bins, freqs = _band_bins(_fft_size(n), fs, band)
+    if len(x) < n:
+        return np.empty(0), freqs, np.empty((0, len(freqs)))
+
+    frames = sliding_window_view(x, n)[::step]
+    power = _frame_power(frames, np.hanning(n), _fft_size(n), bins)
+    times = (np.arange(len(frames)) * step + n) / fs
+    return times, freqs, power
@@ -0,0 +1,282 @@
+"""
+Modul filter streaming (per-sampel) untuk preprocessing sinyal rPPG dan respirasi.
+
+Versi streaming dari tahap median dan Savitzky-Golay pada `signal_filter`:
+- RunningMedian: median bergulir dengan jendela terurut (bisect, atau kernel JIT)
+- StreamingSavgol: Savitzky-Golay sebagai konvolusi FIR dengan koefisien tetap
+- StreamingPreprocessor: rantai median → savgol untuk satu sampel baru per frame
+- StreamingBandpass: bandpass Butterworth kausal (sosfilt) dengan state antar panggilan
+- StreamingDecimator: lowpass anti-alias kausal + decimasi integer (rantai multirate)
+
+Setiap sampel baru hanya memproses jendela terakhir, sehingga biaya per frame konstan.
+Keluaran streaming tertunda setengah jendela (filter terpusat) dan identik dengan
+keluaran batch (`apply_median_filter` / `apply_savgol_filter`) setelah melewati tepi sinyal.
+Operasi per sampel memakai kernel dari `kernels.py` (JIT Numba jika terpasang).
+"""
+
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+from scipy.signal import butter, savgol_coeffs, sosfilt, sosfilt_zi
+
+from kernels import JIT_ACTIVE, sorted_update, sos_step, window_dot
+
+
+class RunningMedian:
+    """
+    Median bergulir dengan jendela terurut.
+
+    Setiap `push` menyisipkan sampel baru dan membuang sampel tertua dari jendela terurut,
+    sehingga tidak perlu mengurutkan ulang seluruh jendela. Dengan kernel JIT aktif jendela
+    berupa array berukuran tetap (`kernels.sorted_update`); tanpa JIT list + bisect lebih cepat
+    daripada fallback NumPy sehingga dipakai langsung.
+    """
+    def __init__(self, kernel_size=5):
+        if kernel_size % 2 == 0:
+            kernel_size += 1
+        self.kernel_size = kernel_size
+        self.delay = kernel_size // 2
+        self._jit = JIT_ACTIVE
+        if self._jit:
+            self._window = np.zeros(kernel_size)     # buffer melingkar urutan kedatangan
+            self._sorted = np.zeros(kernel_size)
+        else:
+            self._window = deque()
+            self._sorted = []
+        self._pos = 0
+        self._count = 0
+
+    def reset(self):
+        """Mengosongkan jendela (misalnya saat feed video dimulai ulang)."""
+        if not self._jit:
+            self._window.clear()
+            self._sorted.clear()
+        self._pos = 0
+        self._count = 0
+
+    def push(self, value):
+        """
+        Menambahkan satu sampel dan mengembalikan median jendela terakhir.
+
+        Args:
+            value (float): Sampel baru
+
+        Returns:
+            float | None: Median untuk sampel ke-(n - delay), atau None jika jendela belum penuh
+        """
+        value = float(value)
+        if self._jit:
+            return self._push_kernel(value)
+
+        self._window.append(value)
+        insort(self._sorted, value)
+
+        if len(self._window) > self.kernel_size:
+            oldest = self._window.popleft()
+            del self._sorted[bisect_left(self._sorted, oldest)]
+
+        if len(self._window) < self.kernel_size:
+            return None
+        return self._sorted[self.delay]
+
+    def _push_kernel(self, value):
+        k = self.kernel_size
+        full = self._count >= k
+        sorted_update(self._sorted, min(self._count, k), self._window[self._pos], value, full)
+        self._window[self._pos] = value
+        self._pos = (self._pos + 1) % k
+        self._count += 1
+
+        if self._count < k:
+            return None
+        return float(self._sorted[self.delay])
+
+
+class StreamingSavgol:
+    """
+    Filter Savitzky-Golay sebagai konvolusi FIR dengan koefisien yang dihitung sekali.
+
+    Sampel disimpan dalam buffer melingkar ganda (setiap sampel ditulis dua kali)
+    agar jendela terakhir selalu berupa slice kontigu tanpa `np.roll`.
+    """
+    def __init__(self, window_length=11, poly_order=3):
+        if window_length % 2 == 0:
+            window_length += 1
+        if window_length <= poly_order:
+            window_length = poly_order + 2
+            if window_length % 2 == 0:
+                window_length += 1
+
+        self.window_length = window_length
+        self.poly_order = poly_order
+        self.delay = window_length // 2
+        # Koefisien untuk titik tengah jendela, urutan sesuai sampel (dot product)
+        self.coeffs = savgol_coeffs(window_length, poly_order, use='dot')
+        self._buffer = np.zeros(2 * window_length)
+        self._pos = 0
+        self._count = 0
+
+    def reset(self):
+        """Mengosongkan buffer sampel."""
+        self._buffer.fill(0.0)
+        self._pos = 0
+        self._count = 0
+
+    def push(self, value):
+        """
+        Menambahkan satu sampel dan mengembalikan hasil smoothing untuk titik tengah jendela.
+
+        Args:
+            value (float): Sampel baru
+
+        Returns:
+            float | None: Nilai terfilter untuk sampel ke-(n - delay), atau None jika jendela belum penuh
+        """
+        w = self.window_length
+        self._buffer[self._pos] = value
+        self._buffer[self._pos + w] = value
+        self._pos = (self._pos + 1) % w
+        self._count += 1
+
+        if self._count < w:
+            return None
+        return float(window_dot(self.coeffs, self._buffer, self._pos))
+
+
+class StreamingPreprocessor:
+    """
+    Rantai streaming median → Savitzky-Golay dengan parameter yang sama seperti
+    `preprocess_signal` (kernel 5, window 11, poly order 3).
+
+    Total keterlambatan keluaran adalah `delay` sampel.
+    """
+    def __init__(self, kernel_size=5, window_length=11, poly_order=3,
+                 apply_median=True, apply_savgol=True):
+        self.median = RunningMedian(kernel_size) if apply_median else None
+        self.savgol = StreamingSavgol(window_length, poly_order) if apply_savgol else None
+        self.delay = ((self.median.delay if self.median else 0) +
+                      (self.savgol.delay if self.savgol else 0))
+
+    def reset(self):
+        """Mengosongkan seluruh state tahap filter."""
+        if self.median:
+            self.median.reset()
+        if self.savgol:
+            self.savgol.reset()
+
+    def push(self, value):
+        """
+        Memproses satu sampel baru melalui seluruh tahap.
+
+        Args:
+            value (float): Sampel mentah baru
+
+        Returns:
+            float | None: Sampel terfilter (tertunda `delay` sampel), atau None saat pengisian awal
+        """
+        if self.median:
+            value = self.median.push(value)
+            if value is None:
+                return None
+        if self.savgol:
+            value = self.savgol.push(value)
+        return value
+
+
+class StreamingBandpass:
+    """
+    Bandpass Butterworth kausal (sosfilt dengan state) untuk pemrosesan per sampel.
+
+    Berbeda dengan `apply_bandpass_filter` (filtfilt, zero-phase, butuh seluruh buffer),
+    filter ini hanya memproses sampel baru sehingga cocok untuk analisis live,
+    dengan konsekuensi adanya pergeseran fase (group delay) kecil.
+    """
+    def __init__(self, lowcut, highcut, fs, order=5):
+        if lowcut <= 0 or lowcut >= highcut:
+            raise ValueError("Invalid cutoff frequencies")
+        if highcut >= fs / 2:
+            raise ValueError("High cutoff must be less than Nyquist frequency")
+        self.sos = butter(order, [lowcut, highcut], btype='band', fs=fs, output='sos')
+        self._zi_unit = sosfilt_zi(self.sos)
+        self._zi = None
+
+    def reset(self):
+        """Mengosongkan state filter; sampel berikutnya menjadi titik awal baru."""
+        self._zi = None
+
+    def process(self, values):
+        """
+        Memfilter satu blok sampel baru dan melanjutkan state filter.
+
+        Args:
+            values (array-like): Sampel baru (1-D)
+
+        Returns:
+            np.ndarray: Sampel terfilter dengan panjang yang sama
+        """
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        if len(values) == 0:
+            return values
+        if self._zi is None:
+            # Inisialisasi state pada kondisi tunak dari sampel pertama (mengurangi transien awal)
+            self._zi = self._zi_unit * values[0]
+        out, self._zi = sosfilt(self.sos, values, zi=self._zi)
+        return out
+
+    def push(self, value):
+        """Memfilter satu sampel baru (kernel satu sampel, tanpa overhead blok sosfilt)."""
+        value = float(value)
+        if self._zi is None:
+            self._zi = self._zi_unit * value
+        return float(sos_step(self.sos, self._zi, value))
+
+
+def decimation_factor(fs, target_rate):
+    """Faktor decimasi integer terdekat sehingga fs / faktor ≈ target_rate (minimal 1)."""
+    return max(1, int(round(fs / target_rate)))
+
+
+class StreamingDecimator:
+    """
+    Decimasi streaming: lowpass Butterworth kausal (anti-alias) lalu ambil setiap sampel ke-M.
+
+    Cutoff anti-alias 0.8 × Nyquist laju keluaran, sehingga band fisiologis di bawahnya
+    lolos tanpa aliasing dari noise frekuensi tinggi.
+
+    Args:
+        fs (float): Frekuensi sampling masukan (Hz)
+        target_rate (float): Frekuensi sampling keluaran yang diinginkan (Hz)
+        order (int): Orde lowpass anti-alias
+    """
+    def __init__(self, fs, target_rate, order=4):
+        self.factor = decimation_factor(fs, target_rate)
+        self.fs_out = fs / self.factor
+        self.sos = None
+        if self.factor > 1:
+            self.sos = butter(order, 0.8 * self.fs_out / 2, btype='low', fs=fs, output='sos')
+            self._zi_unit = sosfilt_zi(self.sos)
+        self._zi = None
+        self._count = 0
+
+    def reset(self):
+        """Mengosongkan state filter dan fase decimasi."""
+        self._zi = None
+        self._count = 0
+
+    def push(self, value):
+        """
+        Memasukkan satu sampel.
+
+        Returns:
+            float | None: Sampel keluaran setiap M sampel masukan, selain itu None
+        """
+        if self.sos is not None:
+            if self._zi is None:
+                self._zi = self._zi_unit * value
+            value = float(sos_step(self.sos, self._zi, float(value)))
+        self._count += 1
+        if self._count < self.factor:
+            return None
+        self._count = 0
+        return value
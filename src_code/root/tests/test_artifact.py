@@ -0,0 +1,36 @@
+"""Regresi deteksi artefak pada sinyal yang ditahan antar deteksi atau terkuantisasi."""
+
+import numpy as np
+
+from artifact import reject_artifacts
+
+
+FS = 30.0
+
+
+def _sine():
+    t = np.arange(int(60 * FS)) / FS
+    return 0.5 + 0.01 * np.sin(2 * np.pi * 0.25 * t)
+
+
+def test_held_signal_not_flagged():
+    x = _sine()
+    held = x[(np.arange(len(x)) // 3) * 3]      # nilai ditahan 3 frame (detect_interval=3)
+    repaired, mask = reject_artifacts(held, FS)
+    assert mask.mean() == 0.0
+    assert np.ptp(repaired) > 0.015
+
+
+def test_quantized_signal_not_flagged():
+    quantized = np.round(_sine() * 480) / 480   # kuantisasi piksel
+    repaired, mask = reject_artifacts(quantized, FS)
+    assert mask.mean() == 0.0
+    assert np.ptp(repaired) > 0.015
+
+
+def test_step_in_held_signal_still_flagged():
+    x = _sine()
+    held = x[(np.arange(len(x)) // 3) * 3]
+    held[900:] += 0.05
+    _, mask = reject_artifacts(held, FS)
+    assert mask[900] and mask.mean() < 0.05
@@ -0,0 +1,76 @@
+"""Sumber frame: kelas dasar abstrak, ArraySource, rekaman .npz dan folder gambar."""
+
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from frame_source import (ArraySource, FrameSource, ImageDirectorySource, RecordedSource, open_source,
+                          save_recording)
+
+
+def _frames(n=6):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (n, 12, 16, 3), dtype=np.uint8)
+
+
+def test_frame_source_is_abstract():
+    with pytest.raises(TypeError):
+        FrameSource()
+
+    class OpenOnly(FrameSource):
+        def _open(self):
+            pass
+
+    with pytest.raises(TypeError):
+        OpenOnly()
+
+
+def test_array_source_iteration():
+    frames = _frames()
+    timestamps = 10.0 + np.arange(len(frames)) * 0.04
+    with ArraySource(frames, timestamps, fps=25) as source:
+        items = list(source)
+        assert source.read() == (False, None)
+    assert not source.isOpened()
+    np.testing.assert_allclose([ts for ts, _ in items], timestamps - timestamps[0])
+    np.testing.assert_array_equal(np.stack([frame for _, frame in items]), frames)
+
+    with pytest.raises(ValueError):
+        ArraySource(frames, timestamps[:-1])
+
+
+def test_realtime_pacing():
+    source = ArraySource(_frames(3), [0.0, 0.05, 0.1], realtime=True).open()
+    start = time.perf_counter()
+    assert len(list(source)) == 3
+    assert time.perf_counter() - start >= 0.09
+
+
+def test_save_recording_round_trip(tmp_path):
+    frames = _frames()
+    timestamps = np.arange(len(frames)) / 15.0 + 0.003 * np.arange(len(frames))
+    path = str(tmp_path / "clip.npz")
+    save_recording(path, frames, timestamps, fps=15)
+
+    source = open_source(path)
+    assert isinstance(source, RecordedSource) and source.fps == 15
+    items = list(source)
+    source.release()
+    np.testing.assert_allclose([ts for ts, _ in items], timestamps)
+    np.testing.assert_array_equal(np.stack([frame for _, frame in items]), frames)
+
+
+def test_image_directory_source(tmp_path):
+    frames = _frames(4)
+    for i, frame in enumerate(frames):
+        cv2.imwrite(str(tmp_path / f"frame_{i:03d}.png"), frame)
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    source = open_source(str(tmp_path), fps=20)
+    assert isinstance(source, ImageDirectorySource)
+    items = list(source)
+    source.release()
+    np.testing.assert_allclose([ts for ts, _ in items], np.arange(4) / 20)
+    np.testing.assert_array_equal(np.stack([frame for _, frame in items]), frames)
@@ -0,0 +1,124 @@
+"""Cache inferensi: kunci stabil, hit identik, entri rusak dihapus dan eviction berbasis ukuran."""
+
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+import batch_runner
+from config import load_config
+from inference_cache import InferenceCache
+from roi_engine import ROIStats
+
+
+class _StubRPPG:
+    """Pengganti RPPGExtractor: statistik ROI dari rata-rata warna frame."""
+    calls = 0
+
+    def __init__(self, **kwargs):
+        pass
+
+    def analyze(self, frame, detect=True):
+        _StubRPPG.calls += 1
+        mean = frame.reshape(-1, 3).mean(axis=0)
+        stats = ROIStats(mean, np.zeros(3), frame.shape[0] * frame.shape[1], None)
+        return {'points': [(10, 10), (20, 10), (15, 20)], 'polygons': {},
+                'rois': {name: stats for name in ("forehead", "left_cheek", "right_cheek")}}
+
+
+class _StubRespirasi:
+    """Pengganti RespirasiExtractor: nilai respirasi dari kecerahan setengah bawah frame."""
+    def __init__(self, **kwargs):
+        pass
+
+    def analyze(self, frame, detect=True):
+        return {'value': float(frame[frame.shape[0] // 2:].mean()) / 255.0,
+                'shoulders': [(5, 30), (35, 30)], 'chest_roi': None}
+
+
+@pytest.fixture
+def stub_extractors(monkeypatch):
+    # extract_signals mengimpor ekstraktor di dalam fungsi; modul asli membutuhkan MediaPipe
+    monkeypatch.setitem(sys.modules, "rppg_signal", types.SimpleNamespace(RPPGExtractor=_StubRPPG))
+    monkeypatch.setitem(sys.modules, "respirasi_signal", types.SimpleNamespace(RespirasiExtractor=_StubRespirasi))
+    _StubRPPG.calls = 0
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = load_config()
+    config.cache.directory = str(tmp_path / "cache")
+    config.processing.extraction_workers = False
+    return config
+
+
+def _clip(seed=0, frames=40):
+    t = np.arange(frames) / 30.0
+    rng = np.random.default_rng(seed)
+    level = 120 + 10 * np.sin(2 * np.pi * 1.2 * t)[:, None, None, None]
+    return np.clip(level + rng.normal(0, 2, (frames, 24, 32, 3)), 0, 255).astype(np.uint8)
+
+
+def test_key_stability(config):
+    cache = InferenceCache.from_config(config)
+    clip = _clip()
+    key = cache.key(clip, config)
+    assert key == cache.key(clip.copy(), config)
+    assert key != cache.key(_clip(seed=1), config)
+    # Backend worker dan parameter analisis tidak memengaruhi hasil ekstraksi
+    config.processing.extraction_workers = True
+    config.processing.rppg_window = 20.0
+    assert cache.key(clip, config) == key
+    config.processing.detect_interval = 2
+    assert cache.key(clip, config) != key
+    assert cache.key(0, config) is None
+
+
+def test_hit_returns_identical_signals(config, stub_extractors):
+    clip = _clip()
+    first = batch_runner.extract_signals(clip, config)
+    calls = _StubRPPG.calls
+    second = batch_runner.extract_signals(clip, config)
+    assert not first['cached'] and second['cached']
+    assert _StubRPPG.calls == calls == len(clip)
+    for key in ('timestamps', 'rppg_raw', 'respirasi_raw', 'landmark_speed', 'brightness'):
+        np.testing.assert_array_equal(second[key], first[key], err_msg=key)
+    assert second['extraction_time'] == pytest.approx(first['extraction_time'])
+
+
+def test_corrupt_entry_removed(config, stub_extractors):
+    clip = _clip()
+    batch_runner.extract_signals(clip, config)
+    cache = InferenceCache.from_config(config)
+    path = cache._entry_path(cache.key(clip, config))
+    with open(path, "wb") as f:
+        f.write(b"corrupt")
+    assert cache.load(cache.key(clip, config)) is None
+    assert not os.path.exists(path)
+    # Rerun mengekstraksi ulang lalu menyimpan entri baru
+    result = batch_runner.extract_signals(clip, config)
+    assert not result['cached'] and os.path.exists(path)
+
+
+def test_eviction_under_max_bytes(tmp_path):
+    columns = {'values': np.random.default_rng(0).random(20000)}
+    cache = InferenceCache(str(tmp_path), max_bytes=1 << 30)
+    paths = []
+    for i, key in enumerate(("a", "b", "c")):
+        cache.store(key, columns, 1.0)
+        paths.append(cache._entry_path(key))
+        os.utime(paths[-1], (1000 + i, 1000 + i))    # urutan pemakaian eksplisit
+    # Batas cukup untuk tiga entri, tidak untuk empat
+    cache.max_bytes = int(3.5 * os.path.getsize(paths[0]))
+    # Membaca "a" menandainya baru dipakai, sehingga "b" yang dibuang saat "d" masuk
+    assert cache.load("a") is not None
+    cache.store("d", columns, 1.0)
+    assert [os.path.exists(p) for p in paths] == [True, False, True]
+    assert os.path.exists(cache._entry_path("d"))
+
+    # Entri yang melebihi batas sendiri tidak disimpan
+    small = InferenceCache(str(tmp_path / "small"), max_bytes=1000)
+    small.store("big", columns, 1.0)
+    assert not os.path.exists(small._entry_path("big"))
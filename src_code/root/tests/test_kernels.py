@@ -0,0 +1,40 @@
+"""Kesetaraan kernel versi loop (JIT jika Numba terpasang) dan fallback NumPy/SciPy."""
+
+import numpy as np
+import pytest
+from scipy.signal import medfilt
+
+import kernels
+import stream_filter
+from stream_filter import RunningMedian
+
+
+def _loop(name):
+    """Versi loop kernel: terkompilasi jika Numba aktif, selain itu Python biasa."""
+    return kernels._ACTIVE[name] if kernels.JIT_ACTIVE else kernels._KERNELS[name][0]
+
+
+def test_self_check():
+    assert kernels.self_check(verbose=False)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_find_peaks_matches_scipy(seed):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(int(rng.integers(3, 300)))
+    distance = int(rng.integers(1, 20))
+    prominence = float(rng.choice([0.0, 0.1, 0.5]))
+    expected = kernels._numpy_find_peaks(x, distance, prominence)
+    np.testing.assert_array_equal(_loop('find_peaks')(x, distance, prominence), expected)
+
+
+@pytest.mark.parametrize("jit", [False, True])
+def test_running_median_matches_medfilt(monkeypatch, jit):
+    # Jalur bisect (tanpa JIT) dan jalur kernel sorted_update harus identik dengan medfilt
+    monkeypatch.setattr(stream_filter, "JIT_ACTIVE", jit)
+    if jit and not kernels.JIT_ACTIVE:
+        monkeypatch.setattr(stream_filter, "sorted_update", kernels._KERNELS['sorted_update'][0])
+    x = np.round(np.random.default_rng(1).standard_normal(200), 1)
+    median = RunningMedian(5)
+    out = np.array([v for v in (median.push(s) for s in x) if v is not None])
+    np.testing.assert_array_equal(out, medfilt(x, 5)[2:-2])
@@ -0,0 +1,50 @@
+"""Pelacakan dada optical flow pada patch bertekstur sintetis yang bergerak vertikal."""
+
+import numpy as np
+import pytest
+
+respirasi_signal = pytest.importorskip("respirasi_signal", exc_type=ImportError)
+ChestMotionTracker = respirasi_signal.ChestMotionTracker
+
+
+SHOULDERS = [(110.0, 100.0), (210.0, 100.0)]    # lebar bahu 100 piksel
+TEXTURE = np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+def _frame(dy):
+    frame = np.full((320, 320, 3), 127, dtype=np.uint8)
+    frame[80 + dy:200 + dy, 80:240] = TEXTURE
+    return frame
+
+
+def _track(tracker, offsets):
+    for dy in offsets:
+        tracker.update(_frame(dy))
+
+
+def test_displacement_in_shoulder_widths():
+    tracker = ChestMotionTracker()
+    tracker.update(_frame(0))
+    tracker.reseed(_frame(0), SHOULDERS)
+    _track(tracker, range(2, 22, 2))
+    assert tracker.value == pytest.approx(0.2, abs=0.02)
+
+
+def test_reset_keeps_value_and_reset_signal_clears_it():
+    tracker = ChestMotionTracker()
+    tracker.update(_frame(0))
+    tracker.reseed(_frame(0), SHOULDERS)
+    _track(tracker, range(2, 22, 2))
+    value = tracker.value
+
+    # Deteksi Pose gagal: state pelacakan hilang, tetapi sinyal tidak melompat
+    tracker.reset()
+    assert not tracker.tracking and tracker.value == value
+    tracker.update(_frame(20))
+    tracker.reseed(_frame(20), [(x, y + 20) for x, y in SHOULDERS])
+    _track(tracker, range(22, 42, 2))
+    assert tracker.value == pytest.approx(value + 0.2, abs=0.04)
+
+    # Sesi baru: nilai terakumulasi dimulai dari nol
+    tracker.reset_signal()
+    assert tracker.value == 0.0 and tracker.shoulder_width is None
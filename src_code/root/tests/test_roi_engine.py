@@ -0,0 +1,45 @@
+"""Statistik ROI per region saat bounding box region saling tumpang tindih."""
+
+import cv2
+import numpy as np
+import pytest
+
+import kernels
+import roi_engine
+from roi_engine import ROIEngine
+
+
+# Dua segitiga yang tidak beririsan, tetapi bounding box-nya tumpang tindih (kepala miring)
+POLYGONS = {
+    "forehead": np.array([[20, 20], [120, 20], [20, 100]], dtype=np.int32),
+    "left_cheek": np.array([[130, 40], [130, 130], [40, 130]], dtype=np.int32),
+}
+COLORS = {"forehead": (40, 120, 200), "left_cheek": (200, 60, 10)}
+
+
+def _frame():
+    frame = np.full((160, 160, 3), 255, dtype=np.uint8)
+    for name, pts in POLYGONS.items():
+        cv2.fillPoly(frame, [pts], COLORS[name])
+    return frame
+
+
+def _pixel_count(pts):
+    mask = np.zeros((160, 160), dtype=np.uint8)
+    cv2.fillPoly(mask, [pts], 1)
+    return int(mask.sum())
+
+
+@pytest.mark.parametrize("loop", [False, True])
+def test_overlapping_boxes_do_not_leak(monkeypatch, loop):
+    if loop:
+        monkeypatch.setattr(roi_engine, "region_sums", kernels._KERNELS['region_sums'][0])
+    stats = ROIEngine(regions=dict.fromkeys(POLYGONS, []), use_skin_mask=False).compute(_frame(), POLYGONS)
+
+    forehead, cheek = stats["forehead"].bbox, stats["left_cheek"].bbox
+    assert forehead[0] < cheek[2] and cheek[0] < forehead[2]
+    assert forehead[1] < cheek[3] and cheek[1] < forehead[3]
+    for name, pts in POLYGONS.items():
+        np.testing.assert_array_equal(stats[name].mean, COLORS[name])
+        np.testing.assert_array_equal(stats[name].var, 0.0)
+        assert stats[name].count == _pixel_count(pts)
@@ -0,0 +1,88 @@
+"""Round-trip session capture: SessionCaptureWriter → read_capture → batch_runner."""
+
+import numpy as np
+import pytest
+
+from batch_runner import _signals_from_columns, extract_signals
+from inference_cache import FrameColumns, ROI_NAMES
+from roi_engine import ROIStats
+from session_capture import SessionCaptureWriter, read_capture
+
+
+FS = 30.0
+CHUNK = 7
+FRAMES = 30
+NO_FACE = range(7, 16)      # chunk kedua (frame 7–13) sama sekali tanpa wajah
+
+
+def _results(i):
+    """Hasil `analyze` sintetis untuk frame ke-i: (face, pose)."""
+    rng = np.random.default_rng(i)
+    face = None
+    if i not in NO_FACE:
+        polygons = {name: rng.integers(0, 640, (4 + k, 2)) for k, name in enumerate(ROI_NAMES)}
+        rois = {name: ROIStats(rng.uniform(50, 200, 3), rng.uniform(0, 30, 3), int(rng.integers(50, 500)), None)
+                for name in ROI_NAMES}
+        face = {'points': [tuple(p) for p in rng.integers(0, 640, (16, 2))], 'polygons': polygons, 'rois': rois}
+    pose = None
+    if i % 5 != 3:
+        pose = {'value': float(np.sin(i / 10)), 'shoulders': [(100 + i, 300), (300 - i, 302)],
+                'chest_roi': (110, 300, 290, 420)}
+    return face, pose
+
+
+def _write(path):
+    live = FrameColumns(landmarks=True)
+    writer = SessionCaptureWriter(str(path), FS, chunk_frames=CHUNK, metadata={'subject': 'test'})
+    for i in range(FRAMES):
+        face, pose = _results(i)
+        args = (i / FS, face, pose, 100.0 + i)
+        writer.append(*args)
+        live.append(*args)
+    writer.close()
+    return live.to_arrays(FS)
+
+
+def _assert_columns_equal(columns, expected, frames=None):
+    for key, value in expected.items():
+        value = value if frames is None or not np.ndim(value) or key in ('roi_names', 'region_sizes') \
+            else value[:frames]
+        np.testing.assert_array_equal(columns[key], value, err_msg=key)
+
+
+def test_round_trip_multiple_chunks(tmp_path):
+    path = tmp_path / "session.rpcap"
+    expected = _write(path)
+    header, columns = read_capture(str(path))
+    assert header['subject'] == 'test' and header['fs'] == FS
+    assert set(columns) == set(expected)
+    # Chunk tanpa wajah memiliki 0 titik region; _concat memadatkannya dengan -1
+    assert (columns['region_points'][7:14] == -1).all()
+    _assert_columns_equal(columns, expected)
+
+
+def test_truncated_final_record_ignored(tmp_path):
+    path = tmp_path / "session.rpcap"
+    expected = _write(path)
+    with open(path, "r+b") as f:
+        f.truncate(path.stat().st_size - 10)
+    _, columns = read_capture(str(path))
+    complete = (FRAMES // CHUNK) * CHUNK        # chunk terakhir (sisa) terpotong
+    assert len(columns['timestamps']) == complete
+    _assert_columns_equal(columns, expected, frames=complete)
+
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / "other.rpcap"
+    path.write_bytes(b"not a capture")
+    with pytest.raises(ValueError):
+        read_capture(str(path))
+
+
+def test_batch_signals_match_live_columns(tmp_path):
+    path = tmp_path / "session.rpcap"
+    expected = _signals_from_columns(_write(path), 0.0, cached=False)
+    signals = extract_signals(str(path))
+    for key in ('timestamps', 'rppg_raw', 'respirasi_raw', 'landmark_speed', 'brightness'):
+        np.testing.assert_array_equal(signals[key], expected[key], err_msg=key)
+    assert signals['fs'] == FS and signals['frames'] == FRAMES and not signals['cached']
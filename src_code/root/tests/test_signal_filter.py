@@ -0,0 +1,27 @@
+"""Preprocessing batch (banyak kanal sekaligus) sama dengan preprocessing per baris."""
+
+import numpy as np
+import pytest
+
+from signal_filter import preprocess_signal, preprocess_signal_batch
+
+
+FS = 30.0
+
+
+@pytest.mark.parametrize("signal_type", ["rPPG", "respirasi"])
+def test_batch_rows_match_preprocess_signal(signal_type):
+    X = np.random.default_rng(0).normal(size=(4, 600))
+    batch = preprocess_signal_batch(X, FS, signal_type)
+    for row, out in zip(X, batch):
+        expected = preprocess_signal(row, FS, signal_type)
+        np.testing.assert_allclose(out, expected, rtol=0, atol=1e-9 * np.max(np.abs(expected)))
+
+
+def test_batch_mixed_signal_types_and_axis():
+    X = np.random.default_rng(1).normal(size=(2, 600))
+    types = ["rPPG", "respirasi"]
+    batch = preprocess_signal_batch(X.T, FS, types, axis=0)
+    for i, signal_type in enumerate(types):
+        expected = preprocess_signal(X[i], FS, signal_type)
+        np.testing.assert_allclose(batch[:, i], expected, rtol=0, atol=1e-9 * np.max(np.abs(expected)))
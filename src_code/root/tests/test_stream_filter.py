@@ -0,0 +1,40 @@
+"""Preprocessing streaming (median → Savitzky-Golay) identik dengan versi batch."""
+
+import numpy as np
+import pytest
+from scipy.signal import medfilt, savgol_filter
+
+from config import FilterConfig
+from stream_filter import StreamingPreprocessor
+
+
+def _stream(preprocessor, x):
+    return np.array([v for v in (preprocessor.push(s) for s in x) if v is not None])
+
+
+def test_streaming_preprocessor_matches_batch():
+    x = np.random.default_rng(0).standard_normal(300)
+    preprocessor = StreamingPreprocessor(5, 11, 3)
+    assert preprocessor.delay == 7
+    out = _stream(preprocessor, x)
+    # Sampel ke-i keluaran streaming = sampel ke-(i + delay) batch; tepi sinyal tidak dikeluarkan
+    expected = savgol_filter(medfilt(x, 5), 11, 3)
+    assert len(out) == len(x) - 2 * preprocessor.delay
+    np.testing.assert_allclose(out, expected[preprocessor.delay:preprocessor.delay + len(out)], rtol=0, atol=1e-12)
+
+
+def test_reset_restarts_fill():
+    x = np.random.default_rng(1).standard_normal(100)
+    preprocessor = StreamingPreprocessor(5, 11, 3)
+    first = _stream(preprocessor, x)
+    preprocessor.reset()
+    np.testing.assert_array_equal(_stream(preprocessor, x), first)
+
+
+@pytest.mark.parametrize("fs", [10.0, 30.0])
+def test_stream_kwargs_follow_batch_kernels(fs):
+    flt = FilterConfig()
+    batch = flt.batch_kwargs(fs)
+    preprocessor = StreamingPreprocessor(**flt.stream_kwargs(fs))
+    assert preprocessor.median.kernel_size == batch['kernel_size']
+    assert preprocessor.savgol.window_length == batch['savgol_window'][1]
@@ -0,0 +1,52 @@
+"""Estimator laju: zoom vs periodogram dan jalur tanpa bank untuk jendela panjang."""
+
+import numpy as np
+import pytest
+
+import utils
+from utils import HR_BAND, RR_BAND, RateTracker, ZoomEstimator, get_zoom_estimator
+
+
+def _tone(freq, fs, seconds, noise=0.3, seed=0):
+    t = np.arange(int(seconds * fs)) / fs
+    rng = np.random.default_rng(seed)
+    return np.sin(2 * np.pi * freq * t) + noise * rng.standard_normal(len(t))
+
+
+@pytest.mark.parametrize("freq, fs, seconds, band", [
+    (1.2, 10.0, 30.0, HR_BAND),      # 72 BPM, tepat di bin asli (2 BPM)
+    (1.37, 10.0, 10.0, HR_BAND),     # 82.2 BPM, di antara bin asli (6 BPM)
+    (0.25, 5.0, 60.0, RR_BAND),      # 15 napas/menit
+])
+def test_zoom_agrees_with_periodogram(freq, fs, seconds, band):
+    x = _tone(freq, fs, seconds)
+    zoom = RateTracker(band, method="zoom").update(x, fs)
+    periodogram = RateTracker(band, method="periodogram").update(x, fs)
+    bin_bpm = fs / len(x) * 60
+    # Periodogram terkuantisasi ke bin asli; zoom berada dalam satu bin dan lebih dekat ke nada
+    # (toleransi dua langkah grid halus untuk bias derau/kebocoran pada jendela pendek)
+    assert abs(zoom - periodogram) <= bin_bpm
+    assert abs(zoom - freq * 60) <= 0.5
+    assert abs(zoom - freq * 60) <= abs(periodogram - freq * 60) + 1e-9
+
+
+def test_unbanked_path_matches_bank(monkeypatch):
+    x = _tone(1.23, 10.0, 120.0)
+    banked = ZoomEstimator(len(x), 10.0, HR_BAND)
+    monkeypatch.setattr(utils, "_MAX_BANK_SIZE", 0)
+    unbanked = ZoomEstimator(len(x), 10.0, HR_BAND)
+    assert banked.banked and not unbanked.banked
+    for around in (None, 1.2):
+        rate_b, quality_b = banked.estimate(x, around, 0.1)
+        rate_u, quality_u = unbanked.estimate(x, around, 0.1)
+        assert rate_b == rate_u
+        assert quality_b == pytest.approx(quality_u, rel=1e-9)
+
+
+def test_long_window_not_banked_or_cached():
+    n = int(600 * 10.0)                 # rekaman 10 menit pada 10 Hz
+    x = _tone(1.23, 10.0, 600.0)
+    estimator = get_zoom_estimator(n, 10.0, HR_BAND)
+    assert not estimator.banked
+    assert ('zoom', n, 10.0, HR_BAND, 0.25) not in utils._estimators
+    assert abs(estimator.estimate(x)[0] - 1.23 * 60) <= 0.25
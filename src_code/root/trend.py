@@ -0,0 +1,129 @@
+"""
+Piramida min/max untuk plot tren jangka panjang (HR/RR sepanjang sesi).
+
+Setiap level mengagregasi `factor` entri level di bawahnya menjadi satu bucket yang
+menyimpan nilai minimum dan maksimum beserta waktunya, sehingga lonjakan singkat tetap
+terlihat pada zoom jauh. Level diperbarui inkremental saat estimasi baru masuk (O(1)
+amortized per sampel). Query memilih level paling halus yang muat dalam anggaran titik
+untuk rentang waktu yang terlihat, sehingga biaya menggambar konstan berapa pun panjang sesi.
+
+Kelas:
+- MinMaxPyramid: append(t, value) dan query(t0, t1, max_points).
+"""
+
+import numpy as np
+
+
+class _Level:
+    """Array bucket yang tumbuh (kapasitas digandakan): start, tmin, vmin, tmax, vmax."""
+    def __init__(self, capacity):
+        self.n = 0
+        self.data = np.empty((5, capacity))
+
+    def push(self, start, tmin, vmin, tmax, vmax):
+        if self.n == self.data.shape[1]:
+            grown = np.empty((5, 2 * self.n))
+            grown[:, :self.n] = self.data
+            self.data = grown
+        self.data[:, self.n] = (start, tmin, vmin, tmax, vmax)
+        self.n += 1
+
+    @property
+    def start(self):
+        return self.data[0, :self.n]
+
+
+class MinMaxPyramid:
+    """
+    Piramida level-of-detail min/max untuk satu deret waktu.
+
+    Args:
+        factor (int): Jumlah entri per bucket pada level berikutnya
+        capacity (int): Kapasitas awal level 0
+    """
+    def __init__(self, factor=4, capacity=1024):
+        self.factor = factor
+        self._capacity = capacity
+        self.clear()
+
+    def clear(self):
+        """Menghapus seluruh data (misalnya saat sesi baru dimulai)."""
+        self._levels = [_Level(self._capacity)]
+
+    def __len__(self):
+        return self._levels[0].n
+
+    @property
+    def span(self):
+        """(t pertama, t terakhir) atau None jika kosong."""
+        level = self._levels[0]
+        return (level.data[0, 0], level.data[0, level.n - 1]) if level.n else None
+
+    def append(self, t, value):
+        """
+        Menambahkan satu sampel (t naik monoton) dan memperbarui level di atasnya.
+
+        Args:
+            t (float): Waktu (detik)
+            value (float): Nilai (misalnya BPM)
+        """
+        self._levels[0].push(t, t, value, t, value)
+        k = 0
+        while self._levels[k].n % self.factor == 0:
+            child = self._levels[k]
+            block = child.data[:, child.n - self.factor:child.n]
+            i, j = int(np.argmin(block[2])), int(np.argmax(block[4]))
+            if k + 1 == len(self._levels):
+                self._levels.append(_Level(max(16, self._capacity // self.factor ** (k + 1))))
+            self._levels[k + 1].push(block[0, 0], block[1, i], block[2, i], block[3, j], block[4, j])
+            k += 1
+
+    def _segments(self, k, t0, t1):
+        """Segmen (level, lo, hi) yang mencakup [t0, t1] pada level k plus ekor level lebih halus."""
+        segments = []
+        covered = None
+        for j in range(k, -1, -1):
+            level = self._levels[j]
+            first = 0 if covered is None else covered
+            start = level.start
+            lo = max(first, int(np.searchsorted(start, t0, side='right')) - 1)
+            hi = int(np.searchsorted(start, t1, side='right'))
+            if hi > lo:
+                segments.append((j, lo, hi))
+            # Entri level j-1 yang belum teragregasi ke level j
+            covered = level.n * self.factor
+        return segments
+
+    def query(self, t0, t1, max_points=2000):
+        """
+        Titik untuk digambar pada rentang [t0, t1].
+
+        Args:
+            t0 (float): Awal rentang (detik)
+            t1 (float): Akhir rentang (detik)
+            max_points (int): Anggaran titik (kira-kira; ditambah ekor yang belum teragregasi)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (t, value) terurut waktu; setiap bucket menyumbang
+            titik minimum dan maksimumnya
+        """
+        if not len(self):
+            return np.empty(0), np.empty(0)
+        k = 0
+        for k, level in enumerate(self._levels):
+            start = level.start
+            count = np.searchsorted(start, t1, side='right') - max(np.searchsorted(start, t0, side='right') - 1, 0)
+            if (1 if k == 0 else 2) * count <= max_points:
+                break
+
+        times, values = [], []
+        for j, lo, hi in self._segments(k, t0, t1):
+            _, tmin, vmin, tmax, vmax = self._levels[j].data[:, lo:hi]
+            if j == 0:
+                times.append(tmin)
+                values.append(vmin)
+                continue
+            min_first = tmin <= tmax
+            times.append(np.column_stack((np.where(min_first, tmin, tmax), np.where(min_first, tmax, tmin))).ravel())
+            values.append(np.column_stack((np.where(min_first, vmin, vmax), np.where(min_first, vmax, vmin))).ravel())
+        return np.concatenate(times), np.concatenate(values)
@@ -7,63 +7,423 @@ dari sinyal fisiologis menggunakan analisis spektrum daya (power spectral densit
 Fungsi:
 - estimate_heart_rate(signal, fs): Menghitung detak jantung (dalam bpm) berdasarkan sinyal rPPG.
 - estimate_respiration_rate(signal, fs): Menghitung laju pernapasan (dalam bpm) berdasarkan sinyal respirasi.
+- estimate_rates(rppg, respirasi, fs): Menghitung keduanya dari satu FFT bersama (time base sama).
+
+Kelas:
+- SpectralEstimator: Estimator periodogram dengan grid frekuensi, indeks band dan buffer FFT
+  yang dihitung sekali per (N, fs), sehingga tidak ada alokasi pada kondisi tunak.
+- ZoomEstimator: DFT terbatas band (bank Goertzel sebagai matriks cos/sin yang dihitung
+  sekali, atau rFFT + zoom tanpa bank untuk N besar): pencarian kasar pada bin asli lalu
+  zoom beresolusi halus (< 1 BPM) di sekitar puncak.
+- RateTracker: State pelacakan per aliran; saat estimasi stabil, zoom dibatasi pada
+  lingkungan estimasi sebelumnya.
 """
 
 import numpy as np  # Untuk operasi numerik
-from scipy.signal import periodogram  # Untuk menghitung periodogram sinyal
 
 
-def estimate_heart_rate(signal, fs):
+# Rentang frekuensi fisiologis (Hz)
+HR_BAND = (0.7, 3.0)    # 42–180 bpm
+RR_BAND = (0.1, 0.5)    # 6–30 bpm
+
+# np.fft mendukung argumen `out` sejak NumPy 2.0
+_FFT_HAS_OUT = int(np.__version__.split('.')[0]) >= 2
+
+
+class SpectralEstimator:
+    """
+    Estimator laju berbasis periodogram untuk panjang jendela N dan frekuensi sampling fs tetap.
+
+    Grid frekuensi, rentang indeks tiap band dan buffer kerja (sinyal ter-detrend, spektrum
+    kompleks, daya) dialokasikan sekali. Hasilnya identik dengan puncak
+    `scipy.signal.periodogram` (detrend konstan, jendela boxcar) di dalam band.
+    Buffer memiliki dua baris agar sinyal rPPG dan respirasi dapat diproses dalam satu FFT.
+
+    Catatan: buffer dipakai ulang, sehingga satu instance tidak boleh dipakai
+    bersamaan dari beberapa thread.
+    """
+    def __init__(self, n, fs):
+        self.n = n
+        self.fs = fs
+        self.freqs = np.fft.rfftfreq(n, 1.0 / fs)
+        self._band_cache = {}
+        self._centered = np.empty((2, n))
+        self._spectrum = np.empty((2, len(self.freqs)), dtype=complex)
+        self._power = np.empty((2, len(self.freqs)))
+        self._scratch = np.empty((2, len(self.freqs)))
+
+    def band_slice(self, band):
+        """Slice indeks frekuensi untuk band (low, high) inklusif, dihitung sekali per band."""
+        sl = self._band_cache.get(band)
+        if sl is None:
+            start = int(np.searchsorted(self.freqs, band[0], side='left'))
+            stop = int(np.searchsorted(self.freqs, band[1], side='right'))
+            sl = self._band_cache[band] = slice(start, stop)
+        return sl
+
+    def _compute_power(self, rows):
+        spectrum = self._spectrum[:rows]
+        if _FFT_HAS_OUT:
+            np.fft.rfft(self._centered[:rows], axis=-1, out=spectrum)
+        else:
+            spectrum[...] = np.fft.rfft(self._centered[:rows], axis=-1)
+        # |X|^2 tanpa array sementara
+        power = self._power[:rows]
+        np.multiply(spectrum.real, spectrum.real, out=power)
+        np.multiply(spectrum.imag, spectrum.imag, out=self._scratch[:rows])
+        np.add(power, self._scratch[:rows], out=power)
+
+    def _load(self, row, signal):
+        centered = self._centered[row]
+        centered[...] = signal
+        centered -= centered.mean()
+
+    def _peak_rate(self, row, band):
+        sl = self.band_slice(band)
+        if sl.stop <= sl.start:
+            return 0
+        idx = sl.start + int(np.argmax(self._power[row, sl]))
+        return int(self.freqs[idx] * 60)
+
+    def estimate(self, signal, band):
+        """
+        Mengestimasi laju (per menit) dari puncak spektrum di dalam band.
+
+        Args:
+            signal (array-like): Sinyal dengan panjang N
+            band (tuple): Rentang frekuensi (low, high) dalam Hz
+
+        Returns:
+            int: Laju dalam per menit, 0 jika band kosong
+        """
+        self._load(0, signal)
+        self._compute_power(1)
+        return self._peak_rate(0, band)
+
+    def estimate_pair(self, rppg, respirasi, hr_band=HR_BAND, rr_band=RR_BAND):
+        """
+        Mengestimasi heart rate dan respiration rate dari satu FFT dua baris.
+
+        Returns:
+            tuple[int, int]: (heart rate bpm, respiration rate breaths/min)
+        """
+        self._load(0, rppg)
+        self._load(1, respirasi)
+        self._compute_power(2)
+        return self._peak_rate(0, hr_band), self._peak_rate(1, rr_band)
+
+    def band_quality(self, band, row=0):
+        """
+        Rasio daya puncak terhadap total daya band dari estimasi terakhir (0–1).
+        Nilai mendekati 1 berarti satu frekuensi dominan (sinyal bersih).
+        """
+        sl = self.band_slice(band)
+        band_power = self._power[row, sl]
+        total = band_power.sum()
+        if sl.stop <= sl.start or total <= 0:
+            return 0.0
+        return float(band_power.max() / total)
+
+
+class ZoomEstimator:
+    """
+    Estimator laju berbasis DFT yang hanya mengevaluasi band fisiologis.
+
+    Grid halus dengan jarak `resolution` (BPM, dibulatkan agar membagi jarak bin asli fs/N)
+    mencakup band; baris cos/sin untuk setiap frekuensi grid dihitung sekali (bank Goertzel
+    dalam bentuk perkalian matriks). Setiap estimasi:
+    1. Pass kasar pada bin asli fs/N di dalam band (daya identik dengan periodogram,
+       sehingga kualitas sama dengan `SpectralEstimator.band_quality`)
+    2. Zoom pada grid halus di sekitar puncak kasar, atau di sekitar estimasi sebelumnya
+       (`around`) jika pelacakan aktif
+
+    Dengan demikian resolusi < 1 BPM didapat tanpa FFT panjang ber-zero-padding, dan biaya
+    per estimasi sebanding dengan (jumlah bin band + lebar zoom) × N.
+
+    Bank cos/sin berukuran (jumlah frekuensi grid × N) dan tumbuh kuadratik terhadap N.
+    Di atas `_MAX_BANK_SIZE` elemen (misalnya rekaman panjang pada batch runner) bank tidak
+    disimpan: pass kasar memakai rFFT (bin asli yang sama) dan baris zoom dihitung saat
+    dibutuhkan, sehingga memori sebanding dengan N.
+
+    Args:
+        n (int): Panjang jendela (sampel)
+        fs (float): Frekuensi sampling (Hz)
+        band (tuple): Rentang frekuensi (low, high) Hz
+        resolution (float): Resolusi grid halus yang diminta (BPM)
+    """
+    def __init__(self, n, fs, band, resolution=0.25):
+        self.n = n
+        self.fs = fs
+        self.band = tuple(band)
+        bin_hz = fs / n
+        self.step = max(1, int(np.ceil(bin_hz * 60 / resolution)))
+        fine_hz = bin_hz / self.step
+        self.resolution = fine_hz * 60
+
+        # Grid halus berjangkar pada bin asli pertama di dalam band
+        anchor = np.ceil(band[0] / bin_hz - 1e-9) * bin_hz
+        first = -int(np.floor((anchor - band[0]) / fine_hz + 1e-9))
+        last = int(np.floor((band[1] - anchor) / fine_hz + 1e-9))
+        self.freqs = anchor + np.arange(first, last + 1) * fine_hz
+        self._coarse = np.arange(-first, len(self.freqs), self.step)
+
+        self._t = np.arange(n) / fs
+        self.banked = len(self.freqs) * n <= _MAX_BANK_SIZE
+        if self.banked:
+            self._cos, self._sin = self._bank(self.freqs)
+            self._coarse_cos = np.ascontiguousarray(self._cos[self._coarse])
+            self._coarse_sin = np.ascontiguousarray(self._sin[self._coarse])
+        else:
+            # Indeks bin rFFT untuk setiap frekuensi grid kasar
+            self._coarse_bins = np.rint(self.freqs[self._coarse] / bin_hz).astype(int)
+
+        self._centered = np.empty(n)
+        self._re = np.empty(len(self.freqs))
+        self._im = np.empty(len(self.freqs))
+        self._power = np.empty(len(self.freqs))
+        self._coarse_re = np.empty(len(self._coarse))
+        self._coarse_im = np.empty(len(self._coarse))
+        self._coarse_power = np.empty(len(self._coarse))
+
+    def _bank(self, freqs):
+        phase = 2 * np.pi * freqs[:, None] * self._t
+        return np.cos(phase), np.sin(phase)
+
+    @staticmethod
+    def _dft_power(cos, sin, x, re, im, power):
+        np.dot(cos, x, out=re)
+        np.dot(sin, x, out=im)
+        np.multiply(re, re, out=power)
+        np.multiply(im, im, out=im)
+        np.add(power, im, out=power)
+        return power
+
+    def _fine_peak(self, lo, hi):
+        lo, hi = max(lo, 0), min(hi, len(self.freqs))
+        sl = slice(lo, hi)
+        cos, sin = (self._cos[sl], self._sin[sl]) if self.banked else self._bank(self.freqs[sl])
+        power = self._dft_power(cos, sin, self._centered,
+                                self._re[sl], self._im[sl], self._power[sl])
+        return lo + int(np.argmax(power))
+
+    def estimate(self, signal, around=None, span=None):
+        """
+        Mengestimasi laju (per menit) dengan resolusi grid halus.
+
+        Args:
+            signal (array-like): Sinyal dengan panjang N
+            around (float | None): Frekuensi (Hz) estimasi sebelumnya untuk pelacakan
+            span (float | None): Setengah lebar lingkungan pelacakan (Hz)
+
+        Returns:
+            tuple[float, float]: (laju per menit, kualitas 0–1); (0.0, 0.0) jika band kosong
+        """
+        if len(self.freqs) == 0:
+            return 0.0, 0.0
+        centered = self._centered
+        centered[...] = signal
+        centered -= centered.mean()
+
+        if len(self._coarse) == 0:
+            # Band lebih sempit dari satu bin asli: seluruh grid halus dievaluasi
+            idx = self._fine_peak(0, len(self.freqs))
+            return float(self.freqs[idx] * 60), 1.0
+
+        if self.banked:
+            coarse = self._dft_power(self._coarse_cos, self._coarse_sin, centered,
+                                     self._coarse_re, self._coarse_im, self._coarse_power)
+        else:
+            spectrum = np.fft.rfft(centered)[self._coarse_bins]
+            coarse = self._coarse_power
+            np.multiply(spectrum.real, spectrum.real, out=coarse)
+            coarse += spectrum.imag * spectrum.imag
+        peak = int(np.argmax(coarse))
+        total = coarse.sum()
+        quality = float(coarse[peak] / total) if total > 0 else 0.0
+
+        lo = hi = None
+        if around is not None and span is not None:
+            fine_hz = self.resolution / 60
+            lo = int(np.floor((around - span - self.freqs[0]) / fine_hz))
+            hi = int(np.ceil((around + span - self.freqs[0]) / fine_hz)) + 1
+            # Puncak kasar jauh lebih kuat di luar lingkungan: lepaskan pelacakan (akuisisi ulang)
+            inside = (self._coarse >= lo) & (self._coarse < hi)
+            if not inside.any() or coarse[peak] > _REACQUIRE_RATIO * coarse[inside].max():
+                lo = hi = None
+        if lo is None:
+            center = self._coarse[peak]
+            lo, hi = center - self.step + 1, center + self.step
+
+        idx = self._fine_peak(lo, hi)
+        return float(self.freqs[idx] * 60), quality
+
+
+_REACQUIRE_RATIO = 2.0
+# Batas elemen bank cos/sin ZoomEstimator (masing-masing 8 MB pada float64)
+_MAX_BANK_SIZE = 1 << 20
+
+
+class RateTracker:
+    """
+    Estimasi laju dengan pelacakan untuk satu aliran sinyal (misalnya HR pada GUI).
+
+    Setelah `stable_count` estimasi berturut-turut berubah tidak lebih dari `span` BPM,
+    zoom hanya dilakukan di lingkungan ±`span` BPM dari estimasi sebelumnya; puncak yang
+    jauh lebih kuat di luar lingkungan membatalkan pelacakan.
+
+    Dengan method="periodogram", estimasi memakai `SpectralEstimator` (resolusi bin asli,
+    tanpa pelacakan) sebagai pembanding.
+
+    Args:
+        band (tuple): Rentang frekuensi (low, high) Hz
+        method (str): "zoom" atau "periodogram"
+        resolution (float): Resolusi grid halus (BPM)
+        tracking (bool): Aktifkan pelacakan lingkungan
+        span (float): Setengah lebar lingkungan pelacakan (BPM)
+        stable_count (int): Jumlah estimasi stabil sebelum pelacakan aktif
+    """
+    def __init__(self, band, method="zoom", resolution=0.25, tracking=True, span=6.0, stable_count=3):
+        if method not in ("zoom", "periodogram"):
+            raise ValueError(f"Unknown rate estimator: {method}")
+        self.band = tuple(band)
+        self.method = method
+        self.resolution = resolution
+        self.tracking = tracking
+        self.span = span
+        self.stable_count = stable_count
+        self.reset()
+
+    def reset(self):
+        """Menghapus riwayat pelacakan (misalnya saat feed video dimulai ulang)."""
+        self.rate = None
+        self.quality = 0.0
+        self._stable = 0
+
+    @property
+    def locked(self):
+        """True jika estimasi berikutnya memakai lingkungan estimasi sebelumnya."""
+        return (self.method == "zoom" and self.tracking and self.rate is not None
+                and self._stable >= self.stable_count)
+
+    def update(self, signal, fs):
+        """
+        Mengestimasi laju dari jendela sinyal terbaru.
+
+        Returns:
+            float: Laju per menit (0.0 jika sinyal terlalu pendek)
+        """
+        signal = np.asarray(signal, dtype=float)
+        if len(signal) < 2:
+            return 0.0
+        if self.method == "periodogram":
+            estimator = get_estimator(len(signal), fs)
+            rate = float(estimator.estimate(signal, self.band))
+            self.quality = estimator.band_quality(self.band)
+        else:
+            estimator = get_zoom_estimator(len(signal), fs, self.band, self.resolution)
+            around = self.rate / 60 if self.locked else None
+            rate, self.quality = estimator.estimate(signal, around, self.span / 60)
+
+        if self.rate is not None and abs(rate - self.rate) <= self.span:
+            self._stable += 1
+        else:
+            self._stable = 0
+        self.rate = rate
+        return rate
+
+
+_estimators = {}
+_MAX_ESTIMATORS = 64
+
+
+def _cached_estimator(key, factory):
+    estimator = _estimators.get(key)
+    if estimator is None:
+        if len(_estimators) >= _MAX_ESTIMATORS:
+            # Buang estimator tertua (panjang jendela transien saat buffer masih terisi)
+            _estimators.pop(next(iter(_estimators)))
+        estimator = _estimators[key] = factory()
+    return estimator
+
+
+def get_estimator(n, fs):
+    """Mengambil SpectralEstimator untuk (N, fs), dibuat sekali lalu dipakai ulang."""
+    return _cached_estimator((n, fs), lambda: SpectralEstimator(n, fs))
+
+
+def get_zoom_estimator(n, fs, band, resolution=0.25):
+    """
+    Mengambil ZoomEstimator untuk (N, fs, band, resolusi), dibuat sekali lalu dipakai ulang.
+    Estimator tanpa bank (jendela sangat panjang, misalnya seluruh rekaman batch) tidak di-cache.
+    """
+    band = tuple(band)
+    key = ('zoom', n, fs, band, resolution)
+    estimator = _estimators.get(key)
+    if estimator is None:
+        estimator = ZoomEstimator(n, fs, band, resolution)
+        if estimator.banked:
+            _cached_estimator(key, lambda: estimator)
+    return estimator
+
+
+def estimate_heart_rate(signal, fs, band=HR_BAND):
     """
     Mengestimasi detak jantung (heart rate) dari sinyal rPPG menggunakan analisis spektrum daya.
 
     Args:
         signal (array-like): Sinyal input, biasanya rPPG (photoplethysmogram).
         fs (float): Frekuensi sampling sinyal dalam Hz.
+        band (tuple): Rentang frekuensi pencarian (Hz).
 
     Returns:
         int: Detak jantung dalam beats per minute (bpm). Jika tidak ada puncak dominan, mengembalikan 0.
     """
-    # Hitung spektrum daya (power spectral density) dari sinyal
-    f, Pxx = periodogram(signal, fs)
-
-    # Batasi ke rentang frekuensi detak jantung normal (0.7–3.0 Hz = 42–180 bpm)
-    f_range = (f >= 0.7) & (f <= 3.0)
-
-    # Jika tidak ada komponen frekuensi dalam rentang tersebut, kembalikan 0
-    if not np.any(f_range):
+    # Spektrum daya dihitung oleh estimator yang di-cache per (N, fs);
+    # rentang 0.7–3.0 Hz = 42–180 bpm, frekuensi dominan dikonversi ke bpm
+    signal = np.asarray(signal, dtype=float)
+    if len(signal) < 2:
         return 0
+    return get_estimator(len(signal), fs).estimate(signal, band)
 
-    # Cari frekuensi dominan (frekuensi dengan energi tertinggi) dalam rentang tersebut
-    peak_freq = f[f_range][np.argmax(Pxx[f_range])]
 
-    # Konversi frekuensi dari Hz ke bpm
-    return int(peak_freq * 60)
-
-
-def estimate_respiration_rate(signal, fs):
+def estimate_respiration_rate(signal, fs, band=RR_BAND):
     """
     Mengestimasi laju pernapasan (respiration rate) dari sinyal respirasi menggunakan analisis spektrum daya.
 
     Args:
         signal (array-like): Sinyal input, misalnya pergerakan bahu atau dada.
         fs (float): Frekuensi sampling sinyal dalam Hz.
+        band (tuple): Rentang frekuensi pencarian (Hz).
 
     Returns:
         int: Laju pernapasan dalam breaths per minute (bpm). Jika tidak ada puncak dominan, mengembalikan 0.
     """
-    # Hitung spektrum daya dari sinyal
-    f, Pxx = periodogram(signal, fs)
+    # Rentang frekuensi napas normal (0.1–0.5 Hz = 6–30 bpm)
+    signal = np.asarray(signal, dtype=float)
+    if len(signal) < 2:
+        return 0
+    return get_estimator(len(signal), fs).estimate(signal, band)
 
-    # Batasi ke rentang frekuensi napas normal (0.1–0.5 Hz = 6–30 bpm)
-    f_range = (f >= 0.1) & (f <= 0.5)
 
-    # Jika tidak ada komponen frekuensi dalam rentang tersebut, kembalikan 0
-    if not np.any(f_range):
-        return 0
+def estimate_rates(rppg, respirasi, fs, hr_band=HR_BAND, rr_band=RR_BAND):
+    """
+    Mengestimasi heart rate dan respiration rate sekaligus dari satu FFT bersama.
+    Kedua sinyal harus memiliki time base yang sama (panjang dan fs sama).
 
-    # Cari frekuensi dominan dalam rentang tersebut
-    peak_freq = f[f_range][np.argmax(Pxx[f_range])]
+    Args:
+        rppg (array-like): Sinyal rPPG terfilter
+        respirasi (array-like): Sinyal respirasi terfilter
+        fs (float): Frekuensi sampling sinyal dalam Hz.
+        hr_band (tuple): Rentang frekuensi heart rate (Hz).
+        rr_band (tuple): Rentang frekuensi respiration rate (Hz).
 
-    # Konversi frekuensi dari Hz ke bpm
-    return int(peak_freq * 60)
+    Returns:
+        tuple[int, int]: (heart rate bpm, respiration rate breaths/min)
+    """
+    rppg = np.asarray(rppg, dtype=float)
+    respirasi = np.asarray(respirasi, dtype=float)
+    if len(rppg) != len(respirasi):
+        raise ValueError("rPPG and respiration signals must share the same time base")
+    if len(rppg) < 2:
+        return 0, 0
+    return get_estimator(len(rppg), fs).estimate_pair(rppg, respirasi, hr_band, rr_band)